@@ -0,0 +1,88 @@
+"""
+Запуск из корня репозитория:
+
+    python -m bench run --sizes 10000 100000 --out bench_results.json
+    python -m bench run --only data_rows filter_rows --baseline bench_baseline.json
+    python -m bench compare bench_baseline.json bench_results.json --threshold 0.2
+    python -m bench generate --rows 100000 --styles
+    python -m bench run --only filter_rows_reference filter_rows_wide --sizes 100000 --no-memory
+
+Последняя команда сравнивает compile_rules с прежней (некомпилированной) фильтрацией.
+
+С --baseline (и в compare) код выхода 1, если есть регрессия.
+"""
+
+import argparse
+import sys
+
+from bench import report
+from bench.generator import WorkbookSpec, generate
+from bench.suite import BENCHMARKS, SIZES, run_suite
+
+
+def _spec_kwargs(args: argparse.Namespace) -> dict:
+    return {"cols": args.cols, "cardinality": args.cardinality, "empty_ratio": args.empty_ratio}
+
+
+def _add_spec_args(p: argparse.ArgumentParser) -> None:
+    defaults = WorkbookSpec()
+    p.add_argument("--cols", type=int, default=defaults.cols)
+    p.add_argument("--cardinality", type=int, default=defaults.cardinality)
+    p.add_argument("--empty-ratio", type=float, default=defaults.empty_ratio)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_run = sub.add_parser("run", help="прогнать бенчмарки")
+    p_run.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    p_run.add_argument("--only", nargs="+", choices=[b.name for b in BENCHMARKS])
+    p_run.add_argument("--repeat", type=int, default=1)
+    p_run.add_argument("--no-memory", action="store_true", help="не мерить пик памяти")
+    p_run.add_argument("--out", default="bench_results.json")
+    p_run.add_argument("--baseline", help="сравнить с сохранённым отчётом")
+    p_run.add_argument("--threshold", type=float, default=0.2)
+    _add_spec_args(p_run)
+
+    p_cmp = sub.add_parser("compare", help="сравнить два отчёта")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("--threshold", type=float, default=0.2)
+
+    p_gen = sub.add_parser("generate", help="только сгенерировать книгу")
+    p_gen.add_argument("--rows", type=int, default=10_000)
+    p_gen.add_argument("--styles", action="store_true")
+    p_gen.add_argument("--out")
+    _add_spec_args(p_gen)
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "generate":
+        spec = WorkbookSpec(rows=args.rows, styles=args.styles, **_spec_kwargs(args))
+        print(generate(spec, args.out))
+        return 0
+
+    if args.cmd == "compare":
+        rows = report.compare(report.load(args.baseline), report.load(args.current), args.threshold)
+        print(report.format_table(rows))
+        return 1 if any(r["regression"] for r in rows) else 0
+
+    result = run_suite(
+        sizes=tuple(args.sizes),
+        names=args.only,
+        repeat=args.repeat,
+        memory=not args.no_memory,
+        spec_kwargs=_spec_kwargs(args),
+        progress=lambda r: print(report.format_table([dict(vars(r))]), flush=True),
+    )
+    print(f"-> {report.save(result, args.out)}")
+    if args.baseline:
+        rows = report.compare(report.load(args.baseline), result, args.threshold)
+        print(report.format_table(rows))
+        return 1 if any(r["regression"] for r in rows) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Детерминированный генератор книг для бенчмарков.
+
+Одинаковые параметры (и seed) всегда дают одинаковое содержимое, поэтому
+результаты разных запусков сравнимы. Книга пишется write-only, так что
+генерация миллиона строк не держит весь лист в памяти.
+"""
+
+import random
+import tempfile
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill
+
+DEFAULT_DIR = Path(tempfile.gettempdir()) / "excel_manager_bench"
+
+STATUSES = ["Готово", "Отменено", "Черновик", "В работе", ""]
+
+
+@dataclass(frozen=True)
+class WorkbookSpec:
+    rows: int = 10_000  # строк данных
+    cols: int = 12  # колонок (минимум 4: статус, регион, сумма, дата)
+    cardinality: int = 1_000  # различных строк в текстовых колонках
+    empty_ratio: float = 0.02  # доля полностью пустых строк
+    styles: bool = False  # шрифт/заливка у части ячеек
+    title_rows: int = 2  # строки над заголовком (заголовок ищется не в первой строке)
+    seed: int = 42
+    sheet: str = "Данные"
+
+    @property
+    def file_name(self) -> str:
+        return (f"bench_r{self.rows}_c{self.cols}_k{self.cardinality}_e{self.empty_ratio:g}"
+                f"_s{int(self.styles)}_t{self.title_rows}_{self.seed}.xlsx")
+
+    def headers(self) -> list[str]:
+        fixed = ["Статус", "Регион", "Сумма", "Дата"]
+        return fixed + [f"Колонка{i}" for i in range(len(fixed) + 1, max(self.cols, len(fixed)) + 1)]
+
+
+def _row(rnd: random.Random, spec: WorkbookSpec, words: list[str], base: datetime) -> list[Any]:
+    row: list[Any] = [
+        rnd.choice(STATUSES),
+        words[rnd.randrange(min(len(words), 50))],
+        round(rnd.uniform(0, 100_000), 2),
+        base + timedelta(days=rnd.randrange(1_000)),
+    ]
+    for i in range(4, max(spec.cols, 4)):
+        kind = i % 3
+        if kind == 0:
+            row.append(words[rnd.randrange(len(words))])
+        elif kind == 1:
+            row.append(rnd.randrange(1_000_000))
+        else:
+            row.append(None if rnd.random() < 0.1 else rnd.random())
+    return row
+
+
+def generate(spec: WorkbookSpec, path: Optional[Union[str, Path]] = None) -> Path:
+    """Создаёт книгу по spec и возвращает путь."""
+    path = Path(path) if path else DEFAULT_DIR / spec.file_name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rnd = random.Random(spec.seed)
+    words = [f"значение_{i:06d}" for i in range(max(spec.cardinality, 1))]
+    base = datetime(2024, 1, 1)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(spec.sheet)
+    fonts = [Font(bold=True), Font(italic=True, color="FF0000")]
+    fills = [PatternFill("solid", fgColor="FFFF00"), PatternFill("solid", fgColor="DDEBF7")]
+
+    for i in range(spec.title_rows):
+        ws.append([f"Отчёт, часть {i + 1}"] if i == 0 else [])
+    ws.append(spec.headers())
+    for _ in range(spec.rows):
+        if rnd.random() < spec.empty_ratio:
+            ws.append([])
+            continue
+        row = _row(rnd, spec, words, base)
+        if spec.styles and rnd.random() < 0.3:
+            cells = []
+            for j, v in enumerate(row):
+                cell = WriteOnlyCell(ws, value=v)
+                if j % 2 == 0:
+                    cell.font = fonts[j % len(fonts)]
+                else:
+                    cell.fill = fills[j % len(fills)]
+                cells.append(cell)
+            row = cells
+        ws.append(row)
+    wb.save(path)
+    return path
+
+
+def ensure(spec: WorkbookSpec, directory: Optional[Union[str, Path]] = None) -> Path:
+    """Путь к книге spec: генерирует её, только если такой книги ещё нет."""
+    path = (Path(directory) if directory else DEFAULT_DIR) / spec.file_name
+    if not path.exists():
+        generate(spec, path)
+    return path
+
+
+def describe(spec: WorkbookSpec) -> dict[str, Any]:
+    return asdict(spec)
@@ -0,0 +1,70 @@
+"""
+Сохранение результатов бенчмарков и сравнение с базовым прогоном.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Union
+
+
+def save(report: dict[str, Any], path: Union[str, Path]) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def load(path: Union[str, Path]) -> dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(
+    baseline: dict[str, Any],
+    current: dict[str, Any],
+    threshold: float = 0.2,
+) -> list[dict[str, Any]]:
+    """Сравнение по (name, rows). ratio = текущее / базовое (для времени и памяти).
+    regression=True, если время или память выросли больше чем на threshold (0.2 = 20%).
+    Бенчмарки, которых нет в одном из отчётов, пропускаются.
+    """
+    base = {(r["name"], r["rows"]): r for r in baseline.get("results", [])}
+    out = []
+    for r in current.get("results", []):
+        b = base.get((r["name"], r["rows"]))
+        if b is None:
+            continue
+        time_ratio = r["seconds"] / b["seconds"] if b["seconds"] else None
+        mem_ratio = None
+        if r.get("peak_mb") is not None and b.get("peak_mb"):
+            mem_ratio = r["peak_mb"] / b["peak_mb"]
+        regression = any(x is not None and x > 1 + threshold for x in (time_ratio, mem_ratio))
+        out.append({
+            "name": r["name"],
+            "rows": r["rows"],
+            "seconds": r["seconds"],
+            "base_seconds": b["seconds"],
+            "time_ratio": time_ratio,
+            "peak_mb": r.get("peak_mb"),
+            "base_peak_mb": b.get("peak_mb"),
+            "mem_ratio": mem_ratio,
+            "regression": regression,
+        })
+    return out
+
+
+def format_table(rows: list[dict[str, Any]]) -> str:
+    """Таблица для консоли (результаты run_suite или compare)."""
+    def fmt(v: Any, spec: str) -> str:
+        return "-" if v is None else format(v, spec)
+
+    lines = []
+    for r in rows:
+        line = f"{r['name']:<22}{r['rows']:>10}  {fmt(r['seconds'], '9.3f')} s  {fmt(r.get('peak_mb'), '8.1f')} MB"
+        if "time_ratio" in r:
+            line += f"  x{fmt(r['time_ratio'], '.2f')} time  x{fmt(r['mem_ratio'], '.2f')} mem"
+            if r["regression"]:
+                line += "  REGRESSION"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,218 @@
+"""
+Бенчмарки горячих путей ExcelManager.
+
+Каждый бенчмарк — функция (данные из setup, workdir); по умолчанию данные — путь к книге.
+Подготовка (например, чтение строк для filter_rows или перенос данных перед
+transfer_styles) делается в setup(путь к книге, workdir) и в замер не входит.
+Время меряется отдельными прогонами без tracemalloc, пиковая память — ещё одним
+прогоном под tracemalloc (он заметно замедляет код).
+"""
+
+import gc
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import openpyxl
+
+from bench.generator import DEFAULT_DIR, WorkbookSpec, ensure
+from bench.reference_filters import filter_rows_reference
+from core.excel_manager import ExcelManager
+from core.row_filters import compile_rules, filter_rows
+
+SIZES = (10_000, 100_000, 1_000_000)
+
+RULES = {
+    "Статус": {"equals": ["Отменено", "Черновик"], "empty": True},
+    "Регион": {"contains": ["_00001"]},
+}
+COLUMNS = ["Статус", "Регион", "Сумма", "Дата"]
+
+# правила на каждую колонку книги (как в отчёте о компиляции правил): equals, contains,
+# regex, empty и mode="and"; большинство строк проходит все проверки
+WIDE_RULES = [
+    {"equals": ["Отменено", "Черновик"]},
+    {"contains": ["_00001", "xyz"]},
+    {"regex": [r"^\d{7}$"]},
+    {"not_equals": ["zzz"], "empty": False, "mode": "and"},
+    {"equals": ["nope"], "contains": ["qq"]},
+]
+
+
+@dataclass
+class BenchResult:
+    name: str
+    rows: int  # размер книги (строк данных по spec)
+    seconds: float  # лучшее время из repeat прогонов
+    peak_mb: Optional[float]  # пик tracemalloc, МБ (None — память не мерили)
+
+    @property
+    def rows_per_s(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class Benchmark:
+    name: str
+    run: Callable[[Any, Path], Any]  # (подготовленные данные, workdir)
+    setup: Callable[[Path, Path], Any] = lambda path, workdir: path
+    styles: bool = False  # нужна книга со стилями
+
+
+def _init(path: Path, workdir: Path) -> None:
+    ExcelManager(path)
+
+
+def _setup_header(path: Path, workdir: Path) -> tuple[Path, int]:
+    # строка заголовка книги (над ней title_rows строк) — находим один раз, вне замера
+    return path, ExcelManager(path).header.row_idx
+
+
+def _build_header(data: tuple[Path, int], workdir: Path) -> None:
+    # новый менеджер на каждый прогон: заданная строка заголовка читается с листа,
+    # а не из буфера прошлого прогона; разница с init — цена поиска заголовка
+    path, header_row = data
+    ExcelManager(path, header_row=header_row)
+
+
+def _data_rows(path: Path, workdir: Path) -> None:
+    ExcelManager(path).data_rows()
+
+
+def _setup_filter(path: Path, workdir: Path) -> tuple[list, Any]:
+    em = ExcelManager(path)
+    return em.data_rows(), compile_rules(em._idx_rules(RULES))
+
+
+def _filter_rows(data: tuple[list, Any], workdir: Path) -> None:
+    rows, compiled = data
+    filter_rows(rows, compiled)
+
+
+def _setup_filter_wide(path: Path, workdir: Path) -> tuple[list, dict[int, dict[str, Any]]]:
+    em = ExcelManager(path)
+    rows = em.data_rows()
+    return rows, {i: WIDE_RULES[i % len(WIDE_RULES)] for i in range(len(em.header.names))}
+
+
+def _filter_rows_wide(data: tuple[list, dict], workdir: Path) -> None:
+    rows, rules = data
+    filter_rows(rows, rules)  # компиляция правил входит в замер
+
+
+def _filter_rows_reference(data: tuple[list, dict], workdir: Path) -> None:
+    rows, rules = data
+    filter_rows_reference(rows, rules)
+
+
+def _copy_columns(path: Path, workdir: Path) -> None:
+    dest = workdir / "copy_columns.xlsx"
+    dest.unlink(missing_ok=True)
+    ExcelManager(path).copy_columns(dest, "Out", COLUMNS)
+
+
+def _filter_and_transfer(path: Path, workdir: Path) -> None:
+    dest = workdir / "filter_and_transfer.xlsx"
+    dest.unlink(missing_ok=True)
+    ExcelManager(path).filter_and_transfer(dest, "Out", COLUMNS, RULES)
+
+
+def _copy_columns_styles(path: Path, workdir: Path) -> None:
+    dest = workdir / "copy_columns_styles.xlsx"
+    dest.unlink(missing_ok=True)
+    ExcelManager(path, read_only=False).copy_columns(dest, "Out", COLUMNS, styles=True)
+
+
+def _setup_transfer_styles(path: Path, workdir: Path) -> tuple[ExcelManager, Path]:
+    # данные переносятся заранее, исходная книга со стилями уже загружена: в замере —
+    # только transfer_styles (StyleTransfer с интернированием и схлопыванием стилей,
+    # плюс загрузка и сохранение целевой книги)
+    dest = workdir / "transfer_styles.xlsx"
+    dest.unlink(missing_ok=True)
+    em = ExcelManager(path, read_only=False)
+    em.copy_columns(dest, "Out", COLUMNS)
+    em.wb
+    return em, dest
+
+
+def _transfer_styles(data: tuple[ExcelManager, Path], workdir: Path) -> None:
+    em, dest = data
+    em.transfer_styles(dest, "Out", COLUMNS)
+
+
+BENCHMARKS = [
+    Benchmark("init", _init),
+    Benchmark("build_header", _build_header, setup=_setup_header),
+    Benchmark("data_rows", _data_rows),
+    Benchmark("filter_rows", _filter_rows, setup=_setup_filter),
+    Benchmark("filter_rows_wide", _filter_rows_wide, setup=_setup_filter_wide),
+    Benchmark("filter_rows_reference", _filter_rows_reference, setup=_setup_filter_wide),
+    Benchmark("copy_columns", _copy_columns),
+    Benchmark("filter_and_transfer", _filter_and_transfer),
+    Benchmark("copy_columns_styles", _copy_columns_styles, styles=True),
+    Benchmark("transfer_styles", _transfer_styles, setup=_setup_transfer_styles, styles=True),
+]
+
+
+def _measure(bench: Benchmark, data: Any, workdir: Path, repeat: int, memory: bool) -> tuple[float, Optional[float]]:
+    best = float("inf")
+    for _ in range(max(repeat, 1)):
+        gc.collect()
+        t0 = time.perf_counter()
+        bench.run(data, workdir)
+        best = min(best, time.perf_counter() - t0)
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            bench.run(data, workdir)
+            peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return best, peak
+
+
+def run_suite(
+    sizes: tuple[int, ...] = SIZES,
+    names: Optional[list[str]] = None,
+    repeat: int = 1,
+    memory: bool = True,
+    workdir: Optional[Path] = None,
+    spec_kwargs: Optional[dict[str, Any]] = None,
+    progress: Optional[Callable[[BenchResult], None]] = None,
+) -> dict[str, Any]:
+    """Прогон бенчмарков; результат — словарь для JSON (см. report.compare)."""
+    workdir = Path(workdir) if workdir else DEFAULT_DIR / "out"
+    workdir.mkdir(parents=True, exist_ok=True)
+    selected = [b for b in BENCHMARKS if names is None or b.name in names]
+
+    results: list[BenchResult] = []
+    for size in sizes:
+        for bench in selected:
+            spec = WorkbookSpec(rows=size, styles=bench.styles, **(spec_kwargs or {}))
+            path = ensure(spec)
+            data = bench.setup(path, workdir)
+            seconds, peak = _measure(bench, data, workdir, repeat, memory)
+            res = BenchResult(bench.name, size, seconds, peak)
+            results.append(res)
+            if progress is not None:
+                progress(res)
+            del data
+
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "openpyxl": openpyxl.__version__,
+            "repeat": repeat,
+            "spec": spec_kwargs or {},
+        },
+        "results": [dict(asdict(r), rows_per_s=r.rows_per_s) for r in results],
+    }
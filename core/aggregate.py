@@ -0,0 +1,229 @@
+"""
+Группировка и агрегаты за один потоковый проход по строкам.
+
+Метрика задаётся как "count" (число строк группы) или парой (функция, колонка):
+  count   — непустые значения колонки
+  sum     — сумма числовых значений (строки и пустые пропускаются; нет чисел — None)
+  mean    — среднее числовых значений
+  min/max — наименьшее / наибольшее значение; как и sum, среди чисел, а если чисел
+            в группе нет — среди дат (date и datetime вместе), затем времени, затем строк
+  nunique — число различных непустых значений (хранит множество значений группы)
+
+На группу хранится только по одному аккумулятору на метрику, сами строки
+не накапливаются.
+"""
+
+from datetime import date, datetime, time
+from numbers import Number
+from typing import Any, Iterable, Optional, Sequence, Union
+
+MetricSpec = Union[str, tuple[str, Any]]
+
+
+def _is_number(v: Any) -> bool:
+    return isinstance(v, Number) and not isinstance(v, bool)
+
+
+# порядок, в котором выбираются сравнимые между собой значения для min/max
+_ORDER_NUMBER, _ORDER_DATE, _ORDER_TIME, _ORDER_STR = range(4)
+
+
+def _order_key(v: Any) -> Optional[tuple[int, Any]]:
+    """(группа сравнимых значений, ключ сравнения) или None для значений вне групп."""
+    if _is_number(v):
+        return _ORDER_NUMBER, v
+    if isinstance(v, datetime):
+        return _ORDER_DATE, v.replace(tzinfo=None)
+    if isinstance(v, date):
+        return _ORDER_DATE, datetime(v.year, v.month, v.day)
+    if isinstance(v, time):
+        return _ORDER_TIME, v.replace(tzinfo=None)
+    if isinstance(v, str) and v.strip():
+        return _ORDER_STR, v
+    return None
+
+
+class _Count:
+    __slots__ = ("n",)
+
+    def __init__(self):
+        self.n = 0
+
+    def add(self, v: Any) -> None:
+        if v is not None and v != "":
+            self.n += 1
+
+    def result(self) -> int:
+        return self.n
+
+
+class _CountRows(_Count):
+    __slots__ = ()
+
+    def add(self, v: Any) -> None:
+        self.n += 1
+
+
+class _Sum:
+    __slots__ = ("total", "n")
+
+    def __init__(self):
+        self.total = 0
+        self.n = 0
+
+    def add(self, v: Any) -> None:
+        if _is_number(v):
+            self.total += v
+            self.n += 1
+
+    def result(self) -> Any:
+        return self.total if self.n else None
+
+
+class _Mean(_Sum):
+    __slots__ = ()
+
+    def result(self) -> Optional[float]:
+        return self.total / self.n if self.n else None
+
+
+class _Min:
+    __slots__ = ("key", "value")
+
+    def __init__(self):
+        self.key: Optional[tuple[int, Any]] = None
+        self.value = None
+
+    def _better(self, key: tuple[int, Any]) -> bool:
+        return key < self.key
+
+    def add(self, v: Any) -> None:
+        if v is None:
+            return
+        key = _order_key(v)
+        if key is not None and (self.key is None or key[0] < self.key[0]
+                                or (key[0] == self.key[0] and self._better(key))):
+            self.key = key
+            self.value = v
+
+    def result(self) -> Any:
+        return self.value
+
+
+class _Max(_Min):
+    __slots__ = ()
+
+    def _better(self, key: tuple[int, Any]) -> bool:
+        return key > self.key
+
+
+class _NUnique:
+    __slots__ = ("seen",)
+
+    def __init__(self):
+        self.seen: set = set()
+
+    def add(self, v: Any) -> None:
+        if v is not None and v != "":
+            self.seen.add(v)
+
+    def result(self) -> int:
+        return len(self.seen)
+
+
+METRICS = {
+    "count": _Count,
+    "sum": _Sum,
+    "mean": _Mean,
+    "min": _Min,
+    "max": _Max,
+    "nunique": _NUnique,
+}
+
+
+def parse_metric(name: str, spec: MetricSpec) -> tuple[str, Any]:
+    """Метрика -> (функция, колонка или None для "count" без колонки)."""
+    if isinstance(spec, str):
+        func, col = spec, None
+    else:
+        func, col = spec
+    func = func.lower()
+    if func not in METRICS:
+        raise ValueError(f"Неизвестная метрика '{func}' ({name}). Доступны: {', '.join(METRICS)}")
+    if col is None and func != "count":
+        raise ValueError(f"Для метрики '{func}' ({name}) нужна колонка: ('{func}', <колонка>)")
+    return func, col
+
+
+class Aggregation:
+    """Результат aggregate: группы в порядке первого появления.
+
+    group_names  : заголовки колонок группировки
+    metric_names : имена метрик (ключи metrics)
+    groups       : ключ группы (кортеж значений) -> значения метрик
+    """
+
+    def __init__(self, group_names: list[Any], metric_names: list[str], groups: dict[tuple, list[Any]]):
+        self.group_names = group_names
+        self.metric_names = metric_names
+        self.groups = groups
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    def get(self, key: Any, metric: str) -> Any:
+        """Значение метрики для группы (для одной колонки группировки — просто значение)."""
+        key = key if isinstance(key, tuple) else (key,)
+        values = self.groups.get(key)
+        return None if values is None else values[self.metric_names.index(metric)]
+
+    def rows(self, include_header: bool = True) -> list[list[Any]]:
+        """Плоская таблица: колонки группировки, затем метрики."""
+        out = [list(self.group_names) + list(self.metric_names)] if include_header else []
+        out.extend(list(key) + values for key, values in self.groups.items())
+        return out
+
+    def pivot(self, columns: Any, metric: str, include_header: bool = True) -> list[list[Any]]:
+        """Сводная таблица: значения колонки группировки `columns` разворачиваются в колонки,
+        в ячейках — метрика `metric`; остальные колонки группировки остаются строками.
+        """
+        if columns in self.group_names:
+            pos = self.group_names.index(columns)
+        elif isinstance(columns, int) and 0 <= columns < len(self.group_names):
+            pos = columns
+        else:
+            raise KeyError(f"'{columns}' нет среди колонок группировки {self.group_names}")
+        m = self.metric_names.index(metric)
+
+        spread: dict[Any, int] = {}
+        table: dict[tuple, dict[Any, Any]] = {}
+        for key, values in self.groups.items():
+            spread.setdefault(key[pos], len(spread))
+            row_key = key[:pos] + key[pos + 1:]
+            table.setdefault(row_key, {})[key[pos]] = values[m]
+
+        row_names = self.group_names[:pos] + self.group_names[pos + 1:]
+        out = [list(row_names) + list(spread)] if include_header else []
+        for row_key, cells in table.items():
+            out.append(list(row_key) + [cells.get(v) for v in spread])
+        return out
+
+
+def aggregate_rows(
+    rows: Iterable[Sequence[Any]],
+    group_idx: Sequence[int],
+    metrics: Sequence[tuple[str, Optional[int]]],
+) -> dict[tuple, list[Any]]:
+    """Один проход по rows: ключ группы -> результаты метрик (func, 0-based колонка или None)."""
+    factories = [_CountRows if idx is None else METRICS[func] for func, idx in metrics]
+    indices = [idx for _, idx in metrics]
+    groups: dict[tuple, list[Any]] = {}
+    for row in rows:
+        n = len(row)
+        key = tuple(row[i] if i < n else None for i in group_idx)
+        accs = groups.get(key)
+        if accs is None:
+            accs = groups[key] = [f() for f in factories]
+        for acc, idx in zip(accs, indices):
+            acc.add(None if idx is None or idx >= n else row[idx])
+    return {key: [acc.result() for acc in accs] for key, accs in groups.items()}
@@ -0,0 +1,315 @@
+"""
+Асинхронный фасад ExcelManager для asyncio-сервисов.
+
+Разбор книги, чтение строк и запись выполняются в пуле потоков, событийный цикл
+при этом не блокируется:
+
+    em = await AsyncExcelManager.open("upload.xlsx", sheet="Данные")
+    async for row in em.iter_rows(rules={"Статус": {"equals": ["Отменено"]}}):
+        ...
+    await em.filter_and_transfer("out.xlsx", "Лист1", ["ФИО", "Сумма"], rules={...})
+
+WorkbookLimiter ограничивает число одновременных операций с книгами (по умолчанию
+один лимит на событийный цикл, общий для всех менеджеров): лишние операции ждут
+свободного места в await, а не копятся в очереди пула. Операции одного менеджера
+выполняются по очереди (ExcelManager не потокобезопасен).
+
+Отмена: ожидающая корутина получает CancelledError сразу. Потоковые операции
+(iter_rows, copy_columns, filter_and_transfer, export) проверяют флаг отмены на
+каждой строке и прерываются, не записав результат; остальные операции доработают
+в потоке, результат будет отброшен. Место в лимите освобождается, только когда
+поток действительно закончил работу.
+"""
+
+import asyncio
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, Optional, Union
+
+from core.excel_manager import ExcelManager, StrOrInt
+from core.row_filters import CompiledRules
+
+DEFAULT_MAX_WORKBOOKS = 4
+DEFAULT_CHUNK_ROWS = 1_000
+
+RulesArg = Optional[Union[dict[StrOrInt, dict[str, Any]], CompiledRules]]
+
+
+class _Stopped(Exception):
+    """Операция в потоке прервана из-за отмены корутины."""
+
+
+def _checked(rows: Iterable[list[Any]], stop: threading.Event) -> Iterator[list[Any]]:
+    """Поток строк, прерывающийся при установке stop."""
+    for row in rows:
+        if stop.is_set():
+            raise _Stopped
+        yield row
+
+
+class WorkbookLimiter:
+    """Лимит одновременных операций с книгами и пул потоков под них.
+
+    max_workbooks : сколько операций (открытие, чтение, запись) выполняется одновременно;
+                    столько же потоков в пуле, поэтому очередь пула не растёт
+    """
+
+    def __init__(self, max_workbooks: int = DEFAULT_MAX_WORKBOOKS):
+        if max_workbooks < 1:
+            raise ValueError("max_workbooks должен быть положительным")
+        self.max_workbooks = max_workbooks
+        self._executor = ThreadPoolExecutor(max_workers=max_workbooks, thread_name_prefix="excel")
+        self._slots = asyncio.Semaphore(max_workbooks)
+
+    def slot(self, lock: Optional[asyncio.Lock] = None) -> "_Slot":
+        """Контекст `async with limiter.slot(lock) as slot:` — место в лимите (и lock, если задан)
+        на время серии вызовов slot.run(...)."""
+        return _Slot(self, lock)
+
+    async def run(self, fn: Callable[..., Any], *args: Any, stop: Optional[threading.Event] = None) -> Any:
+        """Выполнить fn(*args) в пуле, заняв одно место в лимите."""
+        async with self.slot() as slot:
+            return await slot.run(fn, *args, stop=stop)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+class _Slot:
+    """Занятое место в лимите. Вызовы run идут последовательно; при выходе место
+    (и lock) освобождаются после завершения последнего запущенного в потоке вызова."""
+
+    def __init__(self, limiter: WorkbookLimiter, lock: Optional[asyncio.Lock]):
+        self.limiter = limiter
+        self.lock = lock
+        self._last: Optional[Future] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def __aenter__(self) -> "_Slot":
+        self._loop = asyncio.get_running_loop()
+        if self.lock is not None:
+            await self.lock.acquire()
+        try:
+            await self.limiter._slots.acquire()
+        except BaseException:
+            if self.lock is not None:
+                self.lock.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        last = self._last
+        if last is None or last.done():
+            self._release()
+        else:
+            # поток ещё работает (корутину отменили) — место освободится, когда он закончит
+            last.add_done_callback(self._release_from_thread)
+
+    def _release(self) -> None:
+        self.limiter._slots.release()
+        if self.lock is not None:
+            self.lock.release()
+
+    def _release_from_thread(self, _: Future) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._release)
+        except RuntimeError:  # цикл уже закрыт — освобождать некому
+            pass
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        self._last = self.limiter._executor.submit(fn, *args)
+        return self._last
+
+    async def run(self, fn: Callable[..., Any], *args: Any, stop: Optional[threading.Event] = None) -> Any:
+        return await self.wait(self.submit(fn, *args), stop)
+
+    @staticmethod
+    async def wait(future: Future, stop: Optional[threading.Event] = None) -> Any:
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if stop is not None:
+                stop.set()
+            raise
+
+
+_default_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, WorkbookLimiter]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def default_limiter() -> WorkbookLimiter:
+    """Общий лимит текущего событийного цикла (DEFAULT_MAX_WORKBOOKS операций)."""
+    loop = asyncio.get_running_loop()
+    limiter = _default_limiters.get(loop)
+    if limiter is None:
+        limiter = _default_limiters[loop] = WorkbookLimiter()
+    return limiter
+
+
+class AsyncExcelManager:
+    """Асинхронная обёртка над ExcelManager (создаётся через `await AsyncExcelManager.open(...)`).
+
+    manager : исходный ExcelManager; его можно использовать и напрямую, но не
+              одновременно с операциями фасада
+    limiter : WorkbookLimiter; по умолчанию — общий лимит событийного цикла
+    """
+
+    def __init__(self, manager: ExcelManager, limiter: Optional[WorkbookLimiter] = None):
+        self.manager = manager
+        self._limiter = limiter
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    async def open(
+        cls,
+        path: Union[str, Path],
+        *,
+        limiter: Optional[WorkbookLimiter] = None,
+        **kwargs: Any,
+    ) -> "AsyncExcelManager":
+        """Открыть книгу и найти заголовок в пуле потоков; kwargs — как у ExcelManager."""
+        limiter = limiter or default_limiter()
+        manager = await limiter.run(lambda: ExcelManager(path, **kwargs))
+        return cls(manager, limiter)
+
+    @property
+    def limiter(self) -> WorkbookLimiter:
+        if self._limiter is None:
+            self._limiter = default_limiter()
+        return self._limiter
+
+    @property
+    def path(self) -> Path:
+        return self.manager.path
+
+    @property
+    def header(self):
+        return self.manager.header
+
+    def headers(self, as_indexed: bool = False) -> list:
+        return self.manager.headers(as_indexed)
+
+    async def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Выполнить fn(manager, *args, **kwargs) в пуле — для методов ExcelManager,
+        у которых нет асинхронной обёртки: `await em.call(ExcelManager.build_index, "Код")`."""
+        async with self.limiter.slot(self._lock) as slot:
+            return await slot.run(lambda: fn(self.manager, *args, **kwargs))
+
+    async def _streamed(self, work: Callable[[threading.Event], Any]) -> Any:
+        """work(stop) в пуле; stop устанавливается при отмене корутины."""
+        stop = threading.Event()
+        async with self.limiter.slot(self._lock) as slot:
+            return await slot.run(work, stop, stop=stop)
+
+    async def iter_rows(
+        self,
+        rules: RulesArg = None,
+        columns: Optional[list[StrOrInt]] = None,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    ) -> AsyncIterator[list[Any]]:
+        """Строки данных (как iter_data_rows), читаемые в потоке порциями по chunk_rows.
+        Следующая порция читается, пока обрабатывается текущая; дальше чтение не уходит,
+        так что в памяти не больше двух порций. Пока идёт перебор, другие операции
+        этого менеджера ждут (внутри `async for` их вызывать нельзя); при выходе из
+        цикла раньше времени место освобождается при закрытии генератора, надёжнее
+        всего — через `async with contextlib.aclosing(em.iter_rows(...)) as rows:`.
+        """
+        if chunk_rows < 1:
+            raise ValueError("chunk_rows должен быть положительным")
+        async with self.limiter.slot(self._lock) as slot:
+            rows = await slot.run(lambda: self.manager.iter_data_rows(rules, columns=columns))
+            pending = slot.submit(lambda: list(islice(rows, chunk_rows)))
+            while True:
+                chunk = await slot.wait(pending)
+                if not chunk:
+                    return
+                pending = slot.submit(lambda: list(islice(rows, chunk_rows)))
+                for row in chunk:
+                    yield row
+
+    async def data_rows(self, rules: Optional[dict[int, dict[str, Any]]] = None) -> list[list[Any]]:
+        return await self.call(ExcelManager.data_rows, rules)
+
+    async def filter(self, rules: dict[StrOrInt, dict[str, Any]]) -> list[list[Any]]:
+        return await self.call(ExcelManager.filter, rules)
+
+    async def count_rows(self) -> int:
+        return await self.call(ExcelManager.count_rows)
+
+    def _stream_dest(self, dest_path: Optional[Union[str, Path]]) -> Optional[Path]:
+        """Куда писать, если строки можно читать потоково; None — если пишем в исходный файл."""
+        dest = Path(dest_path) if dest_path else self.manager.path
+        return None if self.manager._is_self_path(dest) else dest
+
+    async def copy_columns(
+        self,
+        dest_path: Optional[Union[str, Path]],
+        dest_sheet: str,
+        columns: list[StrOrInt],
+        include_header: bool = True,
+        start_cell: str = "A1",
+        stream: bool = False,
+        styles: bool = False,
+    ) -> Path:
+        """Как ExcelManager.copy_columns; без styles отмена прерывает чтение строк."""
+        em = self.manager
+
+        def work(stop: threading.Event) -> Path:
+            dest = self._stream_dest(dest_path)
+            if dest is None or styles:
+                return em.copy_columns(dest_path, dest_sheet, columns, None, include_header,
+                                       start_cell, stream, styles)
+            rows = _checked(em.iter_data_rows(columns=columns), stop)
+            return em.copy_columns(dest, dest_sheet, columns, rows, include_header, start_cell, stream)
+
+        return await self._streamed(work)
+
+    async def filter_and_transfer(
+        self,
+        dest_path: Optional[Union[str, Path]],
+        dest_sheet: str,
+        columns: list[StrOrInt],
+        rules: Union[dict[StrOrInt, dict[str, Any]], CompiledRules],
+        include_header: bool = True,
+        start_cell: str = "A1",
+        stream: bool = False,
+        styles: bool = False,
+        incremental: bool = False,
+    ) -> Path:
+        """Как ExcelManager.filter_and_transfer; без styles/incremental отмена прерывает чтение."""
+        em = self.manager
+
+        def work(stop: threading.Event) -> Path:
+            dest = self._stream_dest(dest_path)
+            if dest is None or styles or incremental:
+                return em.filter_and_transfer(dest_path, dest_sheet, columns, rules, None, include_header,
+                                              start_cell, stream, styles, incremental)
+            # фильтр применяется при чтении, дальше — обычный перенос колонок
+            rows = _checked(em.iter_data_rows(rules, columns=columns), stop)
+            return em.copy_columns(dest, dest_sheet, columns, rows, include_header, start_cell, stream)
+
+        return await self._streamed(work)
+
+    async def export(
+        self,
+        dest_path: Union[str, Path],
+        columns: Optional[list[StrOrInt]] = None,
+        rules: RulesArg = None,
+        **kwargs: Any,
+    ) -> Path:
+        """Как ExcelManager.export (kwargs — include_header, fmt, delimiter, ...)."""
+        em = self.manager
+
+        def work(stop: threading.Event) -> Path:
+            rows = _checked(em.iter_data_rows(rules, columns=columns), stop)
+            return em.export(dest_path, columns, rows=rows, **kwargs)
+
+        return await self._streamed(work)
+
+    async def aggregate(self, group_by: Any, metrics: Any, **kwargs: Any):
+        """Как ExcelManager.aggregate."""
+        return await self.call(ExcelManager.aggregate, group_by, metrics, **kwargs)
@@ -0,0 +1,142 @@
+"""
+Пакетная обработка множества однотипных книг в пуле процессов.
+
+Каждый файл читается, ищется заголовок и применяется фильтр в отдельном
+процессе; в родительский процесс возвращаются только нужные колонки
+отфильтрованных строк (кортежами). Ошибка в одном файле не прерывает
+обработку остальных — она сохраняется в результате этого файла.
+
+Порядок результатов всегда совпадает с порядком paths, независимо от того,
+какой процесс закончил раньше.
+"""
+
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional, Union
+
+if TYPE_CHECKING:
+    from core.excel_manager import ExcelManager, StrOrInt
+
+
+@dataclass
+class FileResult:
+    path: Path
+    header: list[Any] = field(default_factory=list)  # заголовки выбранных колонок
+    rows: list[tuple[Any, ...]] = field(default_factory=list)
+    error: Optional[str] = None  # "ТипОшибки: сообщение", если файл не обработан
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchResult:
+    files: list[FileResult]  # в порядке исходного списка путей
+    dest_path: Optional[Path] = None  # куда записан объединённый результат
+
+    @property
+    def errors(self) -> dict[Path, str]:
+        """Файлы, которые не удалось обработать: путь -> ошибка."""
+        return {f.path: f.error for f in self.files if f.error is not None}
+
+    def rows(self) -> Iterator[tuple[Any, ...]]:
+        """Строки всех успешно обработанных файлов подряд."""
+        for f in self.files:
+            yield from f.rows
+
+
+def _process_file(
+    manager_cls: type["ExcelManager"],
+    path: Path,
+    sheet: Any,
+    rules: Optional[dict["StrOrInt", dict[str, Any]]],
+    columns: Optional[list["StrOrInt"]],
+    manager_kwargs: dict[str, Any],
+) -> FileResult:
+    """Обработка одного файла (выполняется в дочернем процессе)."""
+    try:
+        with manager_cls(path, sheet=sheet, **manager_kwargs) as em:
+            if columns is None:
+                col_indices = list(range(len(em.header.names)))
+            else:
+                col_indices = [em.col_to_idx(c) for c in columns]
+            src_rows = em.iter_data_rows(rules, columns=columns)
+            rows = [tuple(r[i] if i < len(r) else None for i in col_indices) for r in src_rows]
+            return FileResult(path=path, header=em._header_for(col_indices), rows=rows)
+    except Exception as e:  # noqa: BLE001 — ошибка файла попадает в результат
+        return FileResult(path=path, error=f"{type(e).__name__}: {e}")
+
+
+def _results(
+    manager_cls: type["ExcelManager"],
+    paths: list[Path],
+    sheet: Any,
+    rules: Optional[dict["StrOrInt", dict[str, Any]]],
+    columns: Optional[list["StrOrInt"]],
+    workers: int,
+    manager_kwargs: dict[str, Any],
+) -> Iterator[FileResult]:
+    """Результаты по файлам в порядке paths, по мере готовности."""
+    args = [(manager_cls, p, sheet, rules, columns, manager_kwargs) for p in paths]
+    if workers <= 1 or len(paths) <= 1:
+        for a in args:
+            yield _process_file(*a)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures: list[Future] = [pool.submit(_process_file, *a) for a in args]
+        for p, fut in zip(paths, futures):
+            try:
+                yield fut.result()
+            except Exception as e:  # noqa: BLE001 — например, упавший процесс пула
+                yield FileResult(path=p, error=f"{type(e).__name__}: {e}")
+
+
+def map_files(
+    manager_cls: type["ExcelManager"],
+    paths: Iterable[Union[str, Path]],
+    sheet: Union[str, int, Iterable[str]] = 0,
+    rules: Optional[dict["StrOrInt", dict[str, Any]]] = None,
+    columns: Optional[list["StrOrInt"]] = None,
+    workers: Optional[int] = None,
+    dest_path: Optional[Union[str, Path]] = None,
+    dest_sheet: str = "Sheet1",
+    include_header: bool = True,
+    source_column: Optional[str] = None,
+    start_cell: str = "A1",
+    stream: bool = False,
+    **manager_kwargs: Any,
+) -> BatchResult:
+    """Реализация ExcelManager.map_files (см. описание там)."""
+    paths = [Path(p) for p in paths]
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    results = _results(manager_cls, paths, sheet, rules, columns, workers, manager_kwargs)
+
+    if dest_path is None:
+        return BatchResult(files=list(results))
+
+    files: list[FileResult] = []
+
+    def merged() -> Iterator[list[Any]]:
+        header_written = not include_header
+        for res in results:
+            files.append(res)
+            if not res.ok:
+                continue
+            if not header_written:
+                yield res.header + ([source_column] if source_column else [])
+                header_written = True
+            if source_column:
+                name = res.path.name
+                for r in res.rows:
+                    yield [*r, name]
+            else:
+                for r in res.rows:
+                    yield list(r)
+
+    dest_path = Path(dest_path)
+    manager_cls._save_rows(dest_path, dest_sheet, merged(), start_cell, stream)
+    return BatchResult(files=files, dest_path=dest_path)
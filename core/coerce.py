@@ -0,0 +1,190 @@
+"""
+Приведение колонки к типу: date, int, decimal.
+
+В отличие от поячеечного to_date:
+- формат даты определяется один раз по выборке строк колонки
+  (из тех же форматов, что понимает to_date);
+- каждая различная строка разбирается один раз (повторы берутся из словаря);
+- известные форматы разбираются без strptime, а при наличии NumPy
+  уникальные строки фиксированной ширины разбираются векторно.
+Значения, которые не удалось привести, становятся None.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy не установлен
+    np = None
+
+KINDS = ("date", "int", "decimal")
+DATE_FORMATS = ("%d.%m.%Y", "%Y-%m-%d", "%d/%m/%Y")  # как в core.utils.to_date
+
+# формат -> (разделитель, позиции дня, месяца, года после split)
+_SPLIT_FORMATS = {
+    "%d.%m.%Y": (".", 0, 1, 2),
+    "%Y-%m-%d": ("-", 2, 1, 0),
+    "%d/%m/%Y": ("/", 0, 1, 2),
+}
+# формат -> (срезы дня, месяца, года, позиции разделителей) для строк ровно из 10 символов
+_FIXED_FORMATS = {
+    "%d.%m.%Y": ((0, 2), (3, 5), (6, 10), (2, 5)),
+    "%Y-%m-%d": ((8, 10), (5, 7), (0, 4), (4, 7)),
+    "%d/%m/%Y": ((0, 2), (3, 5), (6, 10), (2, 5)),
+}
+_VECTOR_MIN = 64  # меньше уникальных строк — векторный разбор не окупается
+_SAMPLE = 200
+
+
+def _strptime_date(s: str, fmt: str) -> Optional[date]:
+    try:
+        return datetime.strptime(s, fmt).date()
+    except ValueError:
+        return None
+
+
+def infer_date_format(strings: Iterable[str], sample: int = _SAMPLE) -> Optional[str]:
+    """Формат, которым разбирается больше всего строк выборки (None — ни одна не подошла)."""
+    picked = []
+    for s in strings:
+        picked.append(s)
+        if len(picked) >= sample:
+            break
+    best, best_hits = None, 0
+    for fmt in DATE_FORMATS:
+        hits = sum(1 for s in picked if _strptime_date(s, fmt) is not None)
+        if hits > best_hits:
+            best, best_hits = fmt, hits
+    return best
+
+
+def _date_parser(fmt: Optional[str]) -> Callable[[str], Optional[date]]:
+    """Разбор строки: сначала угаданным форматом без strptime, затем как to_date."""
+    def fallback(s: str) -> Optional[date]:
+        for other in DATE_FORMATS:
+            if other != fmt:
+                d = _strptime_date(s, other)
+                if d is not None:
+                    return d
+        return None
+
+    if fmt is None:
+        return fallback
+    sep, di, mi, yi = _SPLIT_FORMATS[fmt]
+
+    def parse(s: str) -> Optional[date]:
+        parts = s.split(sep)
+        # те же длины, что допускает strptime: день и месяц — 1-2 цифры, год — 4
+        if (len(parts) == 3 and len(parts[yi]) == 4 and 0 < len(parts[di]) <= 2
+                and 0 < len(parts[mi]) <= 2 and all(p.isdigit() for p in parts)):
+            try:
+                return date(int(parts[yi]), int(parts[mi]), int(parts[di]))
+            except ValueError:
+                return None
+        return _strptime_date(s, fmt) or fallback(s)
+
+    return parse
+
+
+def _parse_fixed(strings: list[str], fmt: str) -> list[Optional[date]]:
+    """Векторный разбор строк ровно из 10 символов (NumPy); остальные — None."""
+    (d0, d1), (m0, m1), (y0, y1), seps = _FIXED_FORMATS[fmt]
+    arr = np.array(strings, dtype="U10")
+    codes = arr.view(np.uint32).reshape(len(strings), 10).astype(np.int64)
+    digits = codes - ord("0")
+
+    def number(a: int, b: int):
+        out = np.zeros(len(strings), dtype=np.int64)
+        for k in range(a, b):
+            out = out * 10 + digits[:, k]
+        return out
+
+    sep = ord(_SPLIT_FORMATS[fmt][0])
+    digit_cols = [k for k in range(10) if k not in seps]
+    ok = (np.array([len(s) == 10 for s in strings])
+          & (codes[:, seps[0]] == sep) & (codes[:, seps[1]] == sep)
+          & ((digits[:, digit_cols] >= 0) & (digits[:, digit_cols] <= 9)).all(axis=1))
+    day, month, year = number(d0, d1), number(m0, m1), number(y0, y1)
+    ok &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31) & (year >= 1)
+
+    out: list[Optional[date]] = [None] * len(strings)
+    for i in np.flatnonzero(ok).tolist():
+        try:
+            out[i] = date(int(year[i]), int(month[i]), int(day[i]))
+        except ValueError:  # 31.02 и т.п.
+            pass
+    return out
+
+
+def _clean_number(s: str) -> str:
+    return s.strip().replace(" ", "").replace(" ", "").replace(" ", "").replace(",", ".")
+
+
+def _to_decimal(v: Any) -> Optional[Decimal]:
+    if v is None or isinstance(v, bool):
+        return None
+    if isinstance(v, Decimal):
+        return v
+    if isinstance(v, int):
+        return Decimal(v)
+    if isinstance(v, float):
+        return Decimal(repr(v)) if v == v and v not in (float("inf"), float("-inf")) else None
+    if isinstance(v, str):
+        try:
+            d = Decimal(_clean_number(v))
+        except InvalidOperation:
+            return None
+        return d if d.is_finite() else None
+    return None
+
+
+def _to_int(v: Any) -> Optional[int]:
+    if isinstance(v, int) and not isinstance(v, bool):
+        return v
+    d = _to_decimal(v)
+    if d is None or d != d.to_integral_value():
+        return None
+    return int(d)
+
+
+def _scalar_date(v: Any) -> Optional[date]:
+    if isinstance(v, datetime):
+        return v.date()
+    if isinstance(v, date):
+        return v
+    return None
+
+
+def coerce_values(values: Sequence[Any], kind: str) -> list[Any]:
+    """Значения колонки, приведённые к kind ('date' | 'int' | 'decimal')."""
+    if kind not in KINDS:
+        raise ValueError(f"Неизвестный тип '{kind}'. Доступны: {', '.join(KINDS)}")
+
+    # различные строки разбираются один раз
+    strings: dict[str, Any] = {}
+    for v in values:
+        if isinstance(v, str) and v not in strings:
+            strings[v] = None
+    stripped = {s: s.strip() for s in strings}
+
+    if kind == "date":
+        uniques = [s for s in dict.fromkeys(stripped.values()) if s]
+        fmt = infer_date_format(uniques)
+        parsed: dict[str, Optional[date]] = {}
+        if np is not None and fmt is not None and len(uniques) >= _VECTOR_MIN:
+            parsed = dict(zip(uniques, _parse_fixed(uniques, fmt)))
+        parse = _date_parser(fmt)
+        for s in uniques:
+            if parsed.get(s) is None:
+                parsed[s] = parse(s)
+        for raw, s in stripped.items():
+            strings[raw] = parsed.get(s)
+        convert = _scalar_date
+    else:
+        convert = _to_int if kind == "int" else _to_decimal
+        for raw in strings:
+            strings[raw] = convert(raw)
+
+    return [strings[v] if isinstance(v, str) else convert(v) for v in values]
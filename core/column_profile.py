@@ -0,0 +1,391 @@
+"""
+Профиль колонок листа за один проход по строкам данных.
+
+Для каждой колонки заголовка считается:
+- доля пустых значений (None) и пустых строк ("" / одни пробелы);
+- типы значений и итоговый тип колонки;
+- минимум и максимум (среди значений итогового типа);
+- число уникальных значений: точно, пока их не больше _EXACT_DISTINCT, дальше —
+  оценка HyperLogLog (погрешность около 1.6% при p=12);
+- самые частые значения (алгоритм Мисры–Гриса: счётчики — нижние оценки,
+  точные, пока уникальных значений не больше ёмкости);
+- случайная выборка значений (резервуарная выборка, алгоритм L).
+
+Память на колонку ограничена и не зависит от числа строк.
+"""
+
+import hashlib
+import math
+import random
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Iterable, Optional, Sequence
+
+_EXACT_DISTINCT = 1_024  # до стольких уникальных значений счёт точный
+_HLL_P = 12
+
+
+def _stable_hash(value: Any) -> int:
+    """64-битный хеш, одинаковый между запусками (hash() строк солится в каждом процессе).
+    Равные для == числа (1, 1.0, True) дают один хеш, как и во множестве точного счёта."""
+    t = type(value)
+    if t is str:
+        data = b"s" + value.encode("utf-8", "surrogatepass")
+    elif t is int or t is bool or ((t is float or t is Decimal) and math.isfinite(value)
+                                   and value == int(value)):
+        data = b"i%d" % int(value)
+    elif t is float:
+        data = b"f" + repr(value).encode()
+    else:
+        data = f"{t.__name__}:{value!r}".encode("utf-8", "surrogatepass")
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+class HyperLogLog:
+    """Оценка числа уникальных значений по 2**p однобайтовым регистрам."""
+
+    __slots__ = ("p", "registers")
+
+    def __init__(self, p: int = _HLL_P):
+        self.p = p
+        self.registers = bytearray(1 << p)
+
+    def add(self, value: Any) -> None:
+        h = _stable_hash(value)
+        bits = 64 - self.p
+        rest = h & ((1 << bits) - 1)
+        rank = bits - rest.bit_length() + 1
+        idx = h >> bits
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            return round(m * math.log(m / zeros))  # малые значения: линейный счёт
+        return round(raw)
+
+
+class DistinctCounter:
+    """Точный счёт (множество) до limit значений, дальше — HyperLogLog."""
+
+    __slots__ = ("limit", "_exact", "_hll")
+
+    def __init__(self, limit: int = _EXACT_DISTINCT):
+        self.limit = limit
+        self._exact: Optional[set] = set()
+        self._hll: Optional[HyperLogLog] = None
+
+    def add(self, value: Any) -> None:
+        exact = self._exact
+        if exact is not None:
+            exact.add(value)
+            if len(exact) > self.limit:
+                self._hll = HyperLogLog()
+                for v in exact:
+                    self._hll.add(v)
+                self._exact = None
+        else:
+            self._hll.add(value)
+
+    @property
+    def exact(self) -> bool:
+        return self._exact is not None
+
+    def count(self) -> int:
+        return len(self._exact) if self._exact is not None else self._hll.estimate()
+
+
+class FrequentValues:
+    """Частые значения (Мисра–Грис) на capacity счётчиках.
+    Значение с частотой больше n / (capacity + 1) гарантированно остаётся среди счётчиков."""
+
+    __slots__ = ("capacity", "counts", "error")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: dict[Any, int] = {}
+        self.error = 0  # на сколько может быть занижен каждый счётчик
+
+    def add(self, value: Any) -> None:
+        counts = self.counts
+        c = counts.get(value)
+        if c is not None:
+            counts[value] = c + 1
+        elif len(counts) < self.capacity:
+            counts[value] = 1
+        else:
+            self.error += 1
+            for k in list(counts):
+                if counts[k] == 1:
+                    del counts[k]
+                else:
+                    counts[k] -= 1
+
+    def top(self, k: int) -> list[tuple[Any, int]]:
+        return sorted(self.counts.items(), key=lambda kv: -kv[1])[:k]
+
+
+class Reservoir:
+    """Равномерная случайная выборка size значений из потока (алгоритм L)."""
+
+    __slots__ = ("size", "items", "_rnd", "_seen", "_next", "_w")
+
+    def __init__(self, size: int, rnd: random.Random):
+        self.size = size
+        self.items: list[Any] = []
+        self._rnd = rnd
+        self._seen = 0
+        self._w = 1.0
+        self._next = size  # номер (0-based) следующего значения, попадающего в выборку
+
+    def _skip(self) -> None:
+        rnd = self._rnd
+        self._w *= math.exp(math.log(rnd.random() or 1e-300) / self.size)
+        self._next += int(math.log(rnd.random() or 1e-300) / math.log1p(-self._w)) + 1
+
+    def add(self, value: Any) -> None:
+        i = self._seen
+        self._seen += 1
+        if i < self.size:
+            self.items.append(value)
+            if i + 1 == self.size:
+                self._w = 1.0
+                self._next = self.size - 1
+                self._skip()
+        elif i == self._next:
+            self.items[self._rnd.randrange(self.size)] = value
+            self._skip()
+
+
+def _kind(v: Any) -> str:
+    t = type(v)
+    if t is str:
+        return "str"
+    if t is bool:
+        return "bool"
+    if t is int:
+        return "int"
+    if t is float or t is Decimal:
+        return "float"
+    if t is datetime:
+        return "datetime"
+    if t is date:
+        return "date"
+    if t is time:
+        return "time"
+    return t.__name__
+
+
+# типы, значения которых сравнимы между собой (для min/max)
+_ORDER_GROUP = {"int": "number", "float": "number", "str": "str", "date": "date",
+                "datetime": "datetime", "time": "time"}
+
+
+def _column_type(kinds: dict[str, int]) -> Optional[str]:
+    """Итоговый тип колонки по счётчикам типов непустых значений."""
+    present = set(kinds)
+    if not present:
+        return None
+    if len(present) == 1:
+        return next(iter(present))
+    if present == {"int", "float"}:
+        return "float"
+    if present == {"date", "datetime"}:
+        return "datetime"
+    return "mixed"
+
+
+@dataclass
+class ColumnProfile:
+    index: int  # 0-based индекс колонки
+    name: Any
+    rows: int = 0
+    nulls: int = 0  # None
+    empties: int = 0  # "" и строки из пробелов
+    kinds: dict[str, int] = field(default_factory=dict)  # тип значения -> количество
+    type: Optional[str] = None  # итоговый тип: str, int, float, date, datetime, ..., mixed
+    min: Any = None
+    max: Any = None
+    distinct: int = 0
+    distinct_exact: bool = True
+    top: list[tuple[Any, int]] = field(default_factory=list)  # (значение, частота)
+    top_exact: bool = True  # частоты точные (иначе — нижние оценки)
+    sample: list[Any] = field(default_factory=list)
+
+    @property
+    def filled(self) -> int:
+        return self.rows - self.nulls - self.empties
+
+    @property
+    def null_ratio(self) -> float:
+        return self.nulls / self.rows if self.rows else 0.0
+
+    @property
+    def empty_ratio(self) -> float:
+        return self.empties / self.rows if self.rows else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "index": self.index,
+            "name": self.name,
+            "rows": self.rows,
+            "nulls": self.nulls,
+            "empties": self.empties,
+            "null_ratio": self.null_ratio,
+            "empty_ratio": self.empty_ratio,
+            "kinds": dict(self.kinds),
+            "type": self.type,
+            "min": self.min,
+            "max": self.max,
+            "distinct": self.distinct,
+            "distinct_exact": self.distinct_exact,
+            "top": [list(t) for t in self.top],
+            "top_exact": self.top_exact,
+            "sample": list(self.sample),
+        }
+
+
+@dataclass
+class SheetProfile:
+    rows: int
+    columns: list[ColumnProfile]
+
+    def column(self, col: Any) -> ColumnProfile:
+        """Профиль колонки по 0-based индексу или названию (без учёта регистра и пробелов)."""
+        if isinstance(col, int):
+            return self.columns[col]
+        key = str(col).strip().lower()
+        for c in self.columns:
+            if c.name is not None and str(c.name).strip().lower() == key:
+                return c
+        raise KeyError(f"Колонка '{col}' не найдена")
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"rows": self.rows, "columns": [c.as_dict() for c in self.columns]}
+
+    def __str__(self) -> str:
+        lines = [f"Строк данных: {self.rows}"]
+        for c in self.columns:
+            approx = "" if c.distinct_exact else "~"
+            lines.append(
+                f"[{c.index + 1:>2}] {c.name}: тип {c.type or '-'}, "
+                f"None {c.null_ratio:.1%}, пустых строк {c.empty_ratio:.1%}, "
+                f"уникальных {approx}{c.distinct}"
+            )
+            if c.min is not None:
+                lines.append(f"     min {_short(c.min)}, max {_short(c.max)}")
+            if c.type == "mixed":
+                lines.append("     типы: " + ", ".join(f"{k} {n}" for k, n in c.kinds.items()))
+            if c.top:
+                mark = "" if c.top_exact else "≥"
+                lines.append("     частые: " + ", ".join(f"{_short(v)} ×{mark}{n}" for v, n in c.top))
+            if c.sample:
+                lines.append("     выборка: " + ", ".join(_short(v) for v in c.sample))
+        return "\n".join(lines)
+
+
+def _short(v: Any, width: int = 30) -> str:
+    s = v.isoformat(sep=" ") if isinstance(v, datetime) else (
+        v.isoformat() if isinstance(v, (date, time)) else repr(v))
+    return s if len(s) <= width else s[: width - 1] + "…"
+
+
+class _ColumnState:
+    __slots__ = ("nulls", "empties", "kinds", "bounds", "distinct", "frequent", "sample")
+
+    def __init__(self, top_k: int, sample_size: int, rnd: random.Random):
+        self.nulls = 0
+        self.empties = 0
+        self.kinds: dict[str, int] = {}
+        self.bounds: dict[str, list[Any]] = {}  # группа сравнимых типов -> [min, max]
+        self.distinct = DistinctCounter()
+        self.frequent = FrequentValues(max(top_k * 10, 100))
+        self.sample = Reservoir(sample_size, rnd) if sample_size > 0 else None
+
+    def add(self, v: Any) -> None:
+        if v is None:
+            self.nulls += 1
+            return
+        k = _kind(v)
+        if k == "str" and not v.strip():
+            self.empties += 1
+            return
+        self.kinds[k] = self.kinds.get(k, 0) + 1
+        group = _ORDER_GROUP.get(k)
+        if group is not None:
+            b = self.bounds.get(group)
+            if b is None:
+                self.bounds[group] = [v, v]
+            elif v < b[0]:
+                b[0] = v
+            elif v > b[1]:
+                b[1] = v
+        self.distinct.add(v)
+        self.frequent.add(v)
+        if self.sample is not None:
+            self.sample.add(v)
+
+    def result(self, index: int, name: Any, rows: int, top_k: int) -> ColumnProfile:
+        col_type = _column_type(self.kinds)
+        bounds = None
+        if col_type == "datetime" and "date" in self.bounds:
+            # даты и даты-время вместе: min/max по приведённым к datetime
+            vals = [datetime(v.year, v.month, v.day) if type(v) is date else v
+                    for b in self.bounds.values() for v in b]
+            bounds = [min(vals), max(vals)]
+        elif col_type is not None:
+            group = _ORDER_GROUP.get(col_type)
+            if group is None and col_type == "mixed":
+                # смешанные типы: границы самой многочисленной сравнимой группы
+                by_group: dict[str, int] = {}
+                for k, n in self.kinds.items():
+                    if k in _ORDER_GROUP:
+                        by_group[_ORDER_GROUP[k]] = by_group.get(_ORDER_GROUP[k], 0) + n
+                group = max(by_group, key=by_group.get) if by_group else None
+            bounds = self.bounds.get(group) if group else None
+        return ColumnProfile(
+            index=index,
+            name=name,
+            rows=rows,
+            nulls=self.nulls,
+            empties=self.empties,
+            kinds=dict(sorted(self.kinds.items(), key=lambda kv: -kv[1])),
+            type=col_type,
+            min=bounds[0] if bounds else None,
+            max=bounds[1] if bounds else None,
+            distinct=self.distinct.count(),
+            distinct_exact=self.distinct.exact,
+            top=self.frequent.top(top_k),
+            top_exact=self.frequent.error == 0,
+            sample=list(self.sample.items) if self.sample is not None else [],
+        )
+
+
+def profile_rows(
+    rows: Iterable[Sequence[Any]],
+    names: Sequence[Any],
+    top_k: int = 5,
+    sample_size: int = 5,
+    seed: Optional[int] = 0,
+) -> SheetProfile:
+    """Профиль колонок names по потоку строк (один проход)."""
+    rnd = random.Random(seed)
+    states = [_ColumnState(top_k, sample_size, rnd) for _ in names]
+    ncols = len(states)
+    adders = [s.add for s in states]
+    n = 0
+    for row in rows:
+        n += 1
+        if len(row) >= ncols:
+            for add, v in zip(adders, row):
+                add(v)
+        else:
+            for i, add in enumerate(adders):
+                add(row[i] if i < len(row) else None)
+    return SheetProfile(rows=n, columns=[s.result(i, name, n, top_k)
+                                         for i, (s, name) in enumerate(zip(states, names))])
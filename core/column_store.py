@@ -0,0 +1,345 @@
+"""
+Колоночное хранение строк данных листа.
+
+Каждая колонка — отдельный типизированный массив:
+  int      — целые (numpy int64 / array('q'))
+  float    — дробные, а также смесь целых и дробных (numpy float64 / array('d'));
+             какие значения были целыми, помнит маска ints — строки возвращаются как были
+  datetime — даты со временем (numpy datetime64[us]; без NumPy — список)
+  object   — всё остальное, строки интернированы (numpy object / список)
+Пустые ячейки числовых колонок отмечаются отдельной маской.
+
+NumPy необязателен: без него используются array.array и списки,
+API тот же, но маски — списки bool.
+
+Фильтрация считается по колонке: правило вычисляется один раз на каждое
+уникальное значение, результат раскладывается на строки маской.
+"""
+
+import sys
+from array import array
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any, Callable, Iterable, Iterator, Optional, Union
+
+from core.row_filters import RulesLike, _cell_str, compile_rules
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy не установлен
+    np = None
+
+_INT64_MIN, _INT64_MAX = -(1 << 63), (1 << 63) - 1
+_FLOAT_EXACT = 1 << 53  # целые по модулю не больше этого float64 хранит точно
+_CHUNK = 4096  # сколько строк собирать за раз при итерации по строкам
+
+Mask = Union["np.ndarray", list[bool]]
+
+
+def _kind(values: list[Any]) -> str:
+    """Тип колонки по её значениям (None не учитывается)."""
+    kind = None
+    mixed = False
+    for v in values:
+        if v is None:
+            continue
+        t = type(v)
+        if t is int:
+            k = "int" if _INT64_MIN <= v <= _INT64_MAX else "object"
+        elif t is float:
+            k = "float"
+        elif t is datetime and v.tzinfo is None and np is not None:
+            k = "datetime"
+        else:
+            return "object"
+        if kind is None:
+            kind = k
+        elif kind != k:
+            if {kind, k} != {"int", "float"}:
+                return "object"
+            kind = "float"
+            mixed = True
+    if mixed and any(type(v) is int and not -_FLOAT_EXACT <= v <= _FLOAT_EXACT for v in values):
+        return "object"  # такие целые в float64 потеряли бы точность
+    return kind or "object"
+
+
+class Column:
+    """Одна колонка: данные, маска пустых значений (или None), маска целых
+    в колонке float (или None) и тип."""
+
+    __slots__ = ("kind", "data", "missing", "ints")
+
+    def __init__(self, values: list[Any]):
+        kind = _kind(values)
+        missing = None
+        if kind != "object":
+            flags = [v is None for v in values]
+            if any(flags):
+                missing = np.array(flags, dtype=bool) if np is not None else bytearray(flags)
+                fill = datetime(1970, 1, 1) if kind == "datetime" else 0
+                values = [fill if v is None else v for v in values]
+        ints = None
+        if kind == "float":
+            flags = [type(v) is int for v in values]
+            if any(flags):
+                ints = np.array(flags, dtype=bool) if np is not None else bytearray(flags)
+        self.kind = kind
+        self.missing = missing
+        self.ints = ints
+        if kind == "object":
+            values = [sys.intern(v) if type(v) is str else v for v in values]
+            if np is not None:
+                data = np.empty(len(values), dtype=object)
+                data[:] = values
+            else:
+                data = values
+        elif np is not None:
+            dtype = {"int": np.int64, "float": np.float64, "datetime": "datetime64[us]"}[kind]
+            data = np.array(values, dtype=dtype)
+        else:
+            data = array("q" if kind == "int" else "d", values)
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def to_list(self, start: int = 0, stop: Optional[int] = None) -> list[Any]:
+        """Значения как обычные объекты Python (пустые -> None)."""
+        data = self.data[start:stop]
+        values = data.tolist() if np is not None else list(data)
+        if self.ints is not None:
+            for i, flag in enumerate(self.ints[start:stop]):
+                if flag:
+                    values[i] = int(values[i])
+        missing = self.missing
+        if missing is not None:
+            for i, flag in enumerate(missing[start:stop]):
+                if flag:
+                    values[i] = None
+        return values
+
+    def take(self, positions) -> list[Any]:
+        """Значения по списку/массиву позиций."""
+        if np is not None:
+            values = self.data[positions].tolist()
+            if self.ints is not None:
+                for i, flag in enumerate(self.ints[positions]):
+                    if flag:
+                        values[i] = int(values[i])
+            if self.missing is not None:
+                for i, flag in enumerate(self.missing[positions]):
+                    if flag:
+                        values[i] = None
+            return values
+        data, missing, ints = self.data, self.missing, self.ints
+        if ints is not None:
+            return [None if missing is not None and missing[p] else int(data[p]) if ints[p] else data[p]
+                    for p in positions]
+        if missing is None:
+            return [data[p] for p in positions]
+        return [None if missing[p] else data[p] for p in positions]
+
+    def factorize(self) -> tuple[Any, list[Any]]:
+        """Коды строк и список уникальных значений (пустые -> None)."""
+        # в смешанной колонке 1 и 1.0 — разные значения (как и в строках: "1" и "1.0")
+        if np is not None and self.kind != "object" and self.ints is None:
+            uniques, codes = np.unique(self.data, return_inverse=True)
+            uniques = uniques.tolist()
+            if self.missing is not None:
+                codes = codes.copy()
+                codes[self.missing] = len(uniques)
+                uniques.append(None)
+            return codes, uniques
+        mapping: dict[tuple, int] = {}
+        uniques: list[Any] = []
+        codes = array("I")
+        for v in self.to_list():
+            key = (v.__class__, v)
+            code = mapping.get(key)
+            if code is None:
+                code = mapping[key] = len(uniques)
+                uniques.append(v)
+            codes.append(code)
+        if np is not None:
+            codes = np.frombuffer(codes, dtype=np.uint32)
+        return codes, uniques
+
+
+class RowsView(Sequence):
+    """Построчный доступ к ColumnStore: ведёт себя как список строк (list)."""
+
+    __slots__ = ("_store",)
+
+    def __init__(self, store: "ColumnStore"):
+        self._store = store
+
+    def __len__(self) -> int:
+        return self._store.nrows
+
+    def __getitem__(self, i):
+        store = self._store
+        if isinstance(i, slice):
+            start, stop, step = i.indices(store.nrows)
+            if step == 1:
+                return store._rows_between(start, stop)
+            return store.take(range(start, stop, step))
+        if i < 0:
+            i += store.nrows
+        if not 0 <= i < store.nrows:
+            raise IndexError("индекс строки вне диапазона")
+        return store._rows_between(i, i + 1)[0]
+
+    def __iter__(self) -> Iterator[list[Any]]:
+        store = self._store
+        for start in range(0, store.nrows, _CHUNK):
+            yield from store._rows_between(start, min(start + _CHUNK, store.nrows))
+
+
+class ColumnStore:
+    """Строки листа, разложенные по колонкам.
+
+    rows : строки данных (как из data_rows); длины строк сохраняются
+    """
+
+    def __init__(self, rows: Iterable[list[Any]]):
+        rows = rows if isinstance(rows, Sequence) else list(rows)
+        self.nrows = len(rows)
+        self.ncols = max((len(r) for r in rows), default=0)
+        lengths = [len(r) for r in rows]
+        self._lengths = None if all(n == self.ncols for n in lengths) else lengths
+        self.columns: list[Column] = [
+            Column([r[idx] if idx < len(r) else None for r in rows])
+            for idx in range(self.ncols)
+        ]
+        self._factors: dict[int, tuple[Any, list[Any]]] = {}
+        self.rows = RowsView(self)
+
+    def __len__(self) -> int:
+        return self.nrows
+
+    def nbytes(self) -> int:
+        """Оценка памяти колонок в байтах (массивы, маски и объекты object-колонок)."""
+        total = 0
+        seen: set[int] = set()
+        for col in self.columns:
+            data = col.data
+            total += data.nbytes if np is not None else sys.getsizeof(data)
+            for flags in (col.missing, col.ints):
+                if flags is not None:
+                    total += flags.nbytes if np is not None else sys.getsizeof(flags)
+            if col.kind == "object" or (np is None and col.kind == "datetime"):
+                for v in data:
+                    if v is not None and id(v) not in seen:
+                        seen.add(id(v))
+                        total += sys.getsizeof(v)
+        if self._lengths is not None:
+            total += sys.getsizeof(self._lengths)
+        return total
+
+    # колонки
+
+    def column(self, idx: int) -> Optional[Column]:
+        """Колонка без копирования (data — массив numpy/array/list) или None, если её нет."""
+        return self.columns[idx] if idx < self.ncols else None
+
+    def column_values(self, idx: int) -> list[Any]:
+        """Значения колонки списком (как get_column_values)."""
+        if idx >= self.ncols:
+            return [None] * self.nrows
+        values = self.columns[idx].to_list()
+        if self._lengths is not None:
+            for i, n in enumerate(self._lengths):
+                if n <= idx:
+                    values[i] = None
+        return values
+
+    # строки
+
+    def _rows_between(self, start: int, stop: int) -> list[list[Any]]:
+        if not self.columns:
+            return [[] for _ in range(start, stop)]
+        rows = [list(r) for r in zip(*(c.to_list(start, stop) for c in self.columns))]
+        if self._lengths is not None:
+            for row, n in zip(rows, self._lengths[start:stop]):
+                del row[n:]
+        return rows
+
+    def take(self, positions) -> list[list[Any]]:
+        """Строки по позициям (список/range/массив индексов)."""
+        positions = list(positions) if np is None else np.asarray(positions, dtype=np.intp)
+        if not self.columns:
+            return [[] for _ in range(len(positions))]
+        rows = [list(r) for r in zip(*(c.take(positions) for c in self.columns))]
+        if self._lengths is not None:
+            for row, p in zip(rows, positions):
+                del row[self._lengths[p]:]
+        return rows
+
+    def select(self, mask: Mask) -> list[list[Any]]:
+        """Строки, для которых mask == True."""
+        if np is not None:
+            return self.take(np.flatnonzero(mask))
+        return self.take(i for i, flag in enumerate(mask) if flag)
+
+    # маски
+
+    def _full(self, value: bool) -> Mask:
+        if np is not None:
+            return np.full(self.nrows, value, dtype=bool)
+        return [value] * self.nrows
+
+    def _factors_for(self, idx: int) -> tuple[Any, list[Any]]:
+        factors = self._factors.get(idx)
+        if factors is None:
+            factors = self._factors[idx] = self.columns[idx].factorize()
+        return factors
+
+    def match(self, idx: int, predicate: Callable[[str], bool]) -> Mask:
+        """Маска строк, где predicate(значение ячейки как строка) истинен.
+        Предикат вызывается один раз на уникальное значение колонки.
+        Строки, короче колонки idx, не совпадают.
+        """
+        if idx >= self.ncols:
+            return self._full(False)
+        codes, uniques = self._factors_for(idx)
+        hits = [bool(predicate(_cell_str(v))) for v in uniques]
+        if np is not None:
+            mask = np.array(hits, dtype=bool)[codes] if hits else self._full(False)
+        else:
+            mask = [hits[c] for c in codes]
+        if self._lengths is not None:
+            for i, n in enumerate(self._lengths):
+                if n <= idx:
+                    mask[i] = False
+        return mask
+
+    def equals(self, idx: int, values: Iterable[Any]) -> Mask:
+        """Значение (str + strip) входит в values."""
+        targets = frozenset(str(v) for v in values)
+        return self.match(idx, targets.__contains__)
+
+    def is_empty(self, idx: int) -> Mask:
+        """Пустое или нулевое значение (как "empty" в правилах)."""
+        return self.match(idx, lambda val: val in ("", "0"))
+
+    def contains(self, idx: int, subs: Iterable[Any]) -> Mask:
+        """Значение содержит одну из подстрок."""
+        subs = [str(s) for s in subs]
+        return self.match(idx, lambda val: any(s in val for s in subs))
+
+    def mask(self, rules: RulesLike) -> Mask:
+        """Маска строк, которые остаются после фильтра (как filter_rows)."""
+        compiled = compile_rules(rules)
+        keep = self._full(True)
+        for idx, drop in compiled.checks:
+            dropped = self.match(idx, drop)
+            if np is not None:
+                keep &= ~dropped
+            else:
+                keep = [k and not d for k, d in zip(keep, dropped)]
+        return keep
+
+    def filter(self, rules: RulesLike) -> list[list[Any]]:
+        """Строки, прошедшие фильтр."""
+        return self.select(self.mask(rules))
@@ -0,0 +1,79 @@
+"""
+Компактное хранение строк листа.
+
+- повторяющиеся значения (строки, дробные, даты) интернируются при чтении:
+  одинаковые значения во всех строках — один и тот же объект;
+- строка — обычный list точного размера (без запаса под append), поэтому
+  data_rows по-прежнему отдаёт list[list] и строки можно менять на месте.
+
+memory_usage — оценка памяти строк: контейнеры плюс уникальные объекты значений
+(каждый объект считается один раз, как и занимает память).
+"""
+
+import sys
+from datetime import date, datetime, time
+from typing import Any, Iterable, Sequence
+
+_INTERNED_TYPES = (str, float, int, datetime, date, time)
+_MAX_MEMO = 1 << 20  # не больше стольких уникальных значений в словаре интернирования
+
+
+class Interner:
+    """Возвращает один объект на каждое повторяющееся значение.
+
+    Словарь живёт только на время чтения листа; если уникальных значений слишком
+    много (id, суммы), новые перестают запоминаться, чтобы не держать лишнюю память.
+    """
+
+    __slots__ = ("_memo",)
+
+    def __init__(self):
+        self._memo: dict[tuple, Any] = {}
+
+    def __call__(self, v: Any) -> Any:
+        if v is None or v.__class__ not in _INTERNED_TYPES:
+            return v
+        cls = v.__class__
+        if cls is int and -5 <= v <= 256:  # малые int и так общие
+            return v
+        if cls is float and not v:  # 0.0 и -0.0 равны, но это разные значения
+            return v
+        if cls is datetime and v.tzinfo is not None:  # равные моменты в разных поясах
+            return v
+        key = (cls, v)
+        memo = self._memo
+        found = memo.get(key)
+        if found is not None:
+            return found
+        if len(memo) < _MAX_MEMO:
+            memo[key] = v
+        return v
+
+    def row(self, row: Iterable[Any]) -> list[Any]:
+        return list(map(self, row))
+
+
+def memory_usage(rows: Iterable[Sequence[Any]]) -> dict[str, int]:
+    """Оценка памяти строк в байтах: контейнеры строк и уникальные объекты значений."""
+    seen: set[int] = set()
+    containers = values = unique = count = 0
+    if isinstance(rows, list):
+        containers += sys.getsizeof(rows)
+    for r in rows:
+        count += 1
+        containers += sys.getsizeof(r)
+        for v in r:
+            if v is None:
+                continue
+            i = id(v)
+            if i not in seen:
+                seen.add(i)
+                unique += 1
+                values += sys.getsizeof(v)
+    return {
+        "rows": count,
+        "containers": containers,
+        "values": values,
+        "unique_values": unique,
+        "total": containers + values,
+    }
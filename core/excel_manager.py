@@ -1,20 +1,50 @@
-from copy import copy
+import os
+import sys
+import time
+from array import array
+from itertools import chain
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Iterable, Optional, Union
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence, Union
 
 from openpyxl import load_workbook, Workbook
 from openpyxl.worksheet.worksheet import Worksheet
-from openpyxl.utils import coordinate_to_tuple
-
-from core.row_filters import filter_rows
-from core.row_reader import read_rows
+from openpyxl.utils import coordinate_to_tuple, get_column_letter
+
+from core.aggregate import Aggregation, MetricSpec, aggregate_rows, parse_metric
+from core.batch import BatchResult, map_files
+from core.coerce import coerce_values
+from core.column_store import ColumnStore
+from core.compact_rows import Interner, memory_usage
+from core.flat_export import DEFAULT_BATCH_ROWS, detect_format, export_rows
+from core.header_cache import HeaderCache, header_fingerprint
+from core.output_session import OutputSession
+from core.profiling import NULL_PROFILER, Profiler, Stats, make_profiler
+from core.row_diff import RowDiff, diff_rows
+from core.row_index import RowIndex, join_rows
+from core.row_filters import CompiledRules, compile_rules, filter_rows, iter_filtered
+from core.row_reader import _is_empty_row, iter_nonempty, stream_rows
 from core.utils import get_sheet_name, ensure_ws, _norm_header
+from core.sheet_cache import CacheEntry, SheetCache, _hash
+from core.spill import SpilledRows, SpillWriter, chunk_rows_for, spill
+from core.style_transfer import StyleTransfer
+from core.watermark import PrefixHash, Watermark, WatermarkStore, sidecar_path
+from core.xlsx_reader import XlsxReader
+from core.xlsx_writer import write_sheet_streaming
 
 StrOrInt = Union[str, int]
 
+ENGINES = ("openpyxl", "fast")
+
+
+def _counted(rows: Iterable[list[Any]], span: Any) -> Iterator[list[Any]]:
+    """Поток строк, попутно считающий строки и ячейки в span профайлера."""
+    for row in rows:
+        span.add(1, len(row))
+        yield row
+
 
-@dataclass
+@dataclass(slots=True)
 class HeaderInfo:
     row_idx: int  # номер строки заголовка
     names: list[str]  # исходные заголовки
@@ -36,44 +66,265 @@ class ExcelManager:
         sheet: Union[str, int, Iterable[str]] = 0,
         read_only: bool = True,
         data_only: bool = True,
+        engine: str = "openpyxl",
+        header_row: Optional[int] = None,
+        cache: Optional[SheetCache] = None,
+        columnar: bool = False,
+        reader: Optional[XlsxReader] = None,
+        expected_headers: Optional[list[str]] = None,
+        header_cache: Optional[HeaderCache] = None,
+        profile: Union[None, bool, Profiler] = None,
+        compact: bool = False,
+        chunk_rows: Optional[int] = None,
+        max_memory: Optional[int] = None,
     ):
         """
         path       : путь к XLSX
         sheet      : имя листа (str), индекс (int) или список возможных имён (Iterable[str])
         read_only  : открыть в режиме чтения
         data_only  : подставлять вычисленные значения формул
+        engine     : чем читать значения: "openpyxl" или "fast" (XlsxReader, без объектов
+                     ячеек; только data_only=True). Стили всегда берутся через openpyxl.
+        header_row : номер строки заголовка (Excel 1-based); None — определить автоматически
+        cache      : дисковый кэш разобранных листов (SheetCache). Если лист уже есть в кэше,
+                     заголовок и строки берутся оттуда, а книга открывается только при
+                     обращении к wb/ws (стили, абсолютные координаты и т.п.)
+        columnar   : хранить строки данных по колонкам (ColumnStore, NumPy — если установлен);
+                     data_rows тогда возвращает построчное представление над колонками
+        reader     : уже открытый XlsxReader этой книги (только для engine="fast"), чтобы
+                     несколько менеджеров не открывали архив и общие строки заново;
+                     см. open_sheets
+        expected_headers : искать заголовок по ожидаемым названиям (find_header_by_expected)
+                     вместо автоматического поиска; используется, если header_row не задан
+        header_cache : отпечатки известных шаблонов заголовков (HeaderCache): для знакомого
+                     шаблона читаются только строки до заголовка, без полного поиска
+        profile    : замеры фаз (загрузка, заголовок, чтение, фильтр, запись, сохранение):
+                     True/False, готовый Profiler (с callback) или None — по переменной
+                     окружения EXCEL_MANAGER_PROFILE; результаты — в self.stats
+        compact    : интернировать повторяющиеся значения строк данных при чтении (одинаковые
+                     строки, числа, даты — один объект; см. core.compact_rows); data_rows
+                     по-прежнему отдаёт list[list]
+        chunk_rows : держать в памяти не весь лист, а порции по chunk_rows строк; прочитанные
+                     строки и результаты filter сбрасываются во временный файл (core.spill),
+                     data_rows/filter возвращают SpilledRows (ведут себя как список строк)
+        max_memory : то же, но размер порции подбирается по бюджету памяти в байтах
+                     (по оценке размера строки на первых строках листа)
         """
+        if engine not in ENGINES:
+            raise ValueError(f"Неизвестный движок чтения '{engine}'. Доступны: {ENGINES}")
+        if engine == "fast" and not data_only:
+            raise ValueError("Движок 'fast' читает только значения (data_only=True)")
+        if reader is not None and engine != "fast":
+            raise ValueError("Параметр reader используется только с движком 'fast'")
+        if (chunk_rows is not None or max_memory is not None) and columnar:
+            raise ValueError("columnar=True держит все колонки в памяти и несовместим с chunk_rows/max_memory")
 
         self.path = Path(path)
-        self.wb: Workbook = load_workbook(self.path, read_only=read_only, data_only=data_only)
+        self._sheet = sheet
+        self._read_only = read_only
+        self._data_only = data_only
+        self._engine = engine
+        self._header_row = header_row
+        self._header_cache = header_cache
+        # ключ записи в SheetCache: как именно определялся заголовок
+        if header_row is None and expected_headers:
+            self._header_spec = ("expected", tuple(_norm_header(h) for h in expected_headers))
+        else:
+            self._header_spec = header_row
+        self._cache = cache
+        self._columnar = columnar
+        self._compact = compact
+        self._chunk_rows = chunk_rows
+        self._max_memory = max_memory
+        self.profiler: Profiler = make_profiler(profile)
+
+        self._wb: Optional[Workbook] = None
+        self._ws: Optional[Worksheet] = None
+        self._reader: Optional[XlsxReader] = reader
+        self._owns_reader = reader is None  # свой XlsxReader закрывается в close()
+        self._values_ws = None
+        self._cache_entry: Optional[CacheEntry] = None
+        self._rows_cache = None
+        self._columns: Optional[ColumnStore] = None
+        self._indexes: dict[tuple[int, ...], RowIndex] = {}
+        self._typed: dict[int, tuple[str, list[Any]]] = {}  # колонка -> (тип, значения), см. coerce
+        # первые строки листа, прочитанные при поиске заголовка (переиспользуются как
+        # начало данных); _head_complete — лист закончился раньше буфера
+        self._head: list[tuple] = []
+        self._head_complete = False
+        # номера строк Excel для строк data_rows, строки из одних пробелов (в data_rows не
+        # попадают) и индекс «номер строки Excel -> позиция в data_rows» для get_value
+        self._row_numbers: Optional[Sequence[int]] = None
+        self._blank_rows: dict[int, list[Any]] = {}
+        self._row_offsets: Optional[array] = None
+
+        if cache is not None:
+            self._cache_entry = cache.get(self.path, sheet, self._header_spec, data_only, engine)
+        if self._cache_entry is not None:
+            entry = self._cache_entry
+            names = entry.header_names
+            self.header: HeaderInfo = HeaderInfo(
+                row_idx=entry.header_row_idx,
+                names=names,
+                name_to_idx={_norm_header(v): i for i, v in enumerate(names)},
+            )
+            self._rows_cache = entry.rows
+            if entry.row_numbers is not None:
+                self._row_numbers = entry.row_numbers
+                self._blank_rows = entry.blank_rows or {}
+        elif header_row is None and expected_headers:
+            with self.profiler.span("header", self.path):
+                self.header: HeaderInfo = self.find_header_by_expected(expected_headers)
+        else:
+            with self.profiler.span("header", self.path):
+                self.header: HeaderInfo = self.build_header(header_row)
+
+    def close(self) -> None:
+        """Освобождает открытые файлы: запись SheetCache (mmap), книгу в режиме read_only
+        и XlsxReader, если менеджер открыл его сам (переданный reader не закрывается).
+        Строки, взятые из кэша, после этого недоступны; менеджер остаётся рабочим и при
+        следующем обращении прочитает лист заново.
+        """
+        entry = self._cache_entry
+        if entry is not None:
+            if self._rows_cache is entry.rows:
+                self._rows_cache = None
+                self._columns = None
+                self._indexes.clear()
+            if self._row_numbers is entry.row_numbers:
+                self._row_numbers = None
+                self._row_offsets = None
+            self._cache_entry = None
+            entry.close()
+        if self._wb is not None and self._read_only:
+            self._wb.close()
+            self._wb = self._ws = None
+            if self._engine != "fast":
+                self._values_ws = None
+        if self._reader is not None and self._owns_reader:
+            self._reader.close()
+            self._reader = None
+            self._values_ws = None
+
+    def __enter__(self) -> "ExcelManager":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def stats(self) -> Stats:
+        """Замеры фаз (пусто, если профилирование выключено)."""
+        return self.profiler.stats
+
+    def _select_sheet(self, book, by_index: Callable[[int], Any]):
+        """Лист книги (openpyxl Workbook или XlsxReader) по параметру sheet конструктора."""
+        sheet = self._sheet
 
         if isinstance(sheet, (str, list, tuple)):
-            self.ws: Worksheet = get_sheet_name(self.wb, sheet)
-        elif isinstance(sheet, int):
+            return get_sheet_name(book, sheet)
+        if isinstance(sheet, int):
             try:
-                self.ws: Worksheet = self.wb.worksheets[sheet]
+                return by_index(sheet)
             except IndexError:
                 raise ValueError(f"В книге нет листа с индексом {sheet}")
-        else:
-            self.ws: Worksheet = self.wb.worksheets[0]
-        self.header: HeaderInfo = self.build_header()
-        self._rows_cache = None
+        return by_index(0)
+
+    def _open_workbook(self) -> None:
+        """Открывает книгу и находит лист (при работе из кэша — по первому требованию)."""
+        with self.profiler.span("load", self.path):
+            self._wb = load_workbook(self.path, read_only=self._read_only, data_only=self._data_only)
+        self._ws = self._select_sheet(self._wb, self._wb.worksheets.__getitem__)
+        if self._values_ws is None and self._engine != "fast":
+            self._values_ws = self._ws
+
+    def _open_values(self) -> None:
+        """Источник значений: сам лист openpyxl или быстрый читатель XML того же листа.
+        Движку "fast" openpyxl для этого не нужен.
+        """
+        if self._engine != "fast":
+            self._values_ws = self.ws
+            return
+        if self._reader is None:
+            with self.profiler.span("load", self.path):
+                self._reader = XlsxReader(self.path)
+        reader = self._reader
+        self._values_ws = self._select_sheet(reader, lambda i: reader.sheet(reader.sheetnames[i]))
+
+    @property
+    def wb(self) -> Workbook:
+        if self._wb is None:
+            self._open_workbook()
+        return self._wb
+
+    @property
+    def ws(self) -> Worksheet:
+        if self._ws is None:
+            self._open_workbook()
+        return self._ws
+
+    @property
+    def _rows_ws(self):
+        """Лист, из которого читаются значения (openpyxl или FastSheet)."""
+        if self._values_ws is None:
+            self._open_values()
+        return self._values_ws
 
     # служебные
 
+    def _head_rows(self, n: int) -> list[tuple]:
+        """Первые n строк листа. Читаются одним проходом и запоминаются;
+        если нужно больше, чем уже прочитано, лист дочитывается с места остановки.
+        """
+        head = self._head
+        if len(head) < n and not self._head_complete:
+            start = len(head) + 1
+            head.extend(self._rows_ws.iter_rows(min_row=start, max_row=n, values_only=True))
+            self._head_complete = len(head) < n
+        return head[:n]
+
+    def _scan_header(self, accept: Callable[[Sequence[Any]], bool], scan_rows: int) -> Optional[int]:
+        """Номер первой строки (1-based) среди первых scan_rows, для которой accept(row) истинно.
+        Если есть header_cache, сначала проверяются известные шаблоны листа: читаются
+        строки только до заголовка шаблона, результат тот же, что и у полного поиска.
+        """
+        title = None
+        if self._header_cache is not None:
+            title = self._rows_ws.title
+            for row_idx, fingerprint in self._header_cache.candidates(title):
+                if row_idx > scan_rows:
+                    continue
+                head = self._head_rows(row_idx)
+                if (len(head) == row_idx and header_fingerprint(head[-1]) == fingerprint
+                        and accept(head[-1]) and not any(accept(r) for r in head[:-1])):
+                    self._header_cache.remember(title, row_idx, head[-1])  # вперёд списка
+                    return row_idx
+
+        for i, row in enumerate(self._head_rows(scan_rows), start=1):
+            if accept(row):
+                if title is not None:
+                    self._header_cache.remember(title, i, row)
+                return i
+        return None
+
+    def _header_from_row(self, row_idx: int, row: Sequence[Any]) -> HeaderInfo:
+        names = [c if c is not None else "" for c in row]
+        name_to_idx = {_norm_header(v): i for i, v in enumerate(names)}
+        return HeaderInfo(row_idx=row_idx, names=names, name_to_idx=name_to_idx)
+
     def _detect_header_row(self, scan_rows: int = 50) -> int:
         """Ищем первую строку среди первых N, где есть >=2 непустых ячейки.
         Возвращаем её индекс (Excel 1-based). Если не нашли — поднимаем ошибку.
         """
-        for i, row in enumerate(
-            self.ws.iter_rows(min_row=1, max_row=scan_rows, values_only=True), start=1
-        ):
-            non_empty = [c for c in row if c not in (None, "", " ")]
-            if len(non_empty) >= 2:
-                return i
+        def accept(row: Sequence[Any]) -> bool:
+            return len([c for c in row if c not in (None, "", " ")]) >= 2
+
+        row_idx = self._scan_header(accept, scan_rows)
+        if row_idx is not None:
+            return row_idx
 
         raise ValueError(
-            f"Не удалось определить заголовок на листе '{self.ws.title}'. "
+            f"Не удалось определить заголовок на листе '{self._rows_ws.title}'. "
             f"Проверьте первые {scan_rows} строк."
         )
 
@@ -86,6 +337,7 @@ class ExcelManager:
         """
         Ищет строку, где встречаются указанные заголовки.
         Возвращает HeaderInfo (аналог build_header).
+        Можно передать сразу в конструктор: ExcelManager(path, expected_headers=[...]).
 
         expected_headers: список ожидаемых названий столбцов
         max_scan_rows: сколько верхних строк проверять
@@ -93,17 +345,15 @@ class ExcelManager:
         """
         expected_norm = {_norm_header(h) for h in expected_headers}
 
-        for i, row in enumerate(
-                self.ws.iter_rows(min_row=1, max_row=max_scan_rows, values_only=True),
-                start=1,
-        ):
-            normalized = [_norm_header(c) for c in row]
-            matches = sum(1 for c in normalized if c in expected_norm)
-            if matches >= min_matches:
-                names = [c if c else "" for c in row]
-                name_to_idx = {_norm_header(v): idx for idx, v in enumerate(names)}
-                self.header = HeaderInfo(row_idx=i, names=names, name_to_idx=name_to_idx)
-                return self.header
+        def accept(row: Sequence[Any]) -> bool:
+            return sum(1 for c in row if _norm_header(c) in expected_norm) >= min_matches
+
+        row_idx = self._scan_header(accept, max_scan_rows)
+        if row_idx is not None:
+            names = [c if c else "" for c in self._head_rows(row_idx)[-1]]
+            name_to_idx = {_norm_header(v): idx for idx, v in enumerate(names)}
+            self.header = HeaderInfo(row_idx=row_idx, names=names, name_to_idx=name_to_idx)
+            return self.header
 
         raise ValueError(
             f"Не удалось найти строку заголовков среди первых {max_scan_rows} строк. "
@@ -113,20 +363,20 @@ class ExcelManager:
     def build_header(self, header_row: Optional[int] = None) -> HeaderInfo:
         row_idx = header_row or self._detect_header_row()
 
-        rows = list(self.ws.iter_rows(min_row=row_idx, max_row=row_idx, values_only=True))
-        if not rows:
+        rows = self._head_rows(row_idx)
+        if len(rows) < row_idx:
             raise ValueError(
-                f"В листе '{self.ws.title}' нет строки с индексом {row_idx}. "
-                f"Доступно строк: {self.ws.max_row}"
+                f"В листе '{self._rows_ws.title}' нет строки с индексом {row_idx}. "
+                f"Доступно строк: {self._rows_ws.max_row}"
             )
-        header_cells = rows[0]
-        names = [c if c is not None else "" for c in header_cells]
-        name_to_idx = {_norm_header(v): i for i, v in enumerate(names)}
-
-        return HeaderInfo(row_idx=row_idx, names=names, name_to_idx=name_to_idx)
+        return self._header_from_row(row_idx, rows[-1])
 
     def list_sheets(self) -> list[str]:
         """Имена листов книги."""
+        if self._wb is None and self._cache_entry is not None:
+            return list(self._cache_entry.sheetnames)
+        if self._wb is None and self._reader is not None:
+            return self._reader.sheetnames
         return list(self.wb.sheetnames)
 
     def data_rows(self, rules: Optional[dict[int, dict[str, Any]]] = None) -> list[list[Any]]:
@@ -134,13 +384,238 @@ class ExcelManager:
         Если передан параметр `rules`, применяет фильтрацию через filter_rows().
         """
         if self._rows_cache is None:
-            start = max(self.header.row_idx + 1, 1)
-            self._rows_cache = read_rows(self.ws, start_row=start)
+            self._rows_cache = self._read_data_rows()
+            if self._cache is not None:
+                self._cache.put(
+                    self.path, self._sheet, self._header_spec,
+                    title=self._rows_ws.title,
+                    sheetnames=self.list_sheets(),
+                    header_row_idx=self.header.row_idx,
+                    header_names=self.header.names,
+                    rows=self._rows_cache,
+                    row_numbers=self._row_numbers,
+                    blank_rows=self._blank_rows,
+                    data_only=self._data_only,
+                    engine=self._engine,
+                )
+            if self._columnar:
+                self._columns = ColumnStore(self._rows_cache)
+                self._rows_cache = self._columns.rows
         if rules:
+            if self._columnar:
+                return self.column_store().filter(rules)
+            if self._spills:
+                return self._spill_rows(iter_filtered(self._rows_cache, rules))
             filtered = filter_rows(self._rows_cache, rules)
             return filtered
         return self._rows_cache
 
+    def column_store(self) -> ColumnStore:
+        """Колоночное представление строк данных (строится один раз).
+        Колонки доступны без копирования через column_store().column(idx).data,
+        маски фильтров — через mask/equals/is_empty/contains.
+        """
+        if self._columns is None:
+            self._columns = ColumnStore(self.data_rows())
+            if self._columnar:
+                self._rows_cache = self._columns.rows
+        return self._columns
+
+    def iter_data_rows(
+        self,
+        rules: Optional[Union[dict[StrOrInt, dict[str, Any]], CompiledRules]] = None,
+        columns: Optional[list[StrOrInt]] = None,
+    ) -> Iterator[list[Any]]:
+        """Потоковый аналог data_rows: строки данных отдаются по одной.
+        Правила `rules` (колонки по имени или индексу, как в filter) применяются
+        прямо при чтении листа, отброшенные строки нигде не хранятся.
+        `columns` — подсказка движку "fast": конвертировать только эти колонки
+        (и колонки из rules), остальные значения в строках могут быть None.
+        Если data_rows уже вызывался, идём по готовому кэшу.
+        """
+        compiled = self.compile_rules(rules) if rules else None
+        keep = compiled if compiled else None  # правила без условий ничего не отбрасывают
+        if self._rows_cache is not None:
+            if keep is not None:
+                return keep.iter(self._rows_cache)
+            return iter(self._rows_cache)
+
+        col_indices = None
+        if columns is not None:
+            col_indices = {self.col_to_idx(c) for c in columns}
+            if compiled is not None:
+                col_indices.update(compiled.rules)
+        if self.profiler.enabled:
+            return self._timed_stream(keep, col_indices)
+        return self._stream_data(keep, col_indices)
+
+    def _timed_stream(
+        self,
+        keep: Optional[Callable[[list[Any]], bool]],
+        columns: Optional[Iterable[int]],
+    ) -> Iterator[list[Any]]:
+        """_stream_data с замером фаз. Поток читается лениво (например, внутри записи
+        в "write"), поэтому время копится по кускам: вызовы keep — фаза "filter",
+        остальное время получения строк — "read". Спаны пишутся по окончании потока."""
+        clock = time.perf_counter
+        filter_seconds = 0.0
+        checked = 0
+
+        def timed_keep(row: list[Any]) -> bool:
+            nonlocal filter_seconds, checked
+            t0 = clock()
+            ok = keep(row)
+            filter_seconds += clock() - t0
+            checked += 1
+            return ok
+
+        seconds = 0.0
+        passed = 0
+        rows = self._stream_data(timed_keep if keep is not None else None, columns)
+        try:
+            while True:
+                t0 = clock()
+                row = next(rows, None)
+                seconds += clock() - t0
+                if row is None:
+                    return
+                passed += 1
+                yield row
+        finally:
+            self.profiler.record("read", seconds - filter_seconds, self.path,
+                                 rows=checked if keep is not None else passed)
+            if keep is not None:
+                self.profiler.record("filter", filter_seconds, self.path, rows=checked)
+
+    def _sheet_rows_after_header(self) -> Iterator[tuple[int, Sequence[Any]]]:
+        """(номер строки Excel, значения) для всех строк после заголовка, включая пустые."""
+        start = max(self.header.row_idx + 1, 1)
+        buffered = self._head[start - 1:]
+        source: Iterable[Sequence[Any]] = buffered
+        if not self._head_complete:
+            source = chain(buffered, self._rows_ws.iter_rows(
+                min_row=start + len(buffered), values_only=True))
+        return enumerate(source, start=start)
+
+    def _numbered_data_rows(self) -> Iterator[tuple[int, list[Any]]]:
+        """(номер строки Excel, строка) для строк данных; из кэша, если он уже есть."""
+        if self._rows_cache is not None and self._row_numbers is not None:
+            return zip(self._row_numbers, self._rows_cache)
+        return ((n, list(row)) for n, row in self._sheet_rows_after_header()
+                if not _is_empty_row(row))
+
+    def _read_data_rows(self) -> Sequence[list[Any]]:
+        """Все строки данных листа; попутно запоминает номера строк Excel (см. get_value).
+        При compact=True повторяющиеся значения в строках интернируются (core.compact_rows).
+        """
+        rows: list = []
+        numbers = array("I")
+        blanks: dict[int, list[Any]] = {}
+        make_row = Interner().row if self._compact else list
+        writer: Optional[SpillWriter] = None
+        with self.profiler.span("read", self.path) as span:
+            for n, row in self._sheet_rows_after_header():
+                if _is_empty_row(row):
+                    if any(c is not None for c in row):
+                        blanks[n] = list(row)
+                    continue
+                numbers.append(n)
+                if writer is not None:
+                    if self._compact and not writer.pending:
+                        # интернирование в пределах порции: порции на диске независимы
+                        make_row = Interner().row
+                    writer.append(make_row(row))
+                    continue
+                rows.append(make_row(row))
+                if self._spills and len(rows) >= self._spill_sample:
+                    writer = SpillWriter(self._spill_chunk(rows))
+                    writer.extend(rows)
+                    rows = []
+            span.add(rows=len(numbers))
+        self._row_numbers = numbers
+        self._blank_rows = blanks
+        if writer is not None:
+            return writer.finish()
+        return rows
+
+    @property
+    def _spills(self) -> bool:
+        return self._chunk_rows is not None or self._max_memory is not None
+
+    @property
+    def _spill_sample(self) -> int:
+        """Сколько строк прочитать в память, прежде чем начать сбрасывать их на диск."""
+        if self._chunk_rows is not None:
+            return self._chunk_rows
+        return 1_000
+
+    def _spill_chunk(self, sample: Sequence[Sequence[Any]]) -> int:
+        if self._chunk_rows is not None:
+            return self._chunk_rows
+        return chunk_rows_for(self._max_memory, sample)
+
+    def _spill_rows(self, rows: Iterable[list[Any]]) -> Sequence[list[Any]]:
+        """Результат (например, filter) — списком или, при chunk_rows/max_memory, на диске."""
+        if not self._spills:
+            return list(rows)
+        sample = self._rows_cache if self._rows_cache is not None else ()
+        chunk = self._chunk_rows or getattr(sample, "chunk_rows", None) or self._spill_chunk(sample)
+        return spill(rows, chunk)
+
+    def _stream_data(
+        self,
+        keep: Optional[Callable[[list[Any]], bool]] = None,
+        columns: Optional[Iterable[int]] = None,
+    ) -> Iterator[list[Any]]:
+        """Строки данных листа: сначала уже прочитанные при поиске заголовка,
+        затем остальные (чтение продолжается после буфера).
+        """
+        start = max(self.header.row_idx + 1, 1)
+        buffered = self._head[start - 1:]
+        rows = iter_nonempty(buffered, keep)
+        if self._head_complete:
+            return rows
+        rest = stream_rows(self._rows_ws, start_row=start + len(buffered), keep=keep, columns=columns)
+        return chain(rows, rest)
+
+    def memory_usage(self) -> dict[str, Any]:
+        """Оценка памяти, занятой прочитанными данными листа (байты).
+
+        storage : "none" (строки ещё не читались), "list", "compact", "columnar",
+                  "cache" (строки в отображённом в память файле SheetCache)
+                  или "spill" (строки во временном файле, в памяти — только порции из LRU)
+        rows    : число строк данных
+        data    : строки или колонки с уникальными объектами значений
+        index   : номера строк Excel и индекс смещений для get_value
+        indexes : хеш-индексы build_index (позиции строк)
+        total   : сумма
+        """
+        rows = self._rows_cache
+        report: dict[str, Any] = {"storage": "none", "rows": 0, "data": 0}
+        if self._columns is not None and (self._columnar or rows is None):
+            report.update(storage="columnar", rows=len(self._columns), data=self._columns.nbytes())
+        elif self._cache_entry is not None and rows is self._cache_entry.rows:
+            report.update(storage="cache", rows=len(rows), data=0)
+        elif isinstance(rows, SpilledRows):
+            cached = [row for chunk in rows._cache.values() for row in chunk]
+            report.update(storage="spill", rows=len(rows), data=memory_usage(cached)["total"],
+                          chunk_rows=rows.chunk_rows, spill_bytes=os.path.getsize(rows.path))
+        elif rows is not None:
+            usage = memory_usage(rows)
+            report.update(storage="compact" if self._compact else "list",
+                          rows=usage["rows"], data=usage["total"], unique_values=usage["unique_values"])
+        index = 0
+        for part in (self._row_numbers, self._row_offsets):
+            if isinstance(part, array):
+                index += sys.getsizeof(part)
+        report["index"] = index
+        report["indexes"] = sum(
+            sys.getsizeof(idx._positions) + sum(sys.getsizeof(p) for p in idx._positions.values())
+            for idx in self._indexes.values()
+        )
+        report["total"] = report["data"] + report["index"] + report["indexes"]
+        return report
+
     def count_rows(self) -> int:
         """Количество непустых строк данных (после заголовка)."""
         return len(self.data_rows())
@@ -151,6 +626,127 @@ class ExcelManager:
             return [(i, v if v is not None else "") for i, v in enumerate(self.header.names)]
         return [v if v is not None else "" for v in self.header.names]
 
+    def _idx_rules(self, rules: dict[StrOrInt, dict[str, Any]]) -> dict[int, dict[str, Any]]:
+        """Правила с колонками по имени -> правила с 0-based индексами."""
+        return {self.col_to_idx(col): cond for col, cond in rules.items()}
+
+    def compile_rules(
+        self, rules: Union[dict[StrOrInt, dict[str, Any]], CompiledRules]
+    ) -> CompiledRules:
+        """Компилирует правила (колонки по имени или индексу) один раз,
+        чтобы переиспользовать их в filter / filter_and_transfer / iter_data_rows.
+        """
+        if isinstance(rules, CompiledRules):
+            return rules
+        return compile_rules(self._idx_rules(rules))
+
+    def _is_self_path(self, dest_path: Path) -> bool:
+        """Пишем ли мы в тот же файл, из которого читаем.
+        В этом случае потоковое чтение небезопасно: сохранение перезапишет исходник,
+        поэтому строки сначала кэшируются через data_rows().
+        """
+        try:
+            return dest_path.resolve() == self.path.resolve()
+        except OSError:
+            return False
+
+    def _header_for(self, col_indices: list[int]) -> list[Any]:
+        return [self.header.names[i] if i < len(self.header.names) else None for i in col_indices]
+
+    def _project(
+        self,
+        src_rows: Iterable[list[Any]],
+        col_indices: list[int],
+        include_header: bool,
+    ) -> Iterator[list[Any]]:
+        """Выбор колонок из потока строк (с заголовком, если нужно)."""
+        if include_header:
+            yield self._header_for(col_indices)
+        for r in src_rows:
+            yield [r[i] if i < len(r) else None for i in col_indices]
+
+    def _copy_rows(
+        self,
+        columns: list[StrOrInt],
+        rows: Optional[Iterable[list[Any]]],
+        include_header: bool,
+    ) -> Iterator[list[Any]]:
+        """Строки для copy_columns: выбранные колонки из rows или потокового чтения."""
+        col_indices = [self.col_to_idx(c) for c in columns]
+        src_rows = rows if rows is not None else self.iter_data_rows(columns=columns)
+        return self._project(src_rows, col_indices, include_header)
+
+    def _filtered_out_rows(
+        self,
+        columns: list[StrOrInt],
+        rules: Union[dict[StrOrInt, dict[str, Any]], CompiledRules],
+        rows: Optional[Iterable[list[Any]]],
+        include_header: bool,
+    ) -> Iterator[list[Any]]:
+        """Строки для filter_and_transfer: фильтр по rules и выбор колонок."""
+        if rows is not None:
+            filtered_rows = iter_filtered(rows, self.compile_rules(rules))
+        else:
+            filtered_rows = self.iter_data_rows(rules, columns=columns)
+        col_indices = [self.col_to_idx(c) for c in columns]
+        return self._project(filtered_rows, col_indices, include_header)
+
+    @staticmethod
+    def _write_cells(dws: Worksheet, rows: Iterable[list[Any]], start_cell: str) -> tuple[int, int]:
+        """Пишет rows начиная с start_cell; возвращает (строк, ячеек)."""
+        start_row, start_col = coordinate_to_tuple(start_cell)
+        n_rows = n_cells = 0
+        for i, row in enumerate(rows, start=start_row):
+            for j, val in enumerate(row, start=start_col):
+                dws.cell(row=i, column=j, value=val)
+            n_rows += 1
+            n_cells += len(row)
+        return n_rows, n_cells
+
+    @staticmethod
+    def _save_rows(
+        dest_path: Path,
+        dest_sheet: str,
+        rows: Iterable[list[Any]],
+        start_cell: str,
+        stream: bool = False,
+        on_sheet: Optional[Callable[[Worksheet], None]] = None,
+        profiler: Profiler = NULL_PROFILER,
+    ) -> None:
+        """Запись строк в целевую книгу/лист.
+
+        stream=False — классический путь: книга загружается целиком, ячейки пишутся
+        через dws.cell, книга сохраняется.
+        stream=True — строки пишутся по мере поступления: новый файл создаётся
+        write-only книгой, новый лист в существующем файле дописывается на уровне
+        архива (остальные листы не загружаются в openpyxl). Если лист уже есть,
+        используется классический путь.
+        on_sheet(dws) — вызывается после записи ячеек, до сохранения (только классический путь).
+        profiler — замеры фаз write/save; при потоковой записи чтение исходника идёт
+        вместе с записью, поэтому "write" включает и время фаз "read"/"filter",
+        которые iter_data_rows пишет отдельно.
+        """
+        if stream and on_sheet is None:
+            with profiler.span("write", dest_path) as span:
+                # обёртка считает строки в спан этой попытки; путь ниже считает в свой
+                counted = _counted(rows, span) if profiler.enabled else rows
+                if write_sheet_streaming(dest_path, dest_sheet, counted, start_cell):
+                    return
+        with profiler.span("load", dest_path):
+            if dest_path.exists():
+                dwb = load_workbook(dest_path)
+            else:
+                dwb = Workbook()
+        dws = ensure_ws(dwb, dest_sheet)
+
+        with profiler.span("write", dest_path) as span:
+            span.add(*ExcelManager._write_cells(dws, rows, start_cell))
+        if on_sheet is not None:
+            on_sheet(dws)
+
+        with profiler.span("save", dest_path):
+            dwb.save(dest_path)
+
     def col_to_idx(self, col: StrOrInt) -> int:
         """Преобразование 'ИмяКолонки' -> 0-based idx, либо int -> int."""
         if isinstance(col, int):
@@ -160,6 +756,40 @@ class ExcelManager:
             raise KeyError(f"Колонка '{col}' не найдена среди заголовков: {self.header.names}")
         return self.header.name_to_idx[key]
 
+    def _data_row_numbers(self) -> Sequence[int]:
+        """Номера строк Excel для строк data_rows."""
+        self.data_rows()
+        if self._row_numbers is None:  # строки взяты из кэша без номеров
+            self._read_data_rows()
+        return self._row_numbers
+
+    def _offsets(self) -> array:
+        """Индекс «номер строки Excel -> позиция в data_rows» (-1 — строки нет среди данных).
+        Строится один раз: из номеров, запомненных при чтении data_rows (или из кэша).
+        """
+        if self._row_offsets is None:
+            start = max(self.header.row_idx + 1, 1)
+            numbers = self._data_row_numbers()
+            size = numbers[-1] - start + 1 if len(numbers) else 0
+            offsets = array("i", [-1]) * size
+            for pos, n in enumerate(numbers):
+                offsets[n - start] = pos
+            self._row_offsets = offsets
+        return self._row_offsets
+
+    def _abs_row(self, row_number: int) -> Optional[Sequence[Any]]:
+        """Строка листа по номеру Excel (None — строки нет или она пустая)."""
+        if row_number < 1:
+            return None
+        if row_number <= self.header.row_idx:
+            head = self._head_rows(row_number)
+            return head[-1] if len(head) == row_number else None
+        i = row_number - max(self.header.row_idx + 1, 1)
+        offsets = self._offsets()
+        if i < len(offsets) and offsets[i] >= 0:
+            return self.data_rows()[offsets[i]]
+        return self._blank_rows.get(row_number)
+
     def get_value(self, row_number: int, col: StrOrInt, absolute: bool = False) -> Any:
         """
         Получить значение:
@@ -167,13 +797,14 @@ class ExcelManager:
                      (т.е. 1 соответствует первой строке после заголовка).
                      Если absolute=True — это реальный Excel-ряд.
           col: индекс (0-based) или название столбца.
+        Для absolute=True при первом обращении строится индекс строк, дальше — O(1).
         """
         col_idx = self.col_to_idx(col)
 
         if absolute:
-            values = next(
-                self.ws.iter_rows(min_row=row_number, max_row=row_number, values_only=True)
-            )
+            values = self._abs_row(row_number)
+            if values is None:
+                return None
             return values[col_idx] if col_idx < len(values) else None
 
         rows = self.data_rows()
@@ -182,16 +813,87 @@ class ExcelManager:
         row = rows[row_number - 1]
         return row[col_idx] if col_idx < len(row) else None
 
+    def get_values(
+        self,
+        cells: Iterable[Union[str, tuple[int, StrOrInt]]],
+        absolute: bool = False,
+    ) -> list[Any]:
+        """Значения сразу многих ячеек (в том же порядке, что и cells).
+
+        cells: координаты Excel ("B5" — всегда абсолютные) или пары (номер строки, колонка),
+               где колонка — индекс (0-based) или название, а номер строки трактуется
+               как в get_value (absolute).
+        Каждая строка листа извлекается один раз, запросы обрабатываются по возрастанию строк.
+        """
+        requests = []
+        for pos, cell in enumerate(cells):
+            if isinstance(cell, str):
+                row_number, col_number = coordinate_to_tuple(cell)
+                requests.append((True, row_number, col_number - 1, pos))
+            else:
+                row_number, col = cell
+                requests.append((absolute, row_number, self.col_to_idx(col), pos))
+        requests.sort(key=lambda r: (r[0], r[1]))
+
+        result: list[Any] = [None] * len(requests)
+        data = self.data_rows() if any(not r[0] for r in requests) else None
+        last_key, row = None, None
+        for is_abs, row_number, col_idx, pos in requests:
+            if (is_abs, row_number) != last_key:
+                last_key = (is_abs, row_number)
+                if is_abs:
+                    row = self._abs_row(row_number)
+                else:
+                    row = data[row_number - 1] if 1 <= row_number <= len(data) else None
+            if row is not None and col_idx < len(row):
+                result[pos] = row[col_idx]
+        return result
+
     def get_column_values(self, col: StrOrInt, include_header: bool = False) -> list[Any]:
         """Получить все значения столбца (по индексу или имени)."""
         idx = self.col_to_idx(col)
+        if self._columnar:
+            values = self.column_store().column_values(idx)
+        else:
+            values = [r[idx] if idx < len(r) else None for r in self.data_rows()]
         if include_header:
-            return [self.header.names[idx]] + [
-                r[idx] if idx < len(r) else None for r in self.data_rows()
-            ]
-        return [r[idx] if idx < len(r) else None for r in self.data_rows()]
-
-    def filter(self, rules: dict[StrOrInt, dict[str, Any]]) -> list[list[Any]]:
+            return [self.header.names[idx]] + values
+        return values
+
+    def coerce(self, col: StrOrInt, kind: str) -> list[Any]:
+        """Значения столбца, приведённые к типу: 'date' (date), 'int' (int) или 'decimal' (Decimal).
+        Формат дат угадывается по выборке, повторяющиеся строки разбираются один раз
+        (см. core.coerce); неприводимые значения -> None.
+        Результат запоминается: aggregate использует типизированные значения этого столбца.
+        """
+        idx = self.col_to_idx(col)
+        cached = self._typed.get(idx)
+        if cached is not None and cached[0] == kind:
+            return cached[1]
+        values = coerce_values(self.get_column_values(idx), kind)
+        self._typed[idx] = (kind, values)
+        return values
+
+    def _typed_rows(
+        self,
+        rules: Optional[Union[dict[StrOrInt, dict[str, Any]], CompiledRules]],
+        typed: dict[int, list[Any]],
+    ) -> Iterator[list[Any]]:
+        """Строки данных (после фильтра по исходным значениям) с типизированными колонками."""
+        keep = self.compile_rules(rules) if rules else None
+        for pos, row in enumerate(self.data_rows()):
+            if keep and not keep(row):
+                continue
+            row = list(row)
+            for idx, values in typed.items():
+                if idx >= len(row):
+                    row.extend([None] * (idx + 1 - len(row)))
+                row[idx] = values[pos]
+            yield row
+
+    def filter(
+        self, rules: Union[dict[StrOrInt, dict[str, Any]], CompiledRules]
+    ) -> list[list[Any]]:
         """Фильтрация по правилам, но можно указывать колонки по имени или индексу.
         Возвращает новый список строк.
         Пример rules:
@@ -201,11 +903,170 @@ class ExcelManager:
             }
         """
 
-        idx_rules: dict[int, dict[str, Any]] = {}
-        for col, cond in rules.items():
-            idx_rules[self.col_to_idx(col)] = cond
+        compiled = self.compile_rules(rules)
+        if self._columnar:
+            store = self.column_store()
+            with self.profiler.span("filter", self.path, rows=len(store)):
+                return store.filter(compiled)
         rows = self.data_rows()
-        return filter_rows(rows, idx_rules)
+        with self.profiler.span("filter", self.path, rows=len(rows)):
+            if self._spills:
+                return self._spill_rows(compiled.iter(rows))
+            return filter_rows(rows, compiled)
+
+    def _key_indices(self, col: Union[StrOrInt, list[StrOrInt], tuple[StrOrInt, ...]]) -> tuple[int, ...]:
+        cols = col if isinstance(col, (list, tuple)) else [col]
+        if not cols:
+            raise ValueError("Не указаны колонки ключа")
+        return tuple(self.col_to_idx(c) for c in cols)
+
+    def build_index(self, col: Union[StrOrInt, list[StrOrInt], tuple[StrOrInt, ...]]) -> RowIndex:
+        """Хеш-индекс строк данных по колонке (или нескольким — составной ключ).
+        Ключи нормализуются (регистр, пробелы, 10.0 == 10), пустые ключи не индексируются.
+        Индекс строится один раз и переиспользуется.
+
+            idx = ref.build_index(["ИНН", "КПП"])
+            idx.first(("7700000000", "770001001"))  # строка справочника или None
+        """
+        key = self._key_indices(col)
+        index = self._indexes.get(key)
+        if index is None:
+            index = self._indexes[key] = RowIndex(self.data_rows(), key)
+        return index
+
+    def join(
+        self,
+        other: "ExcelManager",
+        on: Union[StrOrInt, list[StrOrInt]],
+        columns: Optional[list[StrOrInt]] = None,
+        how: str = "left",
+        right_on: Optional[Union[StrOrInt, list[StrOrInt]]] = None,
+        include_header: bool = False,
+    ) -> list[list[Any]]:
+        """Обогащение строк текущего листа колонками из другой таблицы (аналог ВПР).
+        По other строится хеш-индекс, строки текущего листа проходятся один раз.
+
+        :param other: ExcelManager справочника
+        :param on: колонка(и) ключа в текущем листе (и в other, если right_on не задан)
+        :param columns: колонки other, которые дописываются справа (None — все)
+        :param how: "left" — сохранять строки без совпадения, "inner" — отбрасывать
+        :param right_on: колонка(и) ключа в other, если называются иначе
+        :param include_header: первой строкой вернуть объединённый заголовок
+        :return: список строк: все колонки текущего листа + columns из other.
+                 При нескольких совпадениях строка повторяется для каждого.
+        """
+        left_on = self._key_indices(on)
+        index = other.build_index(right_on if right_on is not None else on)
+        if len(index.col_indices) != len(left_on):
+            raise ValueError("Количество колонок ключа в on и right_on должно совпадать")
+        if columns is None:
+            right_cols = list(range(len(other.header.names)))
+        else:
+            right_cols = [other.col_to_idx(c) for c in columns]
+
+        width = len(self.header.names)
+        left_rows = (r if len(r) >= width else r + [None] * (width - len(r))
+                     for r in self.iter_data_rows())
+        out = list(join_rows(left_rows, left_on, index, right_cols, how))
+        if include_header:
+            out.insert(0, list(self.header.names) + other._header_for(right_cols))
+        return out
+
+    def diff(
+        self,
+        other: "ExcelManager",
+        key: Union[StrOrInt, list[StrOrInt]],
+        compare: Optional[list[StrOrInt]] = None,
+        normalize: bool = True,
+        dest_path: Optional[Union[str, Path]] = None,
+        dest_sheet: str = "Sheet1",
+        start_cell: str = "A1",
+    ) -> RowDiff:
+        """Сверка с другой таблицей по ключу (см. core.row_diff): текущий лист — новая версия,
+        other — старая (прошлая выгрузка или эталон).
+
+        :param other: ExcelManager старой таблицы
+        :param key: колонка(и) ключа; названия ищутся в каждой таблице по её заголовку
+        :param compare: колонки для сравнения (None — все общие по названию, кроме ключа)
+        :param normalize: сравнивать значения без учёта регистра и пробелов по краям, 10.0 == 10
+        :param dest_path: если задан — отчёт (статус, ключ, колонка, было, стало)
+                          записывается через write_rows
+        :return: RowDiff: added (строки текущего листа), removed (строки other),
+                 changed (с изменившимися колонками), unchanged
+        """
+        new_key = self._key_indices(key)
+        old_key = other._key_indices(key)
+        if compare is None:
+            skip = set(new_key)
+            compare = [name for i, name in enumerate(self.header.names)
+                       if i not in skip and _norm_header(name) and _norm_header(name) in other.header.name_to_idx]
+        new_cols = [self.col_to_idx(c) for c in compare]
+        old_cols = [other.col_to_idx(c) for c in compare]
+
+        result = diff_rows(
+            self.iter_data_rows(), other.iter_data_rows(),
+            new_key, old_key, new_cols, old_cols,
+            key_names=self._header_for(list(new_key)),
+            compare_names=self._header_for(new_cols),
+            normalize=normalize,
+        )
+        if dest_path is not None:
+            self.write_rows(dest_path, dest_sheet, result.report_rows(), start_cell)
+        return result
+
+    def aggregate(
+        self,
+        group_by: Union[StrOrInt, list[StrOrInt]],
+        metrics: dict[str, MetricSpec],
+        rules: Optional[Union[dict[StrOrInt, dict[str, Any]], CompiledRules]] = None,
+        dest_path: Optional[Union[str, Path]] = None,
+        dest_sheet: str = "Sheet1",
+        pivot: Optional[tuple[StrOrInt, str]] = None,
+        start_cell: str = "A1",
+    ) -> Aggregation:
+        """Группировка строк и агрегаты за один потоковый проход (см. core.aggregate).
+
+        :param group_by: колонка(и) группировки (названия или индексы)
+        :param metrics: имя результата -> "count" или (функция, колонка), функции:
+                        count, sum, mean, min, max, nunique
+                        пример: {"Заказов": "count", "Итого": ("sum", "Сумма")}
+        :param rules: фильтр (как в методе filter), применяется при чтении
+        :param dest_path: если задан — результат записывается через write_rows
+        :param dest_sheet: лист для результата
+        :param pivot: (колонка группировки, метрика) — записать сводную таблицу:
+                      значения колонки разворачиваются в колонки листа
+        :param start_cell: ячейка старта вставки
+        Колонки, приведённые через coerce, группируются и агрегируются по типизированным
+        значениям (суммы Decimal, min/max дат), фильтр по-прежнему смотрит на исходные.
+        """
+        group_cols = group_by if isinstance(group_by, (list, tuple)) else [group_by]
+        group_idx = [self.col_to_idx(c) for c in group_cols]
+        specs = []
+        for name, spec in metrics.items():
+            func, col = parse_metric(name, spec)
+            specs.append((func, None if col is None else self.col_to_idx(col)))
+
+        used = group_idx + [idx for _, idx in specs if idx is not None]
+        typed = {idx: self._typed[idx][1] for idx in used if idx in self._typed}
+        if typed:
+            rows = self._typed_rows(rules, typed)
+        else:
+            rows = self.iter_data_rows(rules, columns=used)
+        result = Aggregation(
+            group_names=self._header_for(group_idx),
+            metric_names=list(metrics),
+            groups=aggregate_rows(rows, group_idx, specs),
+        )
+        if dest_path is not None:
+            if pivot is not None:
+                pivot_idx = self.col_to_idx(pivot[0])
+                if pivot_idx not in group_idx:
+                    raise ValueError(f"Колонка сводной '{pivot[0]}' должна входить в group_by")
+                out = result.pivot(group_idx.index(pivot_idx), pivot[1])
+            else:
+                out = result.rows()
+            self.write_rows(dest_path, dest_sheet, out, start_cell)
+        return result
 
     def copy_columns(
         self,
@@ -215,6 +1076,8 @@ class ExcelManager:
         rows: Optional[list[list[Any]]] = None,
         include_header: bool = True,
         start_cell: str = "A1",
+        stream: bool = False,
+        styles: bool = False,
     ) -> Path:
         """Скопировать выбранные столбцы текущего листа в ДРУГУЮ книгу/лист.
         Если файла нет — создаём; если листа нет — создаём (регистронезависимо).
@@ -222,59 +1085,84 @@ class ExcelManager:
         :param dest_path: путь к выходному xlsx (если None — берём self.path)
         :param dest_sheet: имя листа в выходном файле
         :param columns: список колонок (названия или индексы), которые переносим
-        :param rows: можно передать заранее считанные строки (если None — берём из data_rows)
+        :param rows: можно передать заранее считанные строки
+                     (если None — строки читаются потоково через iter_data_rows)
         :param include_header: включать ли строку заголовка
         :param start_cell: ячейка старта вставки (по умолчанию A1)
+        :param stream: потоковая запись (write-only), см. _save_rows
+        :param styles: сразу перенести и стили (как transfer_styles, но без повторного
+                       открытия выходной книги; требует read_only=False, stream не используется)
         """
         dest_path = Path(dest_path) if dest_path else self.path
-        if dest_path.exists():
-            dwb = load_workbook(dest_path)
-        else:
-            dwb = Workbook()
-        dws = ensure_ws(dwb, dest_sheet)
-
-        src_rows = rows if rows is not None else self.data_rows()
-        col_indices = [self.col_to_idx(c) for c in columns]
-
-        out_rows: list[list[Any]] = []
-        if include_header:
-            out_rows.append(
-                [self.header.names[i] if i < len(self.header.names) else None for i in col_indices]
-            )
-        for r in src_rows:
-            out_rows.append([r[i] if i < len(r) else None for i in col_indices])
-
-        start_row, start_col = coordinate_to_tuple(start_cell)
-        for i, row in enumerate(out_rows, start=start_row):
-            for j, val in enumerate(row, start=start_col):
-                dws.cell(row=i, column=j, value=val)
-
-        dwb.save(dest_path)
+        if styles:
+            return self._transfer_styled(dest_path, dest_sheet, columns, None, rows,
+                                         include_header, start_cell)
+        if rows is None and self._is_self_path(dest_path):
+            rows = self.data_rows()
+
+        out_rows = self._copy_rows(columns, rows, include_header)
+        self._save_rows(dest_path, dest_sheet, out_rows, start_cell, stream, profiler=self.profiler)
         return dest_path
 
     def write_rows(
         self,
         dest_path: Union[str, Path],
         dest_sheet: str,
-        rows: list[list[Any]],
+        rows: Iterable[list[Any]],
         start_cell: str = "A1",
+        stream: bool = False,
     ) -> Path:
-        """Запись произвольных rows в целевую книгу/лист."""
+        """Запись произвольных rows в целевую книгу/лист.
+        rows может быть и генератором; при stream=True строки пишутся по мере поступления.
+        """
         dest_path = Path(dest_path)
-        if dest_path.exists():
-            dwb = load_workbook(dest_path)
-        else:
-            dwb = Workbook()
-
-        dws = ensure_ws(dwb, dest_sheet)
-
-        start_row, start_col = coordinate_to_tuple(start_cell)
+        self._save_rows(dest_path, dest_sheet, rows, start_cell, stream, profiler=self.profiler)
+        return dest_path
 
-        for i, row in enumerate(rows, start=start_row):
-            for j, val in enumerate(row, start=start_col):
-                dws.cell(row=i, column=j, value=val)
+    def export(
+        self,
+        dest_path: Union[str, Path],
+        columns: Optional[list[StrOrInt]] = None,
+        rules: Optional[Union[dict[StrOrInt, dict[str, Any]], CompiledRules]] = None,
+        rows: Optional[list[list[Any]]] = None,
+        include_header: bool = True,
+        fmt: Optional[str] = None,
+        delimiter: str = ",",
+        encoding: str = "utf-8",
+        batch_rows: int = DEFAULT_BATCH_ROWS,
+    ) -> Path:
+        """Выгрузка выбранных колонок (с фильтром) в CSV / Parquet / Arrow IPC, минуя openpyxl.
+        Выбор колонок и фильтр — как в copy_columns / filter_and_transfer; строки идут
+        потоком; для Parquet/Arrow пачки по batch_rows строк проходят через временный файл,
+        в памяти держится не больше одной-двух пачек.
+
+        :param dest_path: выходной файл; формат — fmt или по расширению (.csv, .parquet, .arrow/.feather)
+        :param columns: колонки (названия или индексы); None — все колонки заголовка
+        :param rules: фильтр (как в методе filter) или результат compile_rules; None — без фильтра
+        :param rows: можно передать заранее считанные строки
+        :param include_header: строка заголовка в CSV (в Parquet/Arrow имена колонок есть всегда)
+        :param fmt: "csv", "parquet" или "arrow"
+        :param delimiter: разделитель CSV
+        :param encoding: кодировка CSV (для Excel удобна "utf-8-sig")
+        :param batch_rows: строк в пачке Parquet/Arrow; типы колонок определяются по всем строкам
+                           (int и float вместе — float, прочие смеси — строка)
+        """
+        dest_path = Path(dest_path)
+        fmt = detect_format(dest_path, fmt)
+        if self._is_self_path(dest_path):
+            raise ValueError("Выгрузка не может перезаписать исходный файл")
+        if columns is None:
+            columns = list(range(len(self.header.names)))
+        if rules:
+            out_rows = self._filtered_out_rows(columns, rules, rows, include_header=False)
+        else:
+            out_rows = self._copy_rows(columns, rows, include_header=False)
+        header = self._header_for([self.col_to_idx(c) for c in columns])
 
-        dwb.save(dest_path)
+        with self.profiler.span("write", dest_path) as span:
+            if self.profiler.enabled:
+                out_rows = _counted(out_rows, span)
+            export_rows(dest_path, out_rows, header, fmt, include_header, delimiter, encoding, batch_rows)
         return dest_path
 
     def col_idx_by_name(self, name: str, if_missing: Optional[int] = None) -> int:
@@ -301,6 +1189,8 @@ class ExcelManager:
         rows: Optional[list[list[Any]]] = None,
         include_header: bool = True,
         start_cell: str = "A1",
+        stream: bool = False,
+        styles: bool = False,
     ) -> Path:
         """Передача названий столбцов и перенос их в другую таблицу:
         принимаем список заголовков (в нужном порядке), копируем соответствующие колонки.
@@ -311,6 +1201,8 @@ class ExcelManager:
         :param rows: можно передать заранее считанные строки (если None — берём из data_rows)
         :param include_header: включать ли строку заголовка
         :param start_cell: ячейка старта вставки (по умолчанию A1)
+        :param stream: потоковая запись (write-only), см. _save_rows
+        :param styles: сразу перенести и стили, см. copy_columns
         """
         return self.copy_columns(
             dest_path=dest_path,
@@ -319,6 +1211,8 @@ class ExcelManager:
             rows=rows,
             include_header=include_header,
             start_cell=start_cell,
+            stream=stream,
+            styles=styles,
         )
 
     def filter_and_transfer(
@@ -326,50 +1220,139 @@ class ExcelManager:
         dest_path: Optional[Union[str, Path]],
         dest_sheet: str,
         columns: list[StrOrInt],
-        rules: dict[StrOrInt, dict[str, Any]],
+        rules: Union[dict[StrOrInt, dict[str, Any]], CompiledRules],
         rows: Optional[list[list[Any]]] = None,
         include_header: bool = True,
         start_cell: str = "A1",
+        stream: bool = False,
+        styles: bool = False,
+        incremental: bool = False,
     ) -> Path:
         """Фильтрует строки по правилам и переносит выбранные колонки в другую таблицу.
 
         :param dest_path: путь к выходному xlsx (если None — берём self.path)
         :param dest_sheet: имя листа в выходном файле
         :param columns: список колонок (названия или индексы), которые переносим
-        :param rules: фильтр (как в методе filter)
-        :param rows: можно передать заранее считанные строки (если None — берём из data_rows)
+        :param rules: фильтр (как в методе filter) или результат compile_rules
+        :param rows: можно передать заранее считанные строки
+                     (если None — строки читаются потоково, фильтр применяется при чтении)
         :param include_header: включать ли строку заголовка
         :param start_cell: ячейка старта вставки (по умолчанию A1)
+        :param stream: потоковая запись (write-only), см. _save_rows
+        :param styles: сразу перенести и стили исходных строк, прошедших фильтр, см. copy_columns
+        :param incremental: дописать только строки, появившиеся в источнике после прошлого
+                            запуска (водяной знак хранится рядом с dest_path, см. core.watermark);
+                            если строки выше водяного знака изменились или поменялись параметры,
+                            лист перестраивается целиком. stream в этом режиме не используется.
         """
         dest_path = Path(dest_path) if dest_path else self.path
-        if dest_path.exists():
-            dwb = load_workbook(dest_path)
-        else:
-            dwb = Workbook()
-        dws = ensure_ws(dwb, dest_sheet)
-
-        src_rows = rows if rows is not None else self.data_rows()
+        if incremental:
+            if rows is not None or styles:
+                raise ValueError("incremental=True нельзя сочетать с rows и styles")
+            if self._is_self_path(dest_path):
+                raise ValueError("incremental=True: целевой файл не может совпадать с исходным")
+            return self._transfer_incremental(dest_path, dest_sheet, columns, rules,
+                                              include_header, start_cell)
+        if styles:
+            return self._transfer_styled(dest_path, dest_sheet, columns, rules, rows,
+                                         include_header, start_cell)
+        if rows is None and self._is_self_path(dest_path):
+            rows = self.data_rows()
+
+        out_rows = self._filtered_out_rows(columns, rules, rows, include_header)
+        self._save_rows(dest_path, dest_sheet, out_rows, start_cell, stream, profiler=self.profiler)
+        return dest_path
 
-        idx_rules: dict[int, dict[str, Any]] = {
-            self.col_to_idx(col): cond for col, cond in rules.items()
-        }
-        filtered_rows = filter_rows(src_rows, idx_rules)
+    def _rows_after_mark(
+        self, mark: Watermark, digest: PrefixHash
+    ) -> Optional[list[tuple[int, list[Any]]]]:
+        """Строки данных после водяного знака (с номерами строк Excel).
+        None, если префикс источника до mark.last_row изменился.
+        digest по выходу покрывает все строки данных листа.
+        """
+        numbered = self._numbered_data_rows()
+        tail: list[tuple[int, list[Any]]] = []
+        for n, row in numbered:
+            if n > mark.last_row:
+                tail.append((n, row))
+                break
+            digest.update(n, row)
+        if digest.hexdigest() != mark.digest:
+            return None
+        tail.extend(numbered)
+        for n, row in tail:
+            digest.update(n, row)
+        return tail
 
+    def _transfer_incremental(
+        self,
+        dest_path: Path,
+        dest_sheet: str,
+        columns: list[StrOrInt],
+        rules: Union[dict[StrOrInt, dict[str, Any]], CompiledRules],
+        include_header: bool,
+        start_cell: str,
+    ) -> Path:
+        """filter_and_transfer(..., incremental=True)."""
+        compiled = self.compile_rules(rules)
         col_indices = [self.col_to_idx(c) for c in columns]
-        out_rows: list[list[Any]] = []
-        if include_header:
-            out_rows.append(
-                [self.header.names[i] if i < len(self.header.names) else None for i in col_indices]
-            )
-        for r in filtered_rows:
-            out_rows.append([r[i] if i < len(r) else None for i in col_indices])
-
         start_row, start_col = coordinate_to_tuple(start_cell)
-        for i, row in enumerate(out_rows, start=start_row):
-            for j, val in enumerate(row, start=start_col):
-                dws.cell(row=i, column=j, value=val)
+        params = _hash(self._header_for(col_indices), col_indices,
+                       sorted(compiled.rules.items()), include_header, start_row, start_col)
+        store = WatermarkStore(sidecar_path(dest_path))
+        key = store.key(self.path, self._rows_ws.title, dest_sheet)
+        mark = store.get(key)
+
+        dwb = load_workbook(dest_path) if dest_path.exists() else Workbook()
+        had_sheet = dest_sheet.lower() in (s.lower() for s in dwb.sheetnames)
+        dws = ensure_ws(dwb, dest_sheet)
 
-        dwb.save(dest_path)
+        digest = PrefixHash()
+        tail = None
+        if mark is not None and had_sheet and mark.params == params:
+            tail = self._rows_after_mark(mark, digest)
+
+        if tail is not None:
+            # водяной знак актуален: дописываем под уже перенесённые строки
+            write_row = mark.dest_next_row
+            last_row = tail[-1][0] if tail else mark.last_row
+            src_rows = (row for _, row in tail)
+            out_rows = self._project(compiled.iter(src_rows), col_indices, False)
+        else:
+            # первый запуск или префикс переписан — перестраиваем лист целиком
+            if mark is not None and had_sheet:
+                # очищаем только прежний блок переноса: колонки правее и левее него не наши
+                if mark.width:
+                    row0, col0, width = mark.dest_row, mark.dest_col, mark.width
+                else:
+                    row0, col0, width = start_row, start_col, len(col_indices)
+                for cells in dws.iter_rows(min_row=row0, max_row=mark.dest_next_row - 1,
+                                           min_col=col0, max_col=col0 + width - 1):
+                    for cell in cells:
+                        cell.value = None
+            digest = PrefixHash()
+            write_row = start_row
+            last_row = max(self.header.row_idx, 0)
+
+            def hashed() -> Iterator[list[Any]]:
+                nonlocal last_row
+                for n, row in self._numbered_data_rows():
+                    digest.update(n, row)
+                    last_row = n
+                    yield row
+
+            out_rows = self._project(compiled.iter(hashed()), col_indices, include_header)
+
+        with self.profiler.span("write", dest_path) as span:
+            n_rows, n_cells = self._write_cells(dws, out_rows, f"{get_column_letter(start_col)}{write_row}")
+            span.add(n_rows, n_cells)
+        write_row += n_rows
+        with self.profiler.span("save", dest_path):
+            dwb.save(dest_path)
+
+        store.put(key, Watermark(last_row=last_row, digest=digest.hexdigest(),
+                                 dest_next_row=write_row, params=params,
+                                 dest_row=start_row, dest_col=start_col, width=len(col_indices)))
         return dest_path
 
     def transfer_styles(
@@ -380,6 +1363,7 @@ class ExcelManager:
         rows: Optional[list[list[Any]]] = None,
         include_header: bool = True,
         start_cell: str = "A1",
+        dimensions: bool = True,
     ) -> Path:
         """Переносит только стили (шрифт, цвет, формат, границы) для выбранных колонок и строк.
         !!! Работает только если ExcelManager открыт с read_only=False. !!!
@@ -390,6 +1374,7 @@ class ExcelManager:
         :param rows: можно передать те же строки, что и при переносе данных (для согласованности)
         :param include_header: учитывать ли строку заголовка
         :param start_cell: ячейка старта вставки (по умолчанию A1)
+        :param dimensions: переносить ширину/стиль колонок и высоту/стиль строк
         """
         if self.wb.read_only:
             raise RuntimeError("transfer_styles требует read_only=False, иначе стили недоступны")
@@ -402,20 +1387,181 @@ class ExcelManager:
         if dest_sheet not in dwb.sheetnames:
             raise KeyError(f"В книге нет листа '{dest_sheet}' для переноса стилей")
 
-        dws = dwb[dest_sheet]
+        with self.profiler.span("styles", dest_path):
+            self._apply_styles(dwb[dest_sheet], columns, rows, include_header, start_cell, dimensions)
+
+        with self.profiler.span("save", dest_path):
+            dwb.save(dest_path)
+        return dest_path
+
+    def _apply_styles(
+        self,
+        dws: Worksheet,
+        columns: list[StrOrInt],
+        rows: Optional[list[list[Any]]],
+        include_header: bool,
+        start_cell: str,
+        dimensions: bool = True,
+    ) -> None:
+        """Копирование стилей ячеек источника в лист dws (без сохранения).
+        i-я строка вставки получает стиль строки Excel header.row_idx + i.
+        """
+        if self.wb.read_only:
+            raise RuntimeError("transfer_styles требует read_only=False, иначе стили недоступны")
+
         src_rows = rows if rows is not None else self.data_rows()
+        total_rows = len(src_rows) + (1 if include_header else 0)
+        source_rows = range(self.header.row_idx, self.header.row_idx + total_rows)
+        self._style_rows(dws, columns, source_rows, start_cell, dimensions)
 
-        col_indices = [self.col_to_idx(c) for c in columns]
+    def _style_rows(
+        self,
+        dws: Worksheet,
+        columns: list[StrOrInt],
+        source_rows: Iterable[int],
+        start_cell: str,
+        dimensions: bool = True,
+    ) -> None:
+        """Стили строк source_rows (номера Excel) -> строки dws подряд, начиная со start_cell."""
         start_row, start_col = coordinate_to_tuple(start_cell)
-        total_rows = len(src_rows) + (1 if include_header else 0)
+        col_pairs = [(self.col_to_idx(c) + 1, j) for j, c in enumerate(columns, start=start_col)]
+        row_pairs = [(n, i) for i, n in enumerate(source_rows, start=start_row)]
+        StyleTransfer(self.ws, dws).run(row_pairs, col_pairs, dimensions)
+
+    def _styled_out_rows(
+        self,
+        columns: list[StrOrInt],
+        rules: Optional[Union[dict[StrOrInt, dict[str, Any]], CompiledRules]],
+        rows: Optional[list[list[Any]]],
+        include_header: bool,
+    ) -> tuple[list[list[Any]], list[int]]:
+        """Строки для переноса вместе со стилями: выбранные колонки и номера строк Excel,
+        из которых они взяты (для строк data_rows — точные, для других rows — по порядку).
+        """
+        if self.wb.read_only:
+            raise RuntimeError("Перенос стилей требует read_only=False, иначе стили недоступны")
+        data = self.data_rows()
+        if rows is None or rows is data:
+            src, numbers = data, self._data_row_numbers()
+        else:
+            src = rows
+            numbers = range(self.header.row_idx + 1, self.header.row_idx + 1 + len(rows))
 
-        for i in range(total_rows):
-            for j, col_idx in enumerate(col_indices, start=start_col):
-                src_row_idx = self.header.row_idx + i  # абсолютный excel ряд
-                source_cell = self.ws.cell(row=src_row_idx, column=col_idx + 1)
-                target_cell = dws.cell(row=start_row + i, column=j)
-                if source_cell.has_style:
-                    target_cell._style = copy(source_cell._style)  # noqa
+        keep = self.compile_rules(rules) if rules else None
+        pairs = [(r, n) for r, n in zip(src, numbers) if not keep or keep(r)]
 
-        dwb.save(dest_path)
+        col_indices = [self.col_to_idx(c) for c in columns]
+        out_rows = list(self._project((r for r, _ in pairs), col_indices, include_header))
+        source_rows = ([self.header.row_idx] if include_header else []) + [n for _, n in pairs]
+        return out_rows, source_rows
+
+    def _transfer_styled(
+        self,
+        dest_path: Path,
+        dest_sheet: str,
+        columns: list[StrOrInt],
+        rules: Optional[Union[dict[StrOrInt, dict[str, Any]], CompiledRules]],
+        rows: Optional[list[list[Any]]],
+        include_header: bool,
+        start_cell: str,
+    ) -> Path:
+        """Перенос значений и стилей за одно открытие выходной книги."""
+        out_rows, source_rows = self._styled_out_rows(columns, rules, rows, include_header)
+        self._save_rows(
+            dest_path, dest_sheet, out_rows, start_cell,
+            on_sheet=lambda dws: self._style_rows(dws, columns, source_rows, start_cell),
+            profiler=self.profiler,
+        )
         return dest_path
+
+    @classmethod
+    def open_sheets(
+        cls,
+        path: Union[str, Path],
+        sheets: Optional[Iterable[str]] = None,
+        workers: Optional[int] = None,
+        **kwargs: Any,
+    ) -> dict[str, "ExcelManager"]:
+        """Несколько листов одной книги за одно открытие архива.
+        Общие строки читаются один раз, XML листов разбирается параллельно
+        (каждый лист — в своём процессе). Возвращает {имя листа: ExcelManager}
+        с движком "fast"; все менеджеры используют один XlsxReader.
+
+            ems = ExcelManager.open_sheets("книга.xlsx", ["Январь", "Февраль"], workers=4)
+            ems["Январь"].filter({...})
+
+        :param path: путь к XLSX
+        :param sheets: имена листов (без учёта регистра); None — все листы
+        :param workers: число процессов (None — по числу ядер, 1 — без пула)
+        :param kwargs: прочие параметры конструктора (header_row, columnar, ...)
+        """
+        reader = XlsxReader(path)
+        if sheets is None:
+            titles = reader.sheetnames
+        else:
+            titles = [get_sheet_name(reader, name).title for name in sheets]
+        reader.load_sheets(titles, workers)
+        kwargs.setdefault("engine", "fast")
+        return {t: cls(path, sheet=t, reader=reader, **kwargs) for t in titles}
+
+    @classmethod
+    def map_files(
+        cls,
+        paths: Iterable[Union[str, Path]],
+        sheet: Union[str, int, Iterable[str]] = 0,
+        rules: Optional[dict[StrOrInt, dict[str, Any]]] = None,
+        columns: Optional[list[StrOrInt]] = None,
+        workers: Optional[int] = None,
+        dest_path: Optional[Union[str, Path]] = None,
+        dest_sheet: str = "Sheet1",
+        include_header: bool = True,
+        source_column: Optional[str] = None,
+        start_cell: str = "A1",
+        stream: bool = False,
+        **manager_kwargs: Any,
+    ) -> BatchResult:
+        """Обработка множества однотипных книг в пуле процессов.
+        Для каждого файла: чтение, поиск заголовка, фильтр rules и выбор columns
+        (колонки и правила по имени ищутся в заголовке каждого файла отдельно).
+
+            res = ExcelManager.map_files(paths, sheet="Данные",
+                                         rules={"Статус": {"equals": ["Отменено"]}},
+                                         columns=["ФИО", "Сумма"], workers=8,
+                                         dest_path="итог.xlsx", source_column="Файл")
+            res.errors  # {путь: "ТипОшибки: сообщение"} для файлов, которые не прочитались
+
+        :param paths: пути к xlsx
+        :param sheet: лист (как в конструкторе)
+        :param rules: фильтр (как в методе filter)
+        :param columns: колонки результата (None — все колонки файла)
+        :param workers: число процессов (None — по числу ядер, 1 — без пула)
+        :param dest_path: если задан — строки всех файлов записываются в один лист
+                          в порядке paths, заголовок берётся из первого успешного файла
+        :param dest_sheet: имя листа в выходном файле
+        :param include_header: писать ли строку заголовка
+        :param source_column: если задано — добавить колонку с именем исходного файла
+        :param start_cell: ячейка старта вставки
+        :param stream: потоковая запись (write-only), см. _save_rows
+        :param manager_kwargs: прочие параметры конструктора (engine, header_row, cache...)
+        :return: BatchResult — результаты по файлам в порядке paths
+        """
+        return map_files(
+            cls, paths, sheet=sheet, rules=rules, columns=columns, workers=workers,
+            dest_path=dest_path, dest_sheet=dest_sheet, include_header=include_header,
+            source_column=source_column, start_cell=start_cell, stream=stream,
+            **manager_kwargs,
+        )
+
+    def output(self, dest_path: Optional[Union[str, Path]] = None) -> OutputSession:
+        """Сессия записи: несколько операций в одну книгу с одним сохранением.
+
+            with em.output("out.xlsx") as out:
+                out.copy_columns("Лист1", ["ФИО", "Сумма"])
+                out.filter_and_transfer("Лист2", ["ФИО"], rules={...})
+                out.transfer_styles("Лист1", ["ФИО", "Сумма"])
+
+        Книга открывается один раз при входе и сохраняется при выходе из блока;
+        при исключении внутри блока файл остаётся без изменений.
+        :param dest_path: путь к выходному xlsx (если None — берём self.path)
+        """
+        return OutputSession(self, Path(dest_path) if dest_path else self.path)
@@ -1,5 +1,6 @@
 from typing import Optional
 
+from core.column_profile import SheetProfile, profile_rows
 from core.excel_manager import ExcelManager, StrOrInt
 
 
@@ -32,3 +33,17 @@ class ExcelReview(ExcelManager):
         print('-' * len(title))
         for i, v in enumerate(vals, start=1):
             print(f'{i:>5}: {v!r}')
+
+    def profile(self, top_k: int = 5, sample_size: int = 5, seed: Optional[int] = 0) -> SheetProfile:
+        """Профиль всех колонок заголовка за один проход по строкам данных
+        (см. core.column_profile): доли пустых, тип, min/max, число уникальных,
+        частые значения и случайная выборка. Память не зависит от числа строк."""
+        with self.profiler.span("profile", self.path) as span:
+            result = profile_rows(self.iter_data_rows(), self.headers(), top_k, sample_size, seed)
+            span.add(rows=result.rows)
+        return result
+
+    def print_profile(self, top_k: int = 5, sample_size: int = 5, seed: Optional[int] = 0) -> SheetProfile:
+        result = self.profile(top_k, sample_size, seed)
+        print(result)
+        return result
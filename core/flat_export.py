@@ -0,0 +1,258 @@
+"""
+Выгрузка строк в плоские форматы без openpyxl: CSV, Parquet, Arrow IPC.
+
+- CSV пишется потоково через модуль csv (разделитель и кодировка настраиваются).
+- Parquet и Arrow IPC пишутся пачками по batch_rows строк через pyarrow;
+  типы колонок определяются по всем значениям (int, float, bool, дата, дата-время;
+  int и float вместе — float, иные смеси — строка). pyarrow необязателен и нужен
+  только для этих форматов.
+
+Файл пишется во временный и переименовывается в конце, так что прерванная
+выгрузка не оставляет полузаписанный результат.
+"""
+
+import csv
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import date, datetime, time
+from decimal import Decimal
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pyarrow не установлен
+    pa = None
+
+from core.spill import SpillWriter
+
+FORMATS = ("csv", "parquet", "arrow")
+_SUFFIXES = {".csv": "csv", ".txt": "csv", ".parquet": "parquet", ".pq": "parquet",
+             ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow"}
+DEFAULT_BATCH_ROWS = 65_536
+
+
+def detect_format(path: Path, fmt: Optional[str] = None) -> str:
+    """Формат выгрузки: явно заданный или по расширению файла."""
+    if fmt is None:
+        fmt = _SUFFIXES.get(path.suffix.lower())
+        if fmt is None:
+            raise ValueError(f"Не удалось определить формат по расширению '{path.suffix}'. "
+                             f"Укажите fmt: {', '.join(FORMATS)}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Неизвестный формат '{fmt}'. Доступны: {', '.join(FORMATS)}")
+    return fmt
+
+
+@contextmanager
+def _atomic(path: Path, mode: str = "wb", **kwargs: Any):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=path.suffix + ".tmp")
+    try:
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+# CSV
+
+def _csv_value(v: Any) -> Any:
+    if v is None:
+        return ""
+    if isinstance(v, datetime):
+        return v.isoformat(sep=" ")
+    if isinstance(v, (date, time)):
+        return v.isoformat()
+    return v
+
+
+def write_csv(
+    path: Path,
+    rows: Iterable[Sequence[Any]],
+    header: Optional[Sequence[Any]] = None,
+    delimiter: str = ",",
+    encoding: str = "utf-8",
+) -> int:
+    """Потоковая запись CSV; возвращает число строк данных.
+    Даты — в ISO-формате, пустые значения — пустые поля."""
+    n = 0
+    with _atomic(path, "w", encoding=encoding, newline="") as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        if header is not None:
+            writer.writerow([_csv_value(h) for h in header])
+        for row in rows:
+            writer.writerow([_csv_value(v) for v in row])
+            n += 1
+    return n
+
+
+# Parquet / Arrow IPC
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Для выгрузки в Parquet/Arrow нужен пакет pyarrow (pip install pyarrow)")
+
+
+def _column_names(header: Sequence[Any]) -> list[str]:
+    """Уникальные непустые имена колонок для схемы."""
+    names: list[str] = []
+    seen: set[str] = set()
+    for i, h in enumerate(header, start=1):
+        name = str(h).strip() if h is not None and str(h).strip() else f"column_{i}"
+        base, k = name, 2
+        while name in seen:
+            name = f"{base}_{k}"
+            k += 1
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def _value_kind(v: Any) -> str:
+    t = type(v)
+    if t is bool:
+        return "bool"
+    if t is int:
+        return "int"
+    if t is float or t is Decimal:
+        return "float"
+    if t is datetime:
+        return "datetime"
+    if t is date:
+        return "date"
+    return "string"
+
+
+def _merge_kinds(a: Optional[str], b: Optional[str]) -> Optional[str]:
+    """Общий тип двух типов колонки (None — значений ещё не было):
+    int + float -> float, date + datetime -> datetime, прочие расхождения -> string."""
+    if a is None or a == b:
+        return b
+    if b is None:
+        return a
+    pair = {a, b}
+    if pair == {"int", "float"}:
+        return "float"
+    if pair == {"date", "datetime"}:
+        return "datetime"
+    return "string"
+
+
+def _infer_kind(values: Iterable[Any], kind: Optional[str] = None) -> Optional[str]:
+    """Тип колонки по значениям (с учётом уже известного kind); None — все значения пустые."""
+    for v in values:
+        if v is None:
+            continue
+        kind = _merge_kinds(kind, _value_kind(v))
+        if kind == "string":
+            break
+    return kind
+
+
+def _arrow_type(kind: str):
+    return {
+        "bool": pa.bool_(),
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "datetime": pa.timestamp("us"),
+        "date": pa.date32(),
+        "string": pa.string(),
+    }[kind]
+
+
+def _converter(kind: str) -> Callable[[Any], Any]:
+    """Приведение значения к итоговому типу колонки (тип определён по всем значениям,
+    поэтому любое значение колонки к нему приводится)."""
+    if kind == "string":
+        return lambda v: None if v is None else (v if isinstance(v, str) else str(_csv_value(v)))
+    if kind == "float":
+        return lambda v: None if v is None else float(v)
+    if kind == "datetime":
+        return lambda v: v if v is None or type(v) is datetime else datetime(v.year, v.month, v.day)
+    return lambda v: v
+
+
+def write_arrow(
+    path: Path,
+    rows: Iterable[Sequence[Any]],
+    header: Sequence[Any],
+    fmt: str = "parquet",
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+) -> int:
+    """Запись Parquet / Arrow IPC пачками; возвращает число строк данных.
+
+    Схема файла задаётся до записи первой пачки, а тип колонки может выясниться
+    только в конце (целые в первых строках, дробное — в последней). Поэтому поток
+    проходится дважды: сначала пачки сбрасываются во временный файл (core.spill)
+    и попутно уточняются типы колонок, затем пишутся с итоговой схемой.
+    В памяти при этом держится не больше одной-двух пачек.
+    """
+    _require_pyarrow()
+    names = _column_names(header)
+    ncols = len(names)
+    kinds: list[Optional[str]] = [None] * ncols
+    it = iter(rows)
+    spilled = SpillWriter(batch_rows)
+    try:
+        while True:
+            chunk = [[r[i] if i < len(r) else None for i in range(ncols)]
+                     for r in islice(it, batch_rows)]
+            if not chunk:
+                break
+            for i in range(ncols):
+                if kinds[i] != "string":
+                    kinds[i] = _infer_kind((r[i] for r in chunk), kinds[i])
+            spilled.extend(chunk)
+    except BaseException:
+        spilled.finish().close()
+        raise
+    batches = spilled.finish()
+
+    final = [k or "string" for k in kinds]
+    schema = pa.schema([pa.field(n, _arrow_type(k)) for n, k in zip(names, final)])
+    converters = [_converter(k) for k in final]
+
+    def record_batch(chunk: list[list[Any]]):
+        arrays = [pa.array([conv(r[i]) for r in chunk], type=field.type)
+                  for i, (conv, field) in enumerate(zip(converters, schema))]
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    try:
+        with _atomic(path) as f:
+            if fmt == "parquet":
+                import pyarrow.parquet as pq
+                writer = pq.ParquetWriter(f, schema)
+            else:
+                writer = pa.ipc.new_file(f, schema)
+            try:
+                for chunk in batches.chunks():
+                    writer.write_batch(record_batch(chunk))
+            finally:
+                writer.close()
+    finally:
+        batches.close()
+    return len(batches)
+
+
+def export_rows(
+    path: Path,
+    rows: Iterable[Sequence[Any]],
+    header: Sequence[Any],
+    fmt: Optional[str] = None,
+    include_header: bool = True,
+    delimiter: str = ",",
+    encoding: str = "utf-8",
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+) -> int:
+    """Выгрузка потока строк в CSV / Parquet / Arrow IPC (формат — fmt или по расширению).
+    include_header влияет только на CSV: в Parquet/Arrow заголовок — это имена колонок схемы."""
+    fmt = detect_format(path, fmt)
+    if fmt == "csv":
+        return write_csv(path, rows, header if include_header else None, delimiter, encoding)
+    return write_arrow(path, rows, header, fmt, batch_rows)
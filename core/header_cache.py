@@ -0,0 +1,61 @@
+"""
+Отпечатки известных шаблонов заголовков.
+
+Для каждого листа (по имени) запоминается, в какой строке нашёлся заголовок
+и какой у этой строки отпечаток. При следующем открытии файла того же шаблона
+читаются только строки до заголовка, и если отпечаток совпал — полный поиск
+по первым N строкам не выполняется.
+"""
+
+from pathlib import Path
+from typing import Any, Optional, Sequence, Union
+
+from core.json_store import JsonStore
+from core.sheet_cache import DEFAULT_CACHE_DIR, _hash
+from core.utils import _norm_header
+
+DEFAULT_HEADERS_PATH = DEFAULT_CACHE_DIR / "headers.json"
+
+
+def header_fingerprint(row: Sequence[Any]) -> str:
+    """Отпечаток строки заголовка (без учёта регистра, пробелов по краям и пустых хвостов)."""
+    names = [_norm_header(c) for c in row]
+    while names and not names[-1]:
+        names.pop()
+    return _hash(*names)
+
+
+class HeaderCache(JsonStore):
+    """Файл с отпечатками заголовков: имя листа -> [(номер строки заголовка, отпечаток), ...].
+
+    path          : JSON-файл (по умолчанию — рядом с SheetCache во временном каталоге)
+    max_per_sheet : сколько разных шаблонов помнить для одного имени листа
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, max_per_sheet: int = 16):
+        super().__init__(Path(path) if path else DEFAULT_HEADERS_PATH)
+        self.max_per_sheet = max_per_sheet
+
+    def candidates(self, sheet_title: str) -> list[tuple[int, str]]:
+        """Известные шаблоны листа, последние использованные — первыми
+        (использованный шаблон поднимается вперёд через remember)."""
+        return [(int(r), fp) for r, fp in self._load().get(sheet_title.lower(), [])]
+
+    def remember(self, sheet_title: str, row_idx: int, row: Sequence[Any]) -> None:
+        """Запоминает найденный заголовок (файл перезаписывается, только если шаблон новый
+        или поменялся порядок)."""
+        data = self._load()
+        key = sheet_title.lower()
+        item = [row_idx, header_fingerprint(row)]
+        known = data.get(key, [])
+        if known and known[0] == item:
+            return
+        data[key] = ([item] + [k for k in known if k != item])[:self.max_per_sheet]
+        self._save()
+
+    def clear(self) -> None:
+        self._data = {}
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,42 @@
+"""
+Небольшой JSON-файл со словарём верхнего уровня (общая основа HeaderCache и WatermarkStore).
+
+Файл читается лениво при первом обращении; битый или отсутствующий файл — пустой
+словарь. Запись атомарная: во временный файл рядом и os.replace.
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+
+class JsonStore:
+    """Словарь, хранящийся в JSON-файле path."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._data: Optional[dict[str, Any]] = None
+
+    def _load(self) -> dict[str, Any]:
+        if self._data is None:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    data = json.load(f)
+                self._data = data if isinstance(data, dict) else {}
+            except (OSError, ValueError):
+                self._data = {}
+        return self._data
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
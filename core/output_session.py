@@ -0,0 +1,169 @@
+"""
+Сессия записи в одну выходную книгу.
+
+Книга-приёмник открывается один раз, все операции (перенос колонок, фильтрация,
+стили, произвольные строки) применяются к ней в памяти, а сохранение происходит
+один раз при выходе из блока `with`. Если внутри блока возникло исключение,
+файл не меняется.
+
+    with em.output(dest_path) as out:
+        out.copy_columns("Лист1", ["ФИО", "Сумма"])
+        out.filter_and_transfer("Лист2", ["ФИО"], rules={"Статус": {"equals": ["Отменено"]}})
+        out.transfer_styles("Лист1", ["ФИО", "Сумма"])
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Optional, Union
+
+from openpyxl import Workbook, load_workbook
+
+from core.utils import ensure_ws
+
+if TYPE_CHECKING:
+    from core.excel_manager import ExcelManager, StrOrInt
+
+
+class OutputSession:
+    """Отложенное сохранение выходной книги для серии операций ExcelManager.
+
+    manager   : источник данных по умолчанию; в каждой операции можно передать
+                другой ExcelManager через source=
+    dest_path : путь к выходному xlsx (если файла нет — будет создан)
+    """
+
+    def __init__(self, manager: "ExcelManager", dest_path: Union[str, Path]):
+        self.manager = manager
+        self.dest_path = Path(dest_path)
+        self.wb: Optional[Workbook] = None
+
+    def __enter__(self) -> "OutputSession":
+        if self.dest_path.exists():
+            self.wb = load_workbook(self.dest_path)
+        else:
+            self.wb = Workbook()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                self.save()
+        finally:
+            self.wb = None
+
+    # служебные
+
+    def _book(self) -> Workbook:
+        if self.wb is None:
+            raise RuntimeError("Сессия записи не открыта (используйте `with em.output(path) as out:`)")
+        return self.wb
+
+    def _source(self, source: Optional["ExcelManager"]) -> "ExcelManager":
+        return source if source is not None else self.manager
+
+    def save(self) -> Path:
+        """Сохраняет книгу через временный файл, чтобы не оставить полузаписанный результат."""
+        wb = self._book()
+        fd, tmp = tempfile.mkstemp(dir=self.dest_path.parent, suffix=".xlsx.tmp")
+        os.close(fd)
+        try:
+            with self.manager.profiler.span("save", self.dest_path):
+                wb.save(tmp)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        os.replace(tmp, self.dest_path)
+        return self.dest_path
+
+    # операции (аналоги одноимённых методов ExcelManager, но без загрузки/сохранения)
+
+    def write_rows(self, dest_sheet: str, rows: Iterable[list[Any]], start_cell: str = "A1") -> None:
+        """Запись произвольных rows в лист выходной книги."""
+        dws = ensure_ws(self._book(), dest_sheet)
+        with self.manager.profiler.span("write", self.dest_path) as span:
+            span.add(*self.manager._write_cells(dws, rows, start_cell))
+
+    def copy_columns(
+        self,
+        dest_sheet: str,
+        columns: list["StrOrInt"],
+        rows: Optional[list[list[Any]]] = None,
+        include_header: bool = True,
+        start_cell: str = "A1",
+        source: Optional["ExcelManager"] = None,
+        styles: bool = False,
+    ) -> None:
+        """Скопировать выбранные столбцы источника (см. ExcelManager.copy_columns)."""
+        src = self._source(source)
+        if styles:
+            self._write_styled(src, dest_sheet, columns, None, rows, include_header, start_cell)
+            return
+        self.write_rows(dest_sheet, src._copy_rows(columns, rows, include_header), start_cell)
+
+    def transfer_by_headers(
+        self,
+        dest_sheet: str,
+        headers: list[str],
+        rows: Optional[list[list[Any]]] = None,
+        include_header: bool = True,
+        start_cell: str = "A1",
+        source: Optional["ExcelManager"] = None,
+        styles: bool = False,
+    ) -> None:
+        """Перенос колонок по списку заголовков (см. ExcelManager.transfer_by_headers)."""
+        self.copy_columns(dest_sheet, headers, rows, include_header, start_cell, source, styles)
+
+    def filter_and_transfer(
+        self,
+        dest_sheet: str,
+        columns: list["StrOrInt"],
+        rules: dict["StrOrInt", dict[str, Any]],
+        rows: Optional[list[list[Any]]] = None,
+        include_header: bool = True,
+        start_cell: str = "A1",
+        source: Optional["ExcelManager"] = None,
+        styles: bool = False,
+    ) -> None:
+        """Фильтрация и перенос колонок (см. ExcelManager.filter_and_transfer)."""
+        src = self._source(source)
+        if styles:
+            self._write_styled(src, dest_sheet, columns, rules, rows, include_header, start_cell)
+            return
+        out_rows = src._filtered_out_rows(columns, rules, rows, include_header)
+        self.write_rows(dest_sheet, out_rows, start_cell)
+
+    def transfer_styles(
+        self,
+        dest_sheet: str,
+        columns: list["StrOrInt"],
+        rows: Optional[list[list[Any]]] = None,
+        include_header: bool = True,
+        start_cell: str = "A1",
+        source: Optional["ExcelManager"] = None,
+        dimensions: bool = True,
+    ) -> None:
+        """Перенос стилей в лист выходной книги (см. ExcelManager.transfer_styles).
+        Лист может быть создан раньше в этой же сессии.
+        """
+        src = self._source(source)
+        wb = self._book()
+        if dest_sheet not in wb.sheetnames:
+            raise KeyError(f"В книге нет листа '{dest_sheet}' для переноса стилей")
+        src._apply_styles(wb[dest_sheet], columns, rows, include_header, start_cell, dimensions)
+
+    def _write_styled(
+        self,
+        src: "ExcelManager",
+        dest_sheet: str,
+        columns: list["StrOrInt"],
+        rules: Optional[dict["StrOrInt", dict[str, Any]]],
+        rows: Optional[list[list[Any]]],
+        include_header: bool,
+        start_cell: str,
+    ) -> None:
+        """Значения и стили исходных строк за один проход по листу выходной книги."""
+        out_rows, source_rows = src._styled_out_rows(columns, rules, rows, include_header)
+        dws = ensure_ws(self._book(), dest_sheet)
+        src._write_cells(dws, out_rows, start_cell)
+        src._style_rows(dws, columns, source_rows, start_cell)
@@ -0,0 +1,254 @@
+"""
+Замеры фаз работы ExcelManager: загрузка книги, поиск заголовка, чтение строк,
+фильтр, запись ячеек, сохранение.
+
+Каждая фаза — Span: имя, длительность, строки, ячейки и (если включено)
+пик памяти по tracemalloc. Завершённые спаны копятся в Stats и передаются
+в callback (например, log_spans или PrometheusTextfile). Фазы могут быть вложены:
+книга открывается при первом чтении, поэтому "load" обычно входит в "header",
+а при потоковой записи "read" и "filter" входят в "write".
+
+Включается параметром profile=True / Profiler(...) у ExcelManager или переменной
+окружения EXCEL_MANAGER_PROFILE ("1" — время и счётчики, "memory" — ещё и память).
+Выключенный профайлер — NULL_PROFILER: span() возвращает один и тот же пустой
+контекст, поэтому затраты сводятся к вызову метода.
+"""
+
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+ENV_VAR = "EXCEL_MANAGER_PROFILE"
+
+SpanCallback = Callable[["Span"], None]
+
+
+@dataclass
+class Span:
+    name: str  # фаза: load, header, read, filter, write, save, ...
+    seconds: float = 0.0
+    rows: int = 0
+    cells: int = 0
+    peak_mb: Optional[float] = None  # пик памяти внутри фазы (только с memory=True)
+    path: Optional[str] = None  # файл, к которому относится фаза
+
+    def add(self, rows: int = 0, cells: int = 0) -> None:
+        self.rows += rows
+        self.cells += cells
+
+
+@dataclass
+class PhaseTotal:
+    calls: int = 0
+    seconds: float = 0.0
+    rows: int = 0
+    cells: int = 0
+    peak_mb: Optional[float] = None
+
+
+@dataclass
+class Stats:
+    spans: list[Span] = field(default_factory=list)
+
+    def by_phase(self) -> dict[str, PhaseTotal]:
+        """Сумма по фазам (пик памяти — максимальный)."""
+        totals: dict[str, PhaseTotal] = {}
+        for s in self.spans:
+            t = totals.setdefault(s.name, PhaseTotal())
+            t.calls += 1
+            t.seconds += s.seconds
+            t.rows += s.rows
+            t.cells += s.cells
+            if s.peak_mb is not None:
+                t.peak_mb = max(t.peak_mb or 0.0, s.peak_mb)
+        return totals
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(s.seconds for s in self.spans)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+    def __str__(self) -> str:
+        lines = []
+        for name, t in self.by_phase().items():
+            mem = "" if t.peak_mb is None else f"  peak {t.peak_mb:.1f} MB"
+            lines.append(f"{name:<8}{t.seconds:9.3f} s  x{t.calls:<4} rows {t.rows:<9} cells {t.cells}{mem}")
+        return "\n".join(lines)
+
+
+class _NullSpan:
+    """Пустой спан выключенного профайлера: add ничего не делает."""
+
+    __slots__ = ()
+
+    def add(self, rows: int = 0, cells: int = 0) -> None:
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _ActiveSpan:
+    __slots__ = ("profiler", "span", "_t0", "_traced")
+
+    def __init__(self, profiler: "Profiler", span: Span):
+        self.profiler = profiler
+        self.span = span
+        self._t0 = 0.0
+        self._traced = False
+
+    def add(self, rows: int = 0, cells: int = 0) -> None:
+        self.span.rows += rows
+        self.span.cells += cells
+
+    def __enter__(self) -> "_ActiveSpan":
+        if self.profiler.memory:
+            self._traced = not tracemalloc.is_tracing()
+            if self._traced:
+                tracemalloc.start()
+            else:
+                tracemalloc.reset_peak()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        span = self.span
+        span.seconds = time.perf_counter() - self._t0
+        if self.profiler.memory:
+            span.peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            if self._traced:
+                tracemalloc.stop()
+        self.profiler._finish(span)
+
+
+class Profiler:
+    """Сборщик спанов.
+
+    callback : вызывается с каждым завершённым Span
+    memory   : мерить пик памяти фаз через tracemalloc (заметно замедляет работу)
+    """
+
+    enabled = True
+
+    def __init__(self, callback: Optional[SpanCallback] = None, memory: bool = False):
+        self.callback = callback
+        self.memory = memory
+        self.stats = Stats()
+
+    def span(self, name: str, path: Any = None, rows: int = 0, cells: int = 0):
+        """Контекст замера фазы; у возвращаемого объекта есть add(rows=, cells=)."""
+        return _ActiveSpan(self, Span(name, rows=rows, cells=cells,
+                                      path=None if path is None else str(path)))
+
+    def record(self, name: str, seconds: float, path: Any = None, rows: int = 0, cells: int = 0) -> None:
+        """Записать фазу, время которой измерено снаружи (например, накоплено по кускам
+        в ленивом потоке строк, см. ExcelManager.iter_data_rows)."""
+        self._finish(Span(name, seconds=seconds, rows=rows, cells=cells,
+                          path=None if path is None else str(path)))
+
+    def _finish(self, span: Span) -> None:
+        self.stats.spans.append(span)
+        if self.callback is not None:
+            self.callback(span)
+
+
+class _NullProfiler(Profiler):
+    enabled = False
+
+    def __init__(self):
+        super().__init__()
+
+    def span(self, name: str, path: Any = None, rows: int = 0, cells: int = 0):
+        return _NULL_SPAN
+
+    def record(self, name: str, seconds: float, path: Any = None, rows: int = 0, cells: int = 0) -> None:
+        pass
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+def make_profiler(profile: Union[None, bool, Profiler]) -> Profiler:
+    """profile=None — по переменной окружения EXCEL_MANAGER_PROFILE; True/False — вкл/выкл;
+    готовый Profiler используется как есть (его можно разделить между менеджерами)."""
+    if isinstance(profile, Profiler):
+        return profile
+    if profile is None:
+        env = os.environ.get(ENV_VAR, "").strip().lower()
+        if env in ("", "0", "false", "no", "off"):
+            return NULL_PROFILER
+        return Profiler(callback=log_spans(), memory=env == "memory")
+    return Profiler() if profile else NULL_PROFILER
+
+
+def log_spans(logger: Optional[logging.Logger] = None, level: int = logging.INFO) -> SpanCallback:
+    """Callback: каждая фаза — строка в лог."""
+    logger = logger or logging.getLogger("excel_manager.profile")
+
+    def callback(span: Span) -> None:
+        mem = "" if span.peak_mb is None else f" peak={span.peak_mb:.1f}MB"
+        logger.log(level, "%s %.3fs rows=%d cells=%d%s %s",
+                   span.name, span.seconds, span.rows, span.cells, mem, span.path or "")
+
+    return callback
+
+
+class PrometheusTextfile:
+    """Callback: накопленные суммы по фазам в формате textfile collector (node_exporter).
+    Файл перезаписывается атомарно после каждой фазы.
+    """
+
+    def __init__(self, path: Union[str, Path], prefix: str = "excel_manager"):
+        self.path = Path(path)
+        self.prefix = prefix
+        self.stats = Stats()
+
+    def __call__(self, span: Span) -> None:
+        self.stats.spans.append(span)
+        self.write()
+
+    def render(self) -> str:
+        p = self.prefix
+        metrics = [
+            ("phase_seconds_total", "counter", "Суммарное время фазы, с", lambda t: t.seconds),
+            ("phase_calls_total", "counter", "Число выполнений фазы", lambda t: t.calls),
+            ("phase_rows_total", "counter", "Строк обработано в фазе", lambda t: t.rows),
+            ("phase_cells_total", "counter", "Ячеек записано в фазе", lambda t: t.cells),
+            ("phase_peak_bytes", "gauge", "Пик памяти фазы, байт",
+             lambda t: None if t.peak_mb is None else t.peak_mb * 2 ** 20),
+        ]
+        totals = self.stats.by_phase()
+        lines = []
+        for name, kind, help_text, value in metrics:
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+            for phase, t in totals.items():
+                v = value(t)
+                if v is not None:
+                    lines.append(f'{p}_{name}{{phase="{phase}"}} {v}')
+        return "\n".join(lines) + "\n"
+
+    def write(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.render())
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
@@ -0,0 +1,164 @@
+"""
+Сверка двух таблиц по ключу: добавленные, удалённые и изменённые строки.
+
+Каждая сторона проходится один раз. По старой таблице строится словарь
+ключ -> (кортеж сравниваемых значений, строка) (ключ нормализуется как в RowIndex:
+без пробелов по краям, без учёта регистра, 10.0 == 10); затем новая таблица
+проходится потоком, совпавшие строки вычёркиваются. Строки сравниваются по
+кортежам значений, изменившиеся колонки ищутся, только если кортежи разошлись.
+Значения сравниваемых колонок нормализуются так же (при normalize=True), поэтому
+"Москва " и "москва" не считаются изменением; при normalize=False учитывается и тип
+значения (1, 1.0 и True различаются).
+
+Одинаковые ключи на одной стороне: сначала ищется точно такая же строка среди
+дублей, иначе строки сопоставляются по порядку появления; лишние строки попадают
+в добавленные/удалённые.
+"""
+
+from collections import deque
+from itertools import islice
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Sequence
+
+from core.row_index import _norm_value, row_key
+
+_DUP_SCAN = 256  # сколько дублей ключа просматривать в поисках точного совпадения
+
+STATUS_ADDED = "добавлена"
+STATUS_REMOVED = "удалена"
+STATUS_CHANGED = "изменена"
+
+
+@dataclass
+class ChangedRow:
+    key: Any  # значения ключевых колонок (как в новой таблице)
+    old: list[Any]  # строка старой таблицы
+    new: list[Any]  # строка новой таблицы
+    changes: dict[Any, tuple[Any, Any]]  # колонка -> (было, стало), только изменившиеся
+
+    @property
+    def columns(self) -> list[Any]:
+        """Названия изменившихся колонок."""
+        return list(self.changes)
+
+
+@dataclass
+class RowDiff:
+    key_names: list[Any]
+    compare_names: list[Any]
+    new_key: tuple[int, ...]  # колонки ключа (0-based) в новой таблице
+    old_key: tuple[int, ...]  # и в старой
+    added: list[list[Any]] = field(default_factory=list)  # строки новой таблицы
+    removed: list[list[Any]] = field(default_factory=list)  # строки старой таблицы
+    changed: list[ChangedRow] = field(default_factory=list)
+    unchanged: int = 0
+    skipped: int = 0  # строки с пустым ключом (не сравнивались)
+
+    def __bool__(self) -> bool:
+        """True, если есть хоть одно отличие."""
+        return bool(self.added or self.removed or self.changed)
+
+    def summary(self) -> dict[str, int]:
+        return {
+            "added": len(self.added),
+            "removed": len(self.removed),
+            "changed": len(self.changed),
+            "unchanged": self.unchanged,
+            "skipped": self.skipped,
+        }
+
+    def report_rows(self, include_header: bool = True) -> list[list[Any]]:
+        """Отчёт построчно: статус, ключ, колонка, было, стало.
+        Изменённая строка даёт по строке отчёта на каждую изменившуюся колонку.
+        """
+        out = [["Статус", *self.key_names, "Колонка", "Было", "Стало"]] if include_header else []
+        for row in self.added:
+            out.append([STATUS_ADDED, *_cells(row, self.new_key), None, None, None])
+        for row in self.removed:
+            out.append([STATUS_REMOVED, *_cells(row, self.old_key), None, None, None])
+        for ch in self.changed:
+            for name, (old, new) in ch.changes.items():
+                out.append([STATUS_CHANGED, *ch.key, name, old, new])
+        return out
+
+
+def _cell(row: Sequence[Any], i: int) -> Any:
+    return row[i] if i < len(row) else None
+
+
+def _cells(row: Sequence[Any], idx: Sequence[int]) -> list[Any]:
+    return [row[i] if i < len(row) else None for i in idx]
+
+
+def _typed(v: Any) -> Any:
+    # без нормализации 1, 1.0 и True равны для ==, но это разные значения ячеек
+    return None if v is None else (type(v), v)
+
+
+def diff_rows(
+    new_rows: Iterable[list[Any]],
+    old_rows: Iterable[list[Any]],
+    new_key: Sequence[int],
+    old_key: Sequence[int],
+    new_cols: Sequence[int],
+    old_cols: Sequence[int],
+    key_names: list[Any],
+    compare_names: list[Any],
+    normalize: bool = True,
+) -> RowDiff:
+    """Сверка потоков строк. new_cols[i] в новой таблице соответствует old_cols[i] в старой."""
+    norm = _norm_value if normalize else _typed
+    result = RowDiff(key_names=key_names, compare_names=compare_names,
+                     new_key=tuple(new_key), old_key=tuple(old_key))
+
+    def values_of(row: Sequence[Any], cols: Sequence[int]) -> tuple:
+        return tuple(norm(_cell(row, i)) for i in cols)
+
+    old_by_key: dict[Any, deque] = {}
+    for row in old_rows:
+        key = row_key(row, old_key)
+        if key is None:
+            result.skipped += 1
+            continue
+        entry = (values_of(row, old_cols), row)
+        bucket = old_by_key.get(key)
+        if bucket is None:
+            old_by_key[key] = deque([entry])
+        else:
+            bucket.append(entry)
+
+    for row in new_rows:
+        key = row_key(row, new_key)
+        if key is None:
+            result.skipped += 1
+            continue
+        bucket = old_by_key.get(key)
+        if not bucket:
+            result.added.append(row)
+            continue
+        values = values_of(row, new_cols)
+        if len(bucket) > 1 and bucket[0][0] != values:
+            # повторяющийся ключ: сначала ищем среди дублей точно такую же строку
+            for pos, (candidate, _) in enumerate(islice(bucket, _DUP_SCAN)):
+                if candidate == values:
+                    del bucket[pos]
+                    break
+            else:
+                pos = None
+            if pos is not None:
+                result.unchanged += 1
+                continue
+        old_values, old_row = bucket.popleft()
+        if values == old_values:
+            result.unchanged += 1
+            continue
+        changes = {
+            name: (_cell(old_row, oi), _cell(row, ni))
+            for name, ni, oi, a, b in zip(compare_names, new_cols, old_cols, values, old_values)
+            if a != b
+        }
+        result.changed.append(ChangedRow(key=_cells(row, new_key), old=old_row, new=row, changes=changes))
+
+    for bucket in old_by_key.values():
+        result.removed.extend(row for _, row in bucket)
+    return result
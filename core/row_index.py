@@ -0,0 +1,127 @@
+"""
+Хеш-индекс строк по значению ключевых колонок.
+
+Ключ нормализуется так, как его обычно сравнивают в выгрузках:
+строки — без пробелов по краям и без учёта регистра, 10.0 == 10.
+Пустые ключи (None, "") в индекс не попадают.
+"""
+
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+Key = Any
+
+
+def _norm_value(v: Any) -> Any:
+    if v is None:
+        return None
+    if isinstance(v, str):
+        v = v.strip().lower()
+        return v or None
+    if isinstance(v, float) and v.is_integer():
+        return int(v)
+    return v
+
+
+def norm_key(values: Sequence[Any]) -> Optional[Key]:
+    """Нормализованный ключ из значений колонок; для составного ключа — кортеж.
+    None, если хотя бы одна часть ключа пустая.
+    """
+    if len(values) == 1:
+        return _norm_value(values[0])
+    key = tuple(_norm_value(v) for v in values)
+    if None in key:
+        return None
+    return key
+
+
+def row_key(row: Sequence[Any], col_indices: Sequence[int]) -> Optional[Key]:
+    """Ключ строки по 0-based индексам колонок."""
+    return norm_key([row[i] if i < len(row) else None for i in col_indices])
+
+
+class RowIndex:
+    """Индекс: нормализованный ключ -> позиции строк (0-based, в порядке строк).
+
+    rows        : строки, по которым построен индекс (позиции указывают в этот список)
+    col_indices : колонки ключа (0-based)
+    """
+
+    __slots__ = ("rows", "col_indices", "_positions")
+
+    def __init__(self, rows: Sequence[list[Any]], col_indices: Sequence[int]):
+        self.rows = rows
+        self.col_indices = tuple(col_indices)
+        positions: dict[Key, list[int]] = {}
+        for pos, row in enumerate(rows):
+            key = row_key(row, self.col_indices)
+            if key is None:
+                continue
+            bucket = positions.get(key)
+            if bucket is None:
+                positions[key] = [pos]
+            else:
+                bucket.append(pos)
+        self._positions = positions
+
+    def __len__(self) -> int:
+        """Количество различных ключей."""
+        return len(self._positions)
+
+    def __contains__(self, key: Any) -> bool:
+        return self._key(key) in self._positions
+
+    def _key(self, key: Any) -> Optional[Key]:
+        if isinstance(key, (list, tuple)):
+            return norm_key(key)
+        return norm_key((key,))
+
+    def keys(self) -> Iterable[Key]:
+        return self._positions.keys()
+
+    def positions(self, key: Any) -> list[int]:
+        """Позиции строк с этим ключом (для составного ключа — кортеж/список значений)."""
+        return self._positions.get(self._key(key), [])
+
+    def lookup(self, key: Any) -> list[list[Any]]:
+        """Все строки с этим ключом."""
+        return [self.rows[p] for p in self.positions(key)]
+
+    def first(self, key: Any) -> Optional[list[Any]]:
+        """Первая строка с этим ключом (как ВПР) или None."""
+        pos = self.positions(key)
+        return self.rows[pos[0]] if pos else None
+
+    def match(self, row: Sequence[Any], col_indices: Sequence[int]) -> list[int]:
+        """Позиции строк индекса, совпадающих по ключу со строкой другой таблицы."""
+        key = row_key(row, col_indices)
+        if key is None:
+            return []
+        return self._positions.get(key, [])
+
+
+def join_rows(
+    left: Iterable[list[Any]],
+    left_on: Sequence[int],
+    index: RowIndex,
+    right_cols: Sequence[int],
+    how: str = "left",
+) -> Iterator[list[Any]]:
+    """Соединение потока строк с проиндексированной таблицей за один проход.
+    К каждой строке left дописываются колонки right_cols совпавшей строки;
+    при нескольких совпадениях строка повторяется для каждого.
+    how="left"  — строки без совпадения остаются (правые колонки = None),
+    how="inner" — строки без совпадения отбрасываются.
+    """
+    if how not in ("left", "inner"):
+        raise ValueError(f"Неизвестный тип соединения '{how}'. Доступны: 'left', 'inner'")
+    right_rows = index.rows
+    empty = [None] * len(right_cols)
+    for row in left:
+        matches = index.match(row, left_on)
+        if not matches:
+            if how == "left":
+                yield list(row) + empty
+            continue
+        for pos in matches:
+            r = right_rows[pos]
+            yield list(row) + [r[i] if i < len(r) else None for i in right_cols]
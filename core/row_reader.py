@@ -1,12 +1,49 @@
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from core.xlsx_reader import FastSheet
+
+
+def _is_empty_row(row) -> bool:
+    return not any(cell is not None and str(cell).strip() != "" for cell in row)
+
+
+def stream_rows(
+    ws,
+    start_row: int = 1,
+    keep: Optional[Callable[[list[Any]], bool]] = None,
+    columns: Optional[Iterable[int]] = None,
+) -> Iterator[list[Any]]:
+    """Потоково отдаём строки листа начиная с start_row, пропуская полностью пустые.
+    Если передан keep — строки, для которых он вернул False, отбрасываются сразу
+    и нигде не накапливаются.
+    columns — 0-based индексы нужных колонок: быстрый движок (FastSheet)
+    конвертирует только их, остальные значения будут None. Для openpyxl игнорируется.
+    """
+    if columns is not None and isinstance(ws, FastSheet):
+        for row in ws.iter_rows(min_row=start_row, columns=columns, skip_empty=True):
+            row = list(row)
+            if keep is None or keep(row):
+                yield row
+        return
+
+    yield from iter_nonempty(ws.iter_rows(min_row=start_row, values_only=True), keep)
+
+
+def iter_nonempty(
+    rows: Iterable[Any],
+    keep: Optional[Callable[[list[Any]], bool]] = None,
+) -> Iterator[list[Any]]:
+    """Строки (кортежи/списки) -> списки, без полностью пустых и без отброшенных keep."""
+    for row in rows:
+        if _is_empty_row(row):
+            continue
+        row = list(row)
+        if keep is None or keep(row):
+            yield row
 
 
 def read_rows(ws, start_row: int = 1) -> list[list[Any]]:
     """Считываем строки листа начиная с start_row (по умолчанию 1),
     пропуская полностью пустые строки.
     """
-    rows: list[list[Any]] = []
-    for row in ws.iter_rows(min_row=start_row, values_only=True):
-        if any(cell is not None and str(cell).strip() != "" for cell in row):
-            rows.append(list(row))
-    return rows
+    return list(stream_rows(ws, start_row=start_row))
@@ -0,0 +1,397 @@
+"""
+Дисковый кэш разобранных листов.
+
+Заголовок и строки данных листа сохраняются в компактный колоночный
+бинарный файл: для каждой колонки — словарь уникальных значений и массив
+кодов (uint8/uint16/uint32). Повторное открытие того же файла отображает
+кэш в память (mmap) и не трогает openpyxl.
+
+Ключ записи: путь, размер, mtime файла, лист, строка заголовка
+(или описание того, как она ищется) и режим чтения (data_only и движок):
+формулы и вычисленные значения, как и результаты разных движков, не смешиваются.
+Размер каталога ограничен, старые записи вытесняются по LRU.
+"""
+
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+from array import array
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Iterator, Optional, Union
+
+_MAGIC = b"EMC1"
+_PREFIX = struct.Struct("<4sQ")  # magic, длина метаданных
+_ALIGN = 8
+_SUFFIX = ".emc"
+
+DEFAULT_CACHE_DIR = Path(tempfile.gettempdir()) / "excel_manager_cache"
+DEFAULT_MAX_BYTES = 1 << 30  # 1 ГБ
+
+
+def _hash(*parts: Any) -> str:
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def _sheet_key(sheet: Any) -> tuple:
+    """Нормализованное описание листа (как его передали в ExcelManager)."""
+    if isinstance(sheet, str):
+        return ("name", sheet.lower())
+    if isinstance(sheet, int):
+        return ("index", sheet)
+    if isinstance(sheet, (list, tuple)):
+        return ("names", tuple(str(s).lower() for s in sheet if s is not None))
+    return ("index", 0)
+
+
+def _code_type(n_values: int) -> str:
+    if n_values <= 1 << 8:
+        return "B"
+    if n_values <= 1 << 16:
+        return "H"
+    return "I"
+
+
+class CachedRows(Sequence):
+    """Строки данных поверх отображённого в память файла кэша.
+    Ведёт себя как список строк: len, индексы, срезы, итерация.
+    Каждая строка собирается из колонок при обращении (новый list).
+    """
+
+    def __init__(self, codes: list[memoryview], dicts: list[list[Any]],
+                 lengths: Optional[memoryview], nrows: int):
+        self._codes = codes
+        self._dicts = dicts
+        self._lengths = lengths
+        self._nrows = nrows
+
+    def __len__(self) -> int:
+        return self._nrows
+
+    def _row(self, i: int) -> list[Any]:
+        row = [d[c[i]] for d, c in zip(self._dicts, self._codes)]
+        if self._lengths is not None:
+            del row[self._lengths[i]:]
+        return row
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._row(j) for j in range(*i.indices(self._nrows))]
+        if i < 0:
+            i += self._nrows
+        if not 0 <= i < self._nrows:
+            raise IndexError("индекс строки вне диапазона")
+        return self._row(i)
+
+    def __iter__(self) -> Iterator[list[Any]]:
+        dicts = self._dicts
+        if not self._codes:
+            for _ in range(self._nrows):
+                yield []
+            return
+        lengths = self._lengths
+        for i, codes in enumerate(zip(*self._codes)):
+            row = [d[c] for d, c in zip(dicts, codes)]
+            if lengths is not None:
+                del row[lengths[i]:]
+            yield row
+
+    def column(self, idx: int) -> list[Any]:
+        """Значения одной колонки без сборки строк."""
+        if idx >= len(self._codes):
+            return [None] * self._nrows
+        d = self._dicts[idx]
+        values = [d[c] for c in self._codes[idx]]
+        if self._lengths is not None:
+            for i, n in enumerate(self._lengths):
+                if n <= idx:
+                    values[i] = None
+        return values
+
+
+class CacheEntry:
+    """Открытая запись кэша: метаданные листа и строки (mmap).
+    Держит открытыми файл и mmap до close() (или выхода из with); после закрытия
+    rows и row_numbers недоступны."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # пустой файл
+            self._file.close()
+            raise
+        self._views: list[memoryview] = []
+        try:
+            self._load()
+        except BaseException:
+            self.close()
+            raise
+
+    def _load(self) -> None:
+        magic, meta_len = _PREFIX.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"Файл {self.path} не является записью кэша")
+        meta = pickle.loads(self._mm[_PREFIX.size:_PREFIX.size + meta_len])
+
+        self.title: str = meta["title"]
+        self.sheetnames: list[str] = meta["sheetnames"]
+        self.header_row_idx: int = meta["row_idx"]
+        self.header_names: list[Any] = meta["names"]
+
+        with memoryview(self._mm) as view:
+            nrows = meta["nrows"]
+            codes, dicts = [], []
+            for col in meta["columns"]:
+                off, typecode = col["offset"], col["typecode"]
+                size = array(typecode).itemsize
+                codes.append(view[off:off + nrows * size].cast(typecode))
+                dicts.append(pickle.loads(view[col["dict_offset"]:col["dict_offset"] + col["dict_len"]]))
+            lengths = None
+            if meta["lengths"] is not None:
+                off, typecode = meta["lengths"]
+                size = array(typecode).itemsize
+                lengths = view[off:off + nrows * size].cast(typecode)
+            self.rows = CachedRows(codes, dicts, lengths, nrows)
+            # номера строк Excel для строк rows и «пустые» строки с пробелами (для get_value absolute)
+            self.row_numbers: Optional[memoryview] = None
+            if meta.get("numbers") is not None:
+                off = meta["numbers"]
+                self.row_numbers = view[off:off + nrows * array("I").itemsize].cast("I")
+            self.blank_rows: Optional[dict[int, list[Any]]] = meta.get("blanks")
+            self._views = codes + [v for v in (lengths, self.row_numbers) if v is not None]
+
+    def close(self) -> None:
+        # mmap закрывается, только когда на него не осталось memoryview
+        for v in self._views:
+            v.release()
+        try:
+            self._mm.close()
+        except BufferError:  # срез строк ещё где-то используется; файл закроет сборщик
+            pass
+        self._file.close()
+
+    def __enter__(self) -> "CacheEntry":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _write_entry(dest: Path, meta: dict[str, Any], rows: list[list[Any]],
+                 row_numbers: Optional[Sequence[int]] = None) -> None:
+    """Записывает строки в колоночном виде во временный файл и атомарно переименовывает.
+    row_numbers — номера строк Excel для каждой строки rows (если известны).
+    """
+    nrows = len(rows)
+    ncols = max((len(r) for r in rows), default=0)
+    uniform = all(len(r) == ncols for r in rows)
+
+    blocks: list[tuple[str, bytes]] = []
+    columns_meta = []
+    for idx in range(ncols):
+        mapping: dict[tuple, int] = {}
+        values: list[Any] = []
+        codes = []
+        for r in rows:
+            v = r[idx] if idx < len(r) else None
+            key = (v.__class__, v)
+            code = mapping.get(key)
+            if code is None:
+                code = mapping[key] = len(values)
+                values.append(v)
+            codes.append(code)
+        typecode = _code_type(len(values))
+        blocks.append(("codes", array(typecode, codes).tobytes()))
+        blocks.append(("dict", pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL)))
+        columns_meta.append({"typecode": typecode})
+
+    if not uniform:
+        typecode = _code_type(ncols + 1)
+        blocks.append(("lengths", array(typecode, [len(r) for r in rows]).tobytes()))
+    if row_numbers is not None:
+        blocks.append(("numbers", array("I", row_numbers).tobytes()))
+
+    # раскладка: префикс, метаданные, блоки с выравниванием
+    def layout(meta_len: int) -> list[int]:
+        offsets, pos = [], _PREFIX.size + meta_len
+        for _, data in blocks:
+            pos += -pos % _ALIGN
+            offsets.append(pos)
+            pos += len(data)
+        return offsets
+
+    meta = dict(meta, nrows=nrows, columns=columns_meta, lengths=None, numbers=None)
+    # длина метаданных зависит от смещений блоков и наоборот; смещения только растут,
+    # поэтому цикл сходится за 1-2 шага
+    meta_len = 0
+    while True:
+        offsets = layout(meta_len)
+        for i, col in enumerate(columns_meta):
+            col["offset"] = offsets[2 * i]
+            col["dict_offset"] = offsets[2 * i + 1]
+            col["dict_len"] = len(blocks[2 * i + 1][1])
+        if not uniform:
+            meta["lengths"] = (offsets[2 * ncols], _code_type(ncols + 1))
+        if row_numbers is not None:
+            meta["numbers"] = offsets[-1]
+        meta_bytes = pickle.dumps(meta, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(meta_bytes) == meta_len:
+            break
+        meta_len = len(meta_bytes)
+
+    fd, tmp = tempfile.mkstemp(dir=dest.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_PREFIX.pack(_MAGIC, len(meta_bytes)))
+            f.write(meta_bytes)
+            for (_, data), off in zip(blocks, offsets):
+                f.write(b"\0" * (off - f.tell()))
+                f.write(data)
+        os.replace(tmp, dest)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+class SheetCache:
+    """Каталог с кэшем разобранных листов.
+
+    cache_dir : где хранить записи (по умолчанию — во временном каталоге системы)
+    max_bytes : предельный суммарный размер; при превышении удаляются
+                давно не использованные записи
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    # служебные
+
+    @staticmethod
+    def _source_id(path: Path) -> str:
+        return _hash(str(Path(path).resolve()))
+
+    def _entry_path(self, path: Path, sheet: Any, header_row: Any,
+                    data_only: bool = True, engine: str = "openpyxl") -> Path:
+        """<источник>-<лист/заголовок/режим чтения>-<отпечаток файла>.emc"""
+        path = Path(path).resolve()
+        st = path.stat()
+        spec = _hash(_sheet_key(sheet), header_row, bool(data_only), engine)
+        fingerprint = _hash(st.st_size, st.st_mtime_ns)
+        return self.cache_dir / f"{self._source_id(path)}-{spec}-{fingerprint}{_SUFFIX}"
+
+    def _entries(self) -> list[Path]:
+        return list(self.cache_dir.glob(f"*{_SUFFIX}"))
+
+    # публичные
+
+    def get(self, path: Union[str, Path], sheet: Any = 0, header_row: Any = None,
+            data_only: bool = True, engine: str = "openpyxl") -> Optional[CacheEntry]:
+        """Запись для файла в его текущем состоянии (и том же режиме чтения) или None."""
+        try:
+            entry_path = self._entry_path(Path(path), sheet, header_row, data_only, engine)
+        except OSError:
+            return None
+        if not entry_path.exists():
+            return None
+        try:
+            entry = CacheEntry(entry_path)
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError, struct.error):
+            self._unlink(entry_path)
+            return None
+        try:
+            os.utime(entry_path)  # отметка «недавно использован» для LRU
+        except OSError:
+            pass
+        return entry
+
+    def put(
+        self,
+        path: Union[str, Path],
+        sheet: Any,
+        header_row: Any,
+        *,
+        title: str,
+        sheetnames: list[str],
+        header_row_idx: int,
+        header_names: list[Any],
+        rows: list[list[Any]],
+        row_numbers: Optional[Sequence[int]] = None,
+        blank_rows: Optional[dict[int, list[Any]]] = None,
+        data_only: bool = True,
+        engine: str = "openpyxl",
+    ) -> Path:
+        """Сохраняет разобранный лист. Устаревшие версии этого же листа удаляются.
+        row_numbers / blank_rows — номера строк Excel для rows и пропущенные строки
+        из одних пробелов (см. ExcelManager.get_value с absolute=True).
+        data_only / engine — режим чтения, в котором получены строки (часть ключа).
+        """
+        path = Path(path)
+        entry_path = self._entry_path(path, sheet, header_row, data_only, engine)
+        meta = {
+            "source": str(path.resolve()),
+            "title": title,
+            "sheetnames": list(sheetnames),
+            "row_idx": header_row_idx,
+            "names": list(header_names),
+            "blanks": blank_rows if row_numbers is not None else None,
+        }
+        _write_entry(entry_path, meta, rows, row_numbers)
+
+        stem_prefix = entry_path.name.rsplit("-", 1)[0] + "-"
+        for other in self.cache_dir.glob(f"{stem_prefix}*{_SUFFIX}"):
+            if other != entry_path:
+                self._unlink(other)
+        self.evict()
+        return entry_path
+
+    def invalidate(self, path: Optional[Union[str, Path]] = None) -> int:
+        """Удаляет записи файла `path` (все листы) или весь кэш, если path=None.
+        Возвращает количество удалённых записей.
+        """
+        if path is None:
+            targets = self._entries()
+        else:
+            targets = list(self.cache_dir.glob(f"{self._source_id(Path(path))}-*{_SUFFIX}"))
+        return sum(self._unlink(p) for p in targets)
+
+    def evict(self) -> int:
+        """Удаляет давно не использованные записи, пока кэш не уложится в max_bytes."""
+        stats = []
+        for p in self._entries():
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            stats.append((st.st_mtime_ns, st.st_size, p))
+        total = sum(size for _, size, _ in stats)
+        removed = 0
+        for _, size, p in sorted(stats):
+            if total <= self.max_bytes:
+                break
+            removed += self._unlink(p)
+            total -= size
+        return removed
+
+    def size(self) -> int:
+        """Текущий суммарный размер записей, байт."""
+        return sum(p.stat().st_size for p in self._entries() if p.exists())
+
+    @staticmethod
+    def _unlink(p: Path) -> int:
+        try:
+            p.unlink()
+            return 1
+        except FileNotFoundError:
+            return 0
@@ -0,0 +1,163 @@
+"""
+Строки листа во временном файле на диске, порциями (chunk) по N строк.
+
+SpillWriter принимает строки по одной и сбрасывает каждую заполненную порцию
+в файл (pickle), в памяти держится только текущая порция. Результат — SpilledRows:
+ведёт себя как список строк (len, индексы, срезы, итерация), при обращении
+порции читаются с диска, последние прочитанные держатся в небольшом LRU.
+
+Файл удаляется при close() или когда SpilledRows собран сборщиком мусора.
+"""
+
+import os
+import pickle
+import tempfile
+import weakref
+from collections import OrderedDict
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Iterator, Optional, Union
+
+from core.compact_rows import memory_usage
+
+DEFAULT_CHUNK_ROWS = 50_000
+_SAMPLE_ROWS = 1_000
+_CACHED_CHUNKS = 2
+
+
+def chunk_rows_for(max_memory: int, sample: Sequence[Sequence[Any]]) -> int:
+    """Размер порции, при котором в памяти (порция записи + кэш чтения) остаётся
+    не больше max_memory байт; размер строки оценивается по выборке."""
+    sample = list(sample[:_SAMPLE_ROWS])
+    if not sample:
+        return DEFAULT_CHUNK_ROWS
+    usage = memory_usage(sample)
+    per_row = max(usage["total"] // len(sample), 1)
+    return max(max_memory // (per_row * (_CACHED_CHUNKS + 1)), 100)
+
+
+def _remove(path: str, file: BinaryIO) -> None:
+    try:
+        file.close()
+    finally:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+class SpilledRows(Sequence):
+    """Строки во временном файле; снаружи — список строк (list)."""
+
+    def __init__(self, path: str, file: BinaryIO, offsets: list[int], sizes: list[int], chunk_rows: int):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self._file = file
+        self._offsets = offsets
+        self._sizes = sizes
+        self._nrows = sum(sizes)
+        self._cache: OrderedDict[int, list[list[Any]]] = OrderedDict()
+        self._finalizer = weakref.finalize(self, _remove, path, file)
+
+    def __len__(self) -> int:
+        return self._nrows
+
+    @property
+    def nchunks(self) -> int:
+        return len(self._offsets)
+
+    def chunk(self, k: int) -> list[list[Any]]:
+        """Порция k (строки [k*chunk_rows, (k+1)*chunk_rows))."""
+        cached = self._cache.get(k)
+        if cached is not None:
+            self._cache.move_to_end(k)
+            return cached
+        self._file.seek(self._offsets[k])
+        rows = pickle.load(self._file)
+        self._cache[k] = rows
+        if len(self._cache) > _CACHED_CHUNKS:
+            self._cache.popitem(last=False)
+        return rows
+
+    def chunks(self) -> Iterator[list[list[Any]]]:
+        """Порции по порядку (без засорения LRU: порция читается и отдаётся)."""
+        for k in range(self.nchunks):
+            cached = self._cache.get(k)
+            if cached is not None:
+                yield cached
+                continue
+            self._file.seek(self._offsets[k])
+            yield pickle.load(self._file)
+
+    def __iter__(self) -> Iterator[list[Any]]:
+        for rows in self.chunks():
+            for row in rows:
+                yield list(row)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self._nrows)
+            return [self[j] for j in range(start, stop, step)]
+        if i < 0:
+            i += self._nrows
+        if not 0 <= i < self._nrows:
+            raise IndexError("индекс строки вне диапазона")
+        k, pos = divmod(i, self.chunk_rows)
+        return list(self.chunk(k)[pos])
+
+    def close(self) -> None:
+        self._cache.clear()
+        self._finalizer()
+
+
+class SpillWriter:
+    """Запись строк порциями во временный файл.
+
+    chunk_rows : строк в порции
+    directory  : каталог для временного файла (по умолчанию — системный)
+    """
+
+    def __init__(self, chunk_rows: int = DEFAULT_CHUNK_ROWS, directory: Optional[Union[str, Path]] = None):
+        if chunk_rows < 1:
+            raise ValueError("chunk_rows должен быть положительным")
+        self.chunk_rows = chunk_rows
+        fd, self.path = tempfile.mkstemp(prefix="excel_spill_", suffix=".bin", dir=directory)
+        self._file = os.fdopen(fd, "w+b")
+        self._offsets: list[int] = []
+        self._sizes: list[int] = []
+        self._buf: list[Any] = []
+
+    @property
+    def pending(self) -> int:
+        """Строк в текущей (ещё не сброшенной) порции."""
+        return len(self._buf)
+
+    def append(self, row: Any) -> None:
+        self._buf.append(row)
+        if len(self._buf) >= self.chunk_rows:
+            self._flush()
+
+    def extend(self, rows: Iterable[Any]) -> None:
+        for row in rows:
+            self.append(row)
+
+    def _flush(self) -> None:
+        if not self._buf:
+            return
+        self._offsets.append(self._file.tell())
+        self._sizes.append(len(self._buf))
+        pickle.dump(self._buf, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._buf = []
+
+    def finish(self) -> SpilledRows:
+        self._flush()
+        self._file.flush()
+        return SpilledRows(self.path, self._file, self._offsets, self._sizes, self.chunk_rows)
+
+
+def spill(rows: Iterable[Any], chunk_rows: int = DEFAULT_CHUNK_ROWS,
+          directory: Optional[Union[str, Path]] = None) -> SpilledRows:
+    """Поток строк -> SpilledRows."""
+    writer = SpillWriter(chunk_rows, directory)
+    writer.extend(rows)
+    return writer.finish()
@@ -0,0 +1,254 @@
+"""
+Перенос стилей ячеек между листами (в том числе разных книг).
+
+- исходный лист читается построчно один раз, без создания недостающих ячеек;
+- одинаковые StyleArray источника переводятся в стили книги-приёмника один раз
+  (шрифты, заливки, границы, форматы чисел добавляются в таблицы приёмника);
+- ширины/стили колонок и высоты/стили строк переносятся на уровне измерений;
+- серии ячеек с общим стилем (большая часть колонки, целая строка диапазона)
+  получают стиль колонки или строки приёмника один раз;
+- пустые ячейки, стиль которых совпадает со стилем колонки или строки,
+  не создаются вовсе.
+"""
+
+from copy import copy
+from typing import Iterable, Optional, Sequence
+
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.styles.numbers import BUILTIN_FORMATS_MAX_SIZE
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.dimensions import ColumnDimension
+from openpyxl.worksheet.worksheet import Worksheet
+
+Pairs = Sequence[tuple[int, int]]  # (исходный номер, целевой номер), 1-based
+
+
+def _is_default(style: Optional[StyleArray]) -> bool:
+    return style is None or not any(style)
+
+
+class StyleMapper:
+    """StyleArray книги-источника -> StyleArray книги-приёмника (с интернированием)."""
+
+    def __init__(self, src_wb, dst_wb):
+        self.src = src_wb
+        self.dst = dst_wb
+        self._cache: dict[tuple, StyleArray] = {}
+
+    def map(self, style: StyleArray) -> StyleArray:
+        key = tuple(style)
+        mapped = self._cache.get(key)
+        if mapped is None:
+            mapped = self._cache[key] = self._translate(style)
+        return mapped
+
+    def _translate(self, style: StyleArray) -> StyleArray:
+        src, dst = self.src, self.dst
+        if src is dst:
+            return StyleArray(style)
+        res = StyleArray()
+        res.fontId = dst._fonts.add(src._fonts[style.fontId])
+        res.fillId = dst._fills.add(src._fills[style.fillId])
+        res.borderId = dst._borders.add(src._borders[style.borderId])
+        res.alignmentId = dst._alignments.add(src._alignments[style.alignmentId])
+        res.protectionId = dst._protections.add(src._protections[style.protectionId])
+        fmt_id = style.numFmtId
+        if fmt_id >= BUILTIN_FORMATS_MAX_SIZE:
+            fmt = src._number_formats[fmt_id - BUILTIN_FORMATS_MAX_SIZE]
+            fmt_id = dst._number_formats.add(fmt) + BUILTIN_FORMATS_MAX_SIZE
+        res.numFmtId = fmt_id
+        res.xfId = self._named_style_id(style.xfId)
+        res.pivotButton = style.pivotButton
+        res.quotePrefix = style.quotePrefix
+        return res
+
+    def _named_style_id(self, xf_id: int) -> int:
+        """Именованный стиль ищется в приёмнике по имени; если его там нет — «Обычный»."""
+        try:
+            name = self.src._named_styles[xf_id].name
+        except IndexError:
+            return 0
+        names = self.dst._named_styles.names
+        return names.index(name) if name in names else 0
+
+
+class StyleTransfer:
+    """Перенос стилей из src_ws в dst_ws по соответствию строк и колонок."""
+
+    def __init__(self, src_ws: Worksheet, dst_ws: Worksheet):
+        self.src_ws = src_ws
+        self.dst_ws = dst_ws
+        self.mapper = StyleMapper(src_ws.parent, dst_ws.parent)
+        self._src_cols = self._column_dims(src_ws)
+
+    @staticmethod
+    def _column_dims(ws: Worksheet) -> dict[int, ColumnDimension]:
+        """Номер колонки -> её измерение (с учётом сгруппированных диапазонов min:max)."""
+        dims: dict[int, ColumnDimension] = {}
+        for dim in ws.column_dimensions.values():
+            dim.reindex()
+            for idx in range(dim.min, dim.max + 1):
+                dims[idx] = dim
+        return dims
+
+    def _src_inherited(self, row: int, col: int) -> Optional[StyleArray]:
+        """Стиль, который Excel покажет у отсутствующей ячейки источника: строки или колонки."""
+        row_dim = self.src_ws.row_dimensions.get(row)
+        if row_dim is not None and row_dim.has_style:
+            return row_dim._style
+        col_dim = self._src_cols.get(col)
+        if col_dim is not None and col_dim.has_style:
+            return col_dim._style
+        return None
+
+    def copy_dimensions(self, rows: Pairs, cols: Pairs) -> None:
+        """Ширина, скрытие и стиль колонок; высота, скрытие и стиль строк."""
+        dst_ws, mapper = self.dst_ws, self.mapper
+        for src_col, dst_col in cols:
+            dim = self._src_cols.get(src_col)
+            if dim is None:
+                continue
+            target = dst_ws.column_dimensions[get_column_letter(dst_col)]
+            if dim.customWidth:
+                target.width = dim.width
+            target.hidden = dim.hidden
+            target.bestFit = dim.bestFit
+            if dim.has_style:
+                target._style = copy(mapper.map(dim._style))
+
+        src_rows = self.src_ws.row_dimensions
+        for src_row, dst_row in rows:
+            dim = src_rows.get(src_row)
+            if dim is None:
+                continue
+            if dim.ht is None and not dim.hidden and not dim.has_style:
+                continue
+            target = dst_ws.row_dimensions[dst_row]
+            target.ht = dim.ht
+            target.hidden = dim.hidden
+            if dim.has_style:
+                target._style = copy(mapper.map(dim._style))
+
+    def _dst_inherited(self, row: int, col: int, dst_cols: dict[int, ColumnDimension]) -> Optional[StyleArray]:
+        row_dim = self.dst_ws.row_dimensions.get(row)
+        if row_dim is not None and row_dim.has_style:
+            return row_dim._style
+        col_dim = dst_cols.get(col)
+        if col_dim is not None and col_dim.has_style:
+            return col_dim._style
+        return None
+
+    def _mapped(self, src_cells, row: int, col: int) -> Optional[StyleArray]:
+        """Стиль ячейки источника в терминах приёмника; None — стиль по умолчанию."""
+        cell = src_cells.get((row, col))
+        style = cell._style if cell is not None else self._src_inherited(row, col)
+        return None if _is_default(style) else self.mapper.map(style)
+
+    def _column_run(
+        self, j: int, dst_col: int, rows: Pairs, grid: list[list[Optional[StyleArray]]]
+    ) -> Optional[StyleArray]:
+        """Стиль, общий для большей части колонки j, или None."""
+        dst_cells = self.dst_ws._cells  # noqa
+        counts: dict[int, int] = {}
+        styles: dict[int, StyleArray] = {}
+        for (_, dst_row), line in zip(rows, grid):
+            style = line[j]
+            if style is None:
+                target = dst_cells.get((dst_row, dst_col))
+                if target is None or target.value is None:
+                    return None  # пустая ячейка без стиля унаследовала бы стиль колонки
+                continue
+            counts[id(style)] = counts.get(id(style), 0) + 1
+            styles[id(style)] = style
+        if not counts:
+            return None
+        top = max(counts, key=counts.get)
+        return styles[top] if counts[top] * 2 > len(rows) else None
+
+    def _coalesce(
+        self,
+        rows: Pairs,
+        cols: Pairs,
+        grid: list[list[Optional[StyleArray]]],
+        dst_cols: dict[int, ColumnDimension],
+    ) -> int:
+        """Серии ячеек с общим стилем -> стили колонок и строк приёмника.
+
+        Колонка получает стиль, которым оформлено больше половины переносимых строк
+        (заголовок и редкие исключения получат свои ячейки); пустые ячейки без стиля
+        в колонке не допускаются — openpyxl их не сохраняет, и они унаследовали бы
+        стиль колонки. Строка — стиль, общий для всех её переносимых колонок, если он
+        не перекроет стиль других колонок приёмника. Как и при форматировании целой
+        колонки/строки в Excel, этот стиль видят и пустые ячейки за пределами
+        переносимого диапазона. Возвращает число записанных стилей колонок и строк.
+        """
+        dst_ws = self.dst_ws
+        new_cols: set[int] = set()
+        new_rows: set[int] = set()
+        if len(rows) > 1:
+            for j, (_, dst_col) in enumerate(cols):
+                style = self._column_run(j, dst_col, rows, grid)
+                if style is None:
+                    continue
+                dim = dst_cols.get(dst_col)
+                if dim is not None and (dim.has_style or dim.min != dim.max):
+                    continue  # свой стиль колонки или сгруппированный диапазон — не трогаем
+                dim = dst_ws.column_dimensions[get_column_letter(dst_col)]
+                dim._style = copy(style)
+                dst_cols[dst_col] = dim
+                new_cols.add(dst_col)
+
+        if len(cols) > 1:
+            copied = {c for _, c in cols}
+            foreign = {tuple(d._style) for c, d in dst_cols.items() if c not in copied and d.has_style}
+            dst_rows = dst_ws.row_dimensions
+            for (_, dst_row), line in zip(rows, grid):
+                style = line[0]
+                if style is None or any(s is not style for s in line[1:]):
+                    continue
+                if foreign - {tuple(style)}:
+                    continue
+                if all(c in new_cols and dst_cols[c]._style == style for _, c in cols):
+                    continue  # строку и так закрывают стили колонок
+                dim = dst_rows.get(dst_row)
+                if dim is not None and dim.has_style:
+                    continue
+                dst_rows[dst_row]._style = copy(style)
+                new_rows.add(dst_row)
+        return len(new_cols) + len(new_rows)
+
+    def copy_cells(self, rows: Iterable[tuple[int, int]], cols: Pairs, coalesce: bool = True) -> int:
+        """Стили ячеек: один проход по строкам источника. Возвращает число записанных стилей
+        (ячеек и, при coalesce, колонок/строк).
+
+        Как и прежде, ячейки без стиля в источнике стиль приёмника не сбрасывают.
+        При coalesce общие стили серий ячеек сначала выносятся в стили колонок и строк
+        приёмника (см. _coalesce). Отсутствующая ячейка приёмника создаётся, только если
+        унаследованный ею стиль (строки/колонки приёмника) отличается от нужного.
+        """
+        rows = list(rows)
+        src_cells = self.src_ws._cells  # noqa — прямой доступ, чтобы не создавать пустые ячейки
+        grid = [[self._mapped(src_cells, src_row, src_col) for src_col, _ in cols] for src_row, _ in rows]
+
+        dst_ws = self.dst_ws
+        dst_cells = dst_ws._cells  # noqa
+        dst_cols = self._column_dims(dst_ws)
+        written = self._coalesce(rows, cols, grid, dst_cols) if coalesce else 0
+        for (_, dst_row), line in zip(rows, grid):
+            for (_, dst_col), mapped in zip(cols, line):
+                target = dst_cells.get((dst_row, dst_col))
+                if mapped is None:
+                    continue
+                if target is None:
+                    if self._dst_inherited(dst_row, dst_col, dst_cols) == mapped:
+                        continue
+                    target = dst_ws.cell(row=dst_row, column=dst_col)
+                target._style = copy(mapped)
+                written += 1
+        return written
+
+    def run(self, rows: Sequence[tuple[int, int]], cols: Pairs, dimensions: bool = True) -> int:
+        """Полный перенос: сначала измерения (колонки/строки), затем ячейки."""
+        if dimensions:
+            self.copy_dimensions(rows, cols)
+        return self.copy_cells(rows, cols)
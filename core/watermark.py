@@ -0,0 +1,85 @@
+"""
+Водяные знаки для инкрементального переноса (filter_and_transfer(..., incremental=True)).
+
+Для каждой тройки (исходный файл, лист, целевой лист) рядом с целевой книгой
+хранится запись: последняя обработанная строка Excel, хеш уже перенесённого
+префикса источника, строка приёмника, с которой дописывать, и отпечаток
+параметров переноса (колонки, правила, заголовок, стартовая ячейка).
+
+Если префикс источника изменился (строки переписаны, удалены или вставлены
+выше водяного знака) или поменялись параметры — делается полная перестройка.
+"""
+
+import hashlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional, Sequence, Union
+
+from core.json_store import JsonStore
+
+WATERMARK_SUFFIX = ".watermarks.json"
+
+
+def sidecar_path(dest_path: Path) -> Path:
+    """Файл водяных знаков рядом с целевой книгой: '<имя>.xlsx.watermarks.json'."""
+    return dest_path.with_name(dest_path.name + WATERMARK_SUFFIX)
+
+
+class PrefixHash:
+    """Накопительный хеш строк источника (номер строки Excel + значения)."""
+
+    __slots__ = ("_h",)
+
+    def __init__(self):
+        self._h = hashlib.blake2b(digest_size=16)
+
+    def update(self, row_number: int, row: Sequence[Any]) -> None:
+        self._h.update(repr((row_number, tuple(row))).encode("utf-8"))
+        self._h.update(b"\n")
+
+    def hexdigest(self) -> str:
+        return self._h.hexdigest()
+
+
+@dataclass
+class Watermark:
+    last_row: int  # последняя обработанная строка источника (номер строки Excel)
+    digest: str  # PrefixHash всех строк данных до last_row включительно
+    dest_next_row: int  # строка приёмника, с которой дописываются новые строки
+    params: str  # отпечаток параметров переноса
+    # блок, занятый переносом на листе приёмника (0 — записи старого формата без блока)
+    dest_row: int = 0
+    dest_col: int = 0
+    width: int = 0
+
+
+class WatermarkStore(JsonStore):
+    """JSON-файл с водяными знаками: ключ (источник, лист, целевой лист) -> Watermark."""
+
+    def __init__(self, path: Union[str, Path]):
+        super().__init__(Path(path))
+
+    @staticmethod
+    def key(source: Path, sheet_title: str, dest_sheet: str) -> str:
+        try:
+            source = source.resolve()
+        except OSError:
+            pass
+        return f"{source}::{sheet_title}::{dest_sheet.lower()}"
+
+    def get(self, key: str) -> Optional[Watermark]:
+        item = self._load().get(key)
+        if not isinstance(item, dict):
+            return None
+        try:
+            return Watermark(**item)
+        except TypeError:
+            return None
+
+    def put(self, key: str, mark: Watermark) -> None:
+        self._load()[key] = asdict(mark)
+        self._save()
+
+    def drop(self, key: str) -> None:
+        if self._load().pop(key, None) is not None:
+            self._save()
@@ -0,0 +1,513 @@
+"""
+Быстрое чтение значений XLSX без объектов ячеек openpyxl.
+
+XML листа разбирается потоково (expat, кусками), общие строки (sharedStrings)
+читаются один раз в список и берутся по индексу, а значения конвертируются
+только для запрошенных колонок. Результат совпадает с
+openpyxl `iter_rows(values_only=True)` в режиме read_only/data_only
+для строк, чисел, булевых значений и дат.
+"""
+
+import os
+import posixpath
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Union
+from warnings import warn
+from xml.etree.ElementTree import iterparse
+from xml.parsers.expat import ParserCreate
+
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils.cell import column_index_from_string, range_boundaries
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, WINDOWS_EPOCH, from_excel, from_ISO8601
+
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+REL_OFFICE_DOCUMENT = NS_REL + "/officeDocument"
+REL_WORKSHEET = NS_REL + "/worksheet"
+REL_SHARED_STRINGS = NS_REL + "/sharedStrings"
+REL_STYLES = NS_REL + "/styles"
+
+_ROW = f"{{{NS_MAIN}}}row"
+_CELL = f"{{{NS_MAIN}}}c"
+_VALUE = f"{{{NS_MAIN}}}v"
+_INLINE = f"{{{NS_MAIN}}}is"
+_TEXT = f"{{{NS_MAIN}}}t"
+_RUN = f"{{{NS_MAIN}}}r"
+_SI = f"{{{NS_MAIN}}}si"
+_SHEET_DATA = f"{{{NS_MAIN}}}sheetData"
+_DIMENSION = f"{{{NS_MAIN}}}dimension"
+
+# имена элементов в том виде, как их отдаёт expat с namespace_separator=" "
+_X_ROW = f"{NS_MAIN} row"
+_X_CELL = f"{NS_MAIN} c"
+_X_VALUE = f"{NS_MAIN} v"
+_X_INLINE = f"{NS_MAIN} is"
+_X_TEXT = f"{NS_MAIN} t"
+_X_PHONETIC = f"{NS_MAIN} rPh"
+
+_DIGITS = "0123456789"
+_CHUNK_SIZE = 1 << 16
+
+
+class _RowState:
+    """Текущее состояние разбора листа (строка/ячейка) для обработчиков expat."""
+
+    __slots__ = (
+        "row", "col", "ref", "data_type", "style", "value", "inline", "text",
+        "in_phonetic", "values", "other_non_empty",
+    )
+
+    def __init__(self):
+        self.row = 0
+        self.col = 0
+        self.ref = None
+        self.data_type = "n"
+        self.style = None
+        self.value = None
+        self.inline = None
+        self.text = None
+        self.in_phonetic = False
+        self.values: dict[int, Any] = {}
+        self.other_non_empty = False
+
+
+def _cast_number(value: str) -> Union[int, float]:
+    """Как в openpyxl: int, если нет точки/экспоненты, иначе float."""
+    if "." in value or "E" in value or "e" in value:
+        return float(value)
+    return int(value)
+
+
+def _text_content(node) -> str:
+    """Текст <si>/<is>: прямой <t> и <t> внутри <r> (фонетика <rPh> не учитывается)."""
+    snippets = []
+    for child in node:
+        if child.tag == _TEXT:
+            if child.text is not None:
+                snippets.append(child.text)
+        elif child.tag == _RUN:
+            t = child.find(_TEXT)
+            if t is not None and t.text is not None:
+                snippets.append(t.text)
+    return "".join(snippets)
+
+
+def _rels(archive: zipfile.ZipFile, part: str) -> dict[str, tuple[str, str]]:
+    """Связи части пакета: Id -> (Type, путь в архиве)."""
+    folder, name = posixpath.split(part)
+    rels_path = posixpath.join(folder, "_rels", name + ".rels")
+    try:
+        src = archive.open(rels_path)
+    except KeyError:
+        return {}
+    result = {}
+    with src:
+        for _, el in iterparse(src):
+            if el.tag == f"{{{NS_PKG_REL}}}Relationship":
+                target = el.get("Target", "")
+                if target.startswith("/"):
+                    path = target.lstrip("/")
+                else:
+                    path = posixpath.normpath(posixpath.join(folder, target))
+                result[el.get("Id")] = (el.get("Type"), path)
+    return result
+
+
+class XlsxReader:
+    """Открытая XLSX-книга для быстрого чтения значений.
+
+    Архив открывается один раз; sharedStrings и стили читаются один раз
+    и переиспользуются всеми листами.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._archive = zipfile.ZipFile(self.path)
+        self._shared_strings: Optional[list[str]] = None
+        self._loaded: dict[str, "FastSheet"] = {}
+
+        root_rels = _rels(self._archive, "")
+        wb_part = next(
+            (p for t, p in root_rels.values() if t == REL_OFFICE_DOCUMENT), "xl/workbook.xml"
+        )
+        wb_rels = _rels(self._archive, wb_part)
+
+        self.epoch = WINDOWS_EPOCH
+        self._sheet_paths: dict[str, str] = {}
+        with self._archive.open(wb_part) as src:
+            for _, el in iterparse(src):
+                if el.tag == f"{{{NS_MAIN}}}workbookPr":
+                    if el.get("date1904", "").lower() in ("1", "true"):
+                        self.epoch = CALENDAR_MAC_1904
+                elif el.tag == f"{{{NS_MAIN}}}sheet":
+                    rel = wb_rels.get(el.get(f"{{{NS_REL}}}id"))
+                    if rel is not None and rel[0] == REL_WORKSHEET:
+                        self._sheet_paths[el.get("name")] = rel[1]
+
+        self._sst_path = next((p for t, p in wb_rels.values() if t == REL_SHARED_STRINGS), None)
+        styles_path = next((p for t, p in wb_rels.values() if t == REL_STYLES), None)
+        self.date_styles, self.timedelta_styles = self._read_date_styles(styles_path)
+
+    # служебные
+
+    def _read_date_styles(self, styles_path: Optional[str]) -> tuple[frozenset, frozenset]:
+        """Индексы cellXfs, у которых числовой формат — дата/время (как в openpyxl)."""
+        if styles_path is None or styles_path not in self._archive.namelist():
+            return frozenset(), frozenset()
+        custom: dict[int, str] = {}
+        xf_formats: list[int] = []
+        in_cell_xfs = False
+        with self._archive.open(styles_path) as src:
+            for event, el in iterparse(src, events=("start", "end")):
+                if el.tag == f"{{{NS_MAIN}}}cellXfs":
+                    in_cell_xfs = event == "start"
+                elif event == "end" and el.tag == f"{{{NS_MAIN}}}numFmt":
+                    custom[int(el.get("numFmtId"))] = el.get("formatCode")
+                elif event == "end" and in_cell_xfs and el.tag == f"{{{NS_MAIN}}}xf":
+                    xf_formats.append(int(el.get("numFmtId", 0)))
+        dates, deltas = set(), set()
+        for idx, fmt_id in enumerate(xf_formats):
+            fmt = custom[fmt_id] if fmt_id in custom else BUILTIN_FORMATS.get(fmt_id)
+            if is_date_format(fmt):
+                dates.add(idx)
+            if is_timedelta_format(fmt):
+                deltas.add(idx)
+        return frozenset(dates), frozenset(deltas)
+
+    # публичные
+
+    @property
+    def sheetnames(self) -> list[str]:
+        return list(self._sheet_paths)
+
+    @property
+    def shared_strings(self) -> list[str]:
+        """Таблица общих строк (читается при первом обращении)."""
+        if self._shared_strings is None:
+            strings: list[str] = []
+            if self._sst_path is not None and self._sst_path in self._archive.namelist():
+                with self._archive.open(self._sst_path) as src:
+                    for _, el in iterparse(src):
+                        if el.tag == _SI:
+                            strings.append(_text_content(el).replace("x005F_", ""))
+                            el.clear()
+            self._shared_strings = strings
+        return self._shared_strings
+
+    def sheet(self, title: str) -> "FastSheet":
+        if title not in self._sheet_paths:
+            raise KeyError(f"В книге нет листа '{title}'. Есть: {self.sheetnames}")
+        loaded = self._loaded.get(title)
+        if loaded is not None:
+            return loaded
+        return FastSheet(self, title, self._sheet_paths[title])
+
+    def __getitem__(self, title: str) -> "FastSheet":
+        return self.sheet(title)
+
+    def load_sheets(self, titles: Iterable[str], workers: Optional[int] = None) -> dict[str, "FastSheet"]:
+        """Разбирает несколько листов сразу, каждый — в своём процессе.
+        Таблица общих строк читается один раз здесь и передаётся процессам
+        при их запуске. Разобранные листы запоминаются: sheet(title) вернёт их же.
+
+        workers : число процессов (None — по числу ядер, 1 — без пула)
+        """
+        titles = [t for t in titles if t not in self._loaded]
+        for t in titles:
+            if t not in self._sheet_paths:
+                raise KeyError(f"В книге нет листа '{t}'. Есть: {self.sheetnames}")
+        workers = workers if workers is not None else (os.cpu_count() or 1)
+        workers = min(workers, len(titles))
+
+        if workers <= 1:
+            parsed = [_parse_sheet(self, t) for t in titles]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(self.path, self.shared_strings),
+            ) as pool:
+                parsed = list(pool.map(_parse_sheet_in_worker, titles))
+
+        for title, (bounds, rows) in zip(titles, parsed):
+            self._loaded[title] = ParsedSheet(self, title, self._sheet_paths[title], bounds, rows)
+        return dict(self._loaded)
+
+    def open_part(self, part: str):
+        return self._archive.open(part)
+
+    def close(self) -> None:
+        self._archive.close()
+
+    def __enter__(self) -> "XlsxReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class FastSheet:
+    """Лист XLSX с интерфейсом iter_rows(values_only=True), как у openpyxl.
+
+    Форма строк повторяет read-only лист openpyxl: ширина берётся из <dimension>,
+    пропущенные в XML строки отдаются пустыми.
+    """
+
+    def __init__(self, reader: XlsxReader, title: str, part: str):
+        self.reader = reader
+        self.title = title
+        self._part = part
+        self.min_column = self.min_row = 1
+        self.max_column = self.max_row = None
+        self._read_dimension()
+
+    def _read_dimension(self) -> None:
+        with self.reader.open_part(self._part) as src:
+            for _, el in iterparse(src):
+                if el.tag == _DIMENSION:
+                    ref = el.get("ref")
+                    if ref:
+                        try:
+                            bounds = range_boundaries(ref)
+                        except ValueError:
+                            bounds = None
+                        if bounds:
+                            self.min_column, self.min_row, self.max_column, self.max_row = bounds
+                    return
+                if el.tag == _SHEET_DATA:
+                    return
+                el.clear()
+
+    def _parse(self, columns: Optional[frozenset]) -> Iterator[tuple[int, dict[int, Any], int, bool]]:
+        """(номер строки, {1-based колонка: значение}, колонка последней ячейки,
+        есть ли непустые значения вне columns).
+
+        XML подаётся в expat кусками, готовые строки отдаются после каждого куска,
+        поэтому в памяти держится не больше одного куска листа.
+        """
+        sst = self.reader.shared_strings
+        date_styles = self.reader.date_styles
+        timedelta_styles = self.reader.timedelta_styles
+        epoch = self.reader.epoch
+        col_cache: dict[str, int] = {}
+
+        ready: list[tuple[int, dict[int, Any], int, bool]] = []
+        state = _RowState()
+
+        def start(name, attrs):
+            if name == _X_CELL:
+                ref = attrs.get("r")
+                if ref:
+                    key = ref.rstrip(_DIGITS)
+                    col = col_cache.get(key)
+                    if col is None:
+                        col = col_cache[key] = column_index_from_string(key)
+                    state.col = col
+                else:
+                    state.col += 1
+                state.ref = ref
+                state.data_type = attrs.get("t", "n")
+                state.style = attrs.get("s")
+                state.value = None
+                state.inline = None
+            elif name == _X_VALUE:
+                state.text = []
+            elif name == _X_TEXT:
+                if state.inline is not None and not state.in_phonetic:
+                    state.text = []
+            elif name == _X_INLINE:
+                state.inline = []
+            elif name == _X_PHONETIC:
+                state.in_phonetic = True
+            elif name == _X_ROW:
+                r = attrs.get("r")
+                if r is not None:
+                    try:
+                        state.row = int(r)
+                    except ValueError:
+                        state.row = int(float(r))
+                else:
+                    state.row += 1
+                state.col = 0
+                state.values = {}
+                state.other_non_empty = False
+
+        def end(name):
+            if name == _X_CELL:
+                store_cell()
+            elif name == _X_VALUE:
+                if state.text is not None:
+                    state.value = "".join(state.text) or None
+                    state.text = None
+            elif name == _X_TEXT:
+                if state.text is not None:
+                    state.inline.append("".join(state.text))
+                    state.text = None
+            elif name == _X_PHONETIC:
+                state.in_phonetic = False
+            elif name == _X_ROW:
+                ready.append((state.row, state.values, state.col, state.other_non_empty))
+
+        def text(data):
+            if state.text is not None:
+                state.text.append(data)
+
+        def store_cell():
+            col = state.col
+            data_type = state.data_type
+            if data_type == "inlineStr":
+                value = "".join(state.inline) if state.inline is not None else None
+                if columns is not None and col - 1 not in columns:
+                    if value is not None and value.strip() != "":
+                        state.other_non_empty = True
+                    return
+                state.values[col] = value
+                return
+
+            value = state.value
+            if value is None:
+                return
+
+            if columns is not None and col - 1 not in columns:
+                if not state.other_non_empty:
+                    if data_type == "s":
+                        state.other_non_empty = sst[int(value)].strip() != ""
+                    elif data_type in ("str", "e"):
+                        state.other_non_empty = value.strip() != ""
+                    else:
+                        state.other_non_empty = True
+                return
+
+            if data_type == "n":
+                value = _cast_number(value)
+                style_id = state.style
+                if style_id and int(style_id) in date_styles:
+                    style_id = int(style_id)
+                    try:
+                        value = from_excel(value, epoch, timedelta=style_id in timedelta_styles)
+                    except (OverflowError, ValueError):
+                        warn(
+                            f"Ячейка {state.ref} помечена как дата, но значение {value} "
+                            f"вне допустимого диапазона. Будет считаться ошибкой."
+                        )
+                        value = "#VALUE!"
+            elif data_type == "s":
+                value = sst[int(value)]
+            elif data_type == "b":
+                value = bool(int(value))
+            elif data_type == "d":
+                value = from_ISO8601(value)
+            state.values[col] = value
+
+        parser = ParserCreate(namespace_separator=" ")
+        parser.buffer_text = True
+        parser.StartElementHandler = start
+        parser.EndElementHandler = end
+        parser.CharacterDataHandler = text
+
+        with self.reader.open_part(self._part) as src:
+            while True:
+                chunk = src.read(_CHUNK_SIZE)
+                parser.Parse(chunk, not chunk)
+                if ready:
+                    yield from ready
+                    ready.clear()
+                if not chunk:
+                    break
+
+    def iter_rows(
+        self,
+        min_row: Optional[int] = None,
+        max_row: Optional[int] = None,
+        values_only: bool = True,
+        columns: Optional[Iterable[int]] = None,
+        skip_empty: bool = False,
+    ) -> Iterator[tuple]:
+        """Строки значений листа (аналог ReadOnlyWorksheet.iter_rows(values_only=True)).
+
+        columns    : 0-based индексы колонок, которые нужно конвертировать;
+                     остальные ячейки отдаются как None
+        skip_empty : не отдавать полностью пустые строки (с учётом и тех колонок,
+                     которые не конвертировались)
+        """
+        if not values_only:
+            raise ValueError("FastSheet отдаёт только значения (values_only=True)")
+        cols = frozenset(columns) if columns is not None else None
+
+        min_row = min_row or 1
+        max_row = max_row or self.max_row
+        max_col = self.max_column
+        empty_row = (None,) * max_col if max_col is not None else []  # как в openpyxl
+
+        counter = min_row
+        idx = 1
+        for idx, values, last_col, other_non_empty in self._parse(cols):
+            if max_row is not None and idx > max_row:
+                break
+
+            for _ in range(counter, idx):
+                counter += 1
+                if not skip_empty:
+                    yield empty_row
+
+            if counter <= idx:
+                counter += 1
+                if skip_empty and not other_non_empty and not any(
+                    v is not None and str(v).strip() != "" for v in values.values()
+                ):
+                    continue
+                yield self._make_row(values, max_col or last_col)
+
+        if max_row is not None and max_row < idx and not skip_empty:
+            for _ in range(counter, max_row + 1):
+                yield empty_row
+
+    @staticmethod
+    def _make_row(values: dict[int, Any], width: int) -> tuple:
+        if not width:
+            return ()
+        row = [None] * width
+        for col, value in values.items():
+            if col <= width:
+                row[col - 1] = value
+        return tuple(row)
+
+
+class ParsedSheet(FastSheet):
+    """Лист, уже разобранный целиком (см. XlsxReader.load_sheets): строки отдаются из памяти."""
+
+    def __init__(self, reader: XlsxReader, title: str, part: str,
+                 bounds: tuple, rows: list[tuple[int, dict[int, Any], int, bool]]):
+        self.reader = reader
+        self.title = title
+        self._part = part
+        self.min_column, self.min_row, self.max_column, self.max_row = bounds
+        self._rows = rows
+
+    def _parse(self, columns: Optional[frozenset]) -> Iterator[tuple[int, dict[int, Any], int, bool]]:
+        # значения уже сконвертированы для всех колонок, подсказка columns не нужна
+        return iter(self._rows)
+
+
+def _parse_sheet(reader: XlsxReader, title: str) -> tuple[tuple, list]:
+    sheet = FastSheet(reader, title, reader._sheet_paths[title])
+    bounds = (sheet.min_column, sheet.min_row, sheet.max_column, sheet.max_row)
+    return bounds, list(sheet._parse(None))
+
+
+_worker_reader: Optional[XlsxReader] = None
+
+
+def _init_worker(path: Path, shared_strings: list[str]) -> None:
+    """Инициализация процесса пула: свой дескриптор архива, общие строки — от родителя."""
+    global _worker_reader
+    _worker_reader = XlsxReader(path)
+    _worker_reader._shared_strings = shared_strings
+
+
+def _parse_sheet_in_worker(title: str) -> tuple[tuple, list]:
+    return _parse_sheet(_worker_reader, title)
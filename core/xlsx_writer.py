@@ -0,0 +1,374 @@
+"""
+Потоковая запись листа в XLSX.
+
+- Новый файл пишется через write-only книгу openpyxl (строки добавляются по мере появления).
+- Новый лист в существующем файле дописывается на уровне архива: XML листа
+  формируется потоково, остальные части книги копируются как есть, без загрузки
+  в объектную модель openpyxl. Правятся только workbook.xml, его связи,
+  [Content_Types].xml и (если в данных есть даты) styles.xml.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Iterable, Optional
+from xml.etree.ElementTree import fromstring
+from xml.sax.saxutils import escape, quoteattr, unescape
+
+from openpyxl import Workbook
+from openpyxl.cell.cell import ERROR_CODES, ILLEGAL_CHARACTERS_RE
+from openpyxl.styles.numbers import (
+    BUILTIN_FORMATS_REVERSE, FORMAT_DATE_DATETIME, FORMAT_DATE_TIME6, FORMAT_DATE_TIMEDELTA, FORMAT_DATE_YYYYMMDD2,
+)
+from openpyxl.utils import coordinate_to_tuple, get_column_letter
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, WINDOWS_EPOCH, to_excel
+from openpyxl.utils.exceptions import IllegalCharacterError
+from openpyxl.workbook.child import INVALID_TITLE_REGEX
+
+from core.xlsx_reader import NS_MAIN, NS_REL, REL_OFFICE_DOCUMENT, REL_WORKSHEET, _rels
+
+CT_WORKSHEET = "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+
+# форматы дат — те же, что ставит openpyxl при записи ячейки
+_TEMPORAL_FORMATS = (
+    (datetime, FORMAT_DATE_DATETIME),
+    (date, FORMAT_DATE_YYYYMMDD2),
+    (time, FORMAT_DATE_TIME6),
+    (timedelta, FORMAT_DATE_TIMEDELTA),
+)
+
+_SHEET_HEAD = (
+    f'<worksheet xmlns="{NS_MAIN}"><sheetPr><outlinePr summaryBelow="1" summaryRight="1"/>'
+    '<pageSetUpPr/></sheetPr><sheetViews><sheetView workbookViewId="0">'
+    '<selection activeCell="A1" sqref="A1"/></sheetView></sheetViews>'
+    '<sheetFormatPr baseColWidth="8" defaultRowHeight="15"/><sheetData>'
+)
+_SHEET_TAIL = (
+    '</sheetData><pageMargins left="0.75" right="0.75" top="1" bottom="1" '
+    'header="0.5" footer="0.5"/></worksheet>'
+)
+
+
+def _offset_rows(rows: Iterable[list[Any]], start_cell: str) -> Iterable[tuple[int, int, list[Any]]]:
+    start_row, start_col = coordinate_to_tuple(start_cell)
+    for i, row in enumerate(rows, start=start_row):
+        yield i, start_col, row
+
+
+class _CellWriter:
+    """Сериализация значений в XML ячеек так же, как это делает openpyxl."""
+
+    def __init__(self, epoch: datetime, temporal_styles: list[int]):
+        self.epoch = epoch
+        # индекс xf для каждого типа дат (в порядке _TEMPORAL_FORMATS)
+        self.temporal_styles = temporal_styles
+        self.used_temporal = False
+        self._letters: dict[int, str] = {}
+
+    def letter(self, col: int) -> str:
+        letter = self._letters.get(col)
+        if letter is None:
+            letter = self._letters[col] = get_column_letter(col)
+        return letter
+
+    def cell(self, ref: str, value: Any) -> str:
+        if isinstance(value, bool):
+            return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+        if isinstance(value, (int, float, Decimal)):
+            if value != value or value in (float("inf"), float("-inf")):
+                return f'<c r="{ref}" t="n"><v></v></c>'
+            return f'<c r="{ref}" t="n"><v>{"%.16g" % value}</v></c>'
+        if isinstance(value, str):
+            value = value[:32767]
+            if ILLEGAL_CHARACTERS_RE.search(value):
+                raise IllegalCharacterError(f"{value} cannot be used in worksheets.")
+            if value == "":
+                return f'<c r="{ref}" t="inlineStr"/>'
+            if len(value) > 1 and value.startswith("="):
+                return f'<c r="{ref}"><f>{escape(value[1:])}</f><v></v></c>'
+            if value in ERROR_CODES:
+                return f'<c r="{ref}" t="e"><v>{escape(value)}</v></c>'
+            stripped = value.strip()
+            space = ' xml:space="preserve"' if stripped and stripped != value else ""
+            return f'<c r="{ref}" t="inlineStr"><is><t{space}>{escape(value)}</t></is></c>'
+        for pos, (kind, _) in enumerate(_TEMPORAL_FORMATS):
+            if isinstance(value, kind):
+                if getattr(value, "tzinfo", None) is not None:
+                    raise TypeError("Excel не поддерживает даты с часовым поясом (tzinfo)")
+                self.used_temporal = True
+                serial = to_excel(value, self.epoch)
+                return f'<c r="{ref}" s="{self.temporal_styles[pos]}" t="n"><v>{"%.16g" % serial}</v></c>'
+        raise ValueError(f"Cannot convert {value!r} to Excel")
+
+    def row(self, row_idx: int, start_col: int, values: list[Any]) -> str:
+        parts = [f'<row r="{row_idx}">']
+        for j, value in enumerate(values, start=start_col):
+            if value is None:
+                continue
+            parts.append(self.cell(f"{self.letter(j)}{row_idx}", value))
+        parts.append("</row>")
+        return "".join(parts)
+
+
+def _sheet_names(archive: zipfile.ZipFile, wb_part: str) -> list[str]:
+    root = fromstring(archive.read(wb_part))
+    return [el.get("name") for el in root.iter(f"{{{NS_MAIN}}}sheet")]
+
+
+def _attrs(tag: str) -> dict[str, str]:
+    return {k: unescape(v, {"&quot;": '"', "&apos;": "'"}) for k, v in re.findall(r'([\w:]+)="([^"]*)"', tag)}
+
+
+def _plain_xf_for(attrs: dict[str, str], num_fmt_id: int) -> bool:
+    """xf без шрифта/заливки/рамки и прочих настроек, только с числовым форматом."""
+    return (attrs.get("numFmtId") == str(num_fmt_id)
+            and all(attrs.get(k, "0") == "0" for k in ("fontId", "fillId", "borderId", "xfId", "quotePrefix")))
+
+
+def _add_temporal_styles(styles_xml: str) -> Optional[tuple[str, list[int]]]:
+    """Находит или добавляет в styles.xml числовые форматы и xf для дат.
+    Уже имеющиеся форматы (по formatCode, включая встроенные) и подходящие xf
+    переиспользуются, добавляются только недостающие — повторные дозаписи листов
+    не раздувают styles.xml.
+    Возвращает (styles.xml, индекс xf для каждого типа из _TEMPORAL_FORMATS) или None,
+    если структуру styles.xml не удалось разобрать.
+    """
+    m = re.search(r"<(\w+:)?cellXfs\b([^>]*?)(/?)>", styles_xml)
+    if m is None or m.group(3):
+        return None
+    prefix = m.group(1) or ""
+    close = styles_xml.find(f"</{prefix}cellXfs>", m.end())
+    if close < 0:
+        return None
+    xf_tags = re.findall(rf"<{prefix}xf\b[^>]*>", styles_xml[m.end():close])
+    xf_attrs = [_attrs(t) for t in xf_tags]
+
+    nm = re.search(r"<(\w+:)?numFmts\b([^>]*?)(/?)>", styles_xml)
+    nprefix = (nm.group(1) or "") if nm is not None else prefix
+    nclose = -1
+    fmt_ids: dict[str, int] = {}
+    if nm is not None and not nm.group(3):
+        nclose = styles_xml.find(f"</{nprefix}numFmts>", nm.end())
+        if nclose < 0:
+            return None
+        for tag in re.findall(rf"<{nprefix}numFmt\b[^>]*>", styles_xml[nm.end():nclose]):
+            a = _attrs(tag)
+            if "formatCode" in a and a.get("numFmtId", "").isdigit():
+                fmt_ids.setdefault(a["formatCode"], int(a["numFmtId"]))
+
+    ids = [int(x) for x in re.findall(r'numFmtId="(\d+)"', styles_xml)]
+    next_id = max([163] + ids) + 1
+    new_fmts: list[str] = []
+    new_xfs: list[str] = []
+    xf_indices: list[int] = []
+    for _, fmt in _TEMPORAL_FORMATS:
+        fmt_id = fmt_ids.get(fmt, BUILTIN_FORMATS_REVERSE.get(fmt))
+        if fmt_id is None:
+            fmt_id = fmt_ids[fmt] = next_id
+            next_id += 1
+            new_fmts.append(f'<{nprefix}numFmt numFmtId="{fmt_id}" formatCode={quoteattr(fmt)}/>')
+        found = next((i for i, a in enumerate(xf_attrs) if _plain_xf_for(a, fmt_id)), None)
+        if found is None:
+            found = len(xf_attrs)
+            xf_attrs.append({"numFmtId": str(fmt_id)})
+            new_xfs.append(f'<{prefix}xf numFmtId="{fmt_id}" fontId="0" fillId="0" borderId="0" '
+                           f'applyNumberFormat="1" xfId="0"/>')
+        xf_indices.append(found)
+    if not new_xfs and not new_fmts:
+        return styles_xml, xf_indices
+
+    # правки с конца документа, чтобы не сдвигать найденные позиции
+    edits: list[tuple[int, int, str]] = []
+    if new_xfs:
+        head = re.sub(r'\scount="\d+"', "", m.group(0))
+        head = head[:-1] + f' count="{len(xf_attrs)}">'
+        edits.append((m.start(), m.end(), head))
+        edits.append((close, close, "".join(new_xfs)))
+    if new_fmts:
+        if nclose >= 0:
+            existing = len(re.findall(rf"<{nprefix}numFmt\b", styles_xml[nm.end():nclose]))
+            nhead = re.sub(r'\scount="\d+"', "", nm.group(0))
+            nhead = nhead[:-1] + f' count="{existing + len(new_fmts)}">'
+            edits.append((nm.start(), nm.end(), nhead))
+            edits.append((nclose, nclose, "".join(new_fmts)))
+        else:
+            root = re.search(rf"<{prefix}styleSheet\b[^>]*>", styles_xml)
+            if root is None:
+                return None
+            if nm is not None:  # пустой <numFmts/>
+                edits.append((nm.start(), nm.end(), ""))
+            block = f'<{nprefix}numFmts count="{len(new_fmts)}">{"".join(new_fmts)}</{nprefix}numFmts>'
+            edits.append((root.end(), root.end(), block))
+    for start, end, text in sorted(edits, key=lambda e: e[0], reverse=True):
+        styles_xml = styles_xml[:start] + text + styles_xml[end:]
+    return styles_xml, xf_indices
+
+
+def _copy_entry(zin: zipfile.ZipFile, zout: zipfile.ZipFile, info: zipfile.ZipInfo) -> None:
+    target = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+    target.compress_type = info.compress_type
+    target.external_attr = info.external_attr
+    target.file_size = info.file_size
+    with zin.open(info) as src, zout.open(target, "w") as dst:
+        shutil.copyfileobj(src, dst, 1 << 20)
+
+
+def _append_sheet(dest_path: Path, dest_sheet: str, rows: Iterable[list[Any]], start_cell: str) -> bool:
+    """Дописывает новый лист в существующую книгу на уровне архива.
+    Возвращает False (ничего не трогая), если лист уже есть или книга нестандартная.
+    """
+    with zipfile.ZipFile(dest_path) as zin:
+        names = set(zin.namelist())
+        root_rels = _rels(zin, "")
+        wb_part = next((p for t, p in root_rels.values() if t == REL_OFFICE_DOCUMENT), None)
+        if wb_part is None or wb_part not in names:
+            return False
+        if dest_sheet.lower() in {n.lower() for n in _sheet_names(zin, wb_part)}:
+            return False
+
+        wb_folder, wb_name = wb_part.rsplit("/", 1) if "/" in wb_part else ("", wb_part)
+        rels_part = f"{wb_folder}/_rels/{wb_name}.rels" if wb_folder else f"_rels/{wb_name}.rels"
+        wb_rels = _rels(zin, wb_part)
+        styles_part = next(
+            (p for t, p in wb_rels.values() if t == NS_REL + "/styles"), None
+        )
+        if rels_part not in names or "[Content_Types].xml" not in names:
+            return False
+        if styles_part is None or styles_part not in names:
+            return False
+
+        workbook_xml = zin.read(wb_part).decode("utf-8")
+        rels_xml = zin.read(rels_part).decode("utf-8")
+        types_xml = zin.read("[Content_Types].xml").decode("utf-8")
+        styles_xml = zin.read(styles_part).decode("utf-8")
+
+        sheets_close = re.search(r"</(\w+:)?sheets>", workbook_xml)
+        rels_close = re.search(r"</(\w+:)?Relationships>", rels_xml)
+        types_close = re.search(r"</(\w+:)?Types>", types_xml)
+        styled = _add_temporal_styles(styles_xml)
+        if sheets_close is None or rels_close is None or types_close is None or styled is None:
+            return False
+        styles_xml_new, temporal_styles = styled
+
+        epoch = WINDOWS_EPOCH
+        pr = re.search(r"<(?:\w+:)?workbookPr\b[^>]*>", workbook_xml)
+        if pr is not None and re.search(r'date1904="(1|true)"', pr.group(0)):
+            epoch = CALENDAR_MAC_1904
+
+        n = 1
+        while f"{wb_folder}/worksheets/sheet{n}.xml".lstrip("/") in names:
+            n += 1
+        sheet_part = f"{wb_folder}/worksheets/sheet{n}.xml".lstrip("/")
+        rel_ids = set(re.findall(r'\bId="([^"]+)"', rels_xml))
+        k = len(rel_ids) + 1
+        while f"rId{k}" in rel_ids:
+            k += 1
+        rel_id = f"rId{k}"
+        sheet_ids = [int(x) for x in re.findall(r'\bsheetId="(\d+)"', workbook_xml)]
+        sheet_id = max(sheet_ids, default=0) + 1
+
+        p = sheets_close.group(1) or ""
+        sheet_el = (
+            f'<{p}sheet xmlns:r="{NS_REL}" name={quoteattr(dest_sheet)} '
+            f'sheetId="{sheet_id}" r:id="{rel_id}"/>'
+        )
+        workbook_xml = workbook_xml[:sheets_close.start()] + sheet_el + workbook_xml[sheets_close.start():]
+        p = rels_close.group(1) or ""
+        rel_el = f'<{p}Relationship Id="{rel_id}" Type="{REL_WORKSHEET}" Target="/{sheet_part}"/>'
+        rels_xml = rels_xml[:rels_close.start()] + rel_el + rels_xml[rels_close.start():]
+        p = types_close.group(1) or ""
+        type_el = f'<{p}Override PartName="/{sheet_part}" ContentType="{CT_WORKSHEET}"/>'
+        types_xml = types_xml[:types_close.start()] + type_el + types_xml[types_close.start():]
+
+        fd, tmp = tempfile.mkstemp(dir=dest_path.parent, suffix=".xlsx.tmp")
+        os.close(fd)
+        try:
+            with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED, allowZip64=True) as zout:
+                writer = _CellWriter(epoch, temporal_styles)
+                with zout.open(sheet_part, "w", force_zip64=True) as dst:
+                    dst.write(_SHEET_HEAD.encode("utf-8"))
+                    for row_idx, start_col, values in _offset_rows(rows, start_cell):
+                        dst.write(writer.row(row_idx, start_col, values).encode("utf-8"))
+                    dst.write(_SHEET_TAIL.encode("utf-8"))
+
+                replaced = {
+                    wb_part: workbook_xml,
+                    rels_part: rels_xml,
+                    "[Content_Types].xml": types_xml,
+                }
+                if writer.used_temporal and styles_xml_new != styles_xml:
+                    replaced[styles_part] = styles_xml_new
+                for info in zin.infolist():
+                    if info.filename in replaced:
+                        zout.writestr(info, replaced[info.filename].encode("utf-8"))
+                    else:
+                        _copy_entry(zin, zout, info)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    os.replace(tmp, dest_path)
+    return True
+
+
+def _discard_sheet(ws) -> None:
+    """Закрывает недописанный write-only лист и удаляет его временный файл openpyxl
+    (иначе поток записи листа закрывается сборщиком мусора уже после закрытия файла)."""
+    if ws._writer is None:
+        return
+    try:
+        ws.close()
+    finally:
+        ws._writer.cleanup()
+
+
+def _create_workbook(dest_path: Path, dest_sheet: str, rows: Iterable[list[Any]], start_cell: str) -> None:
+    """Новый файл: write-only книга openpyxl с единственным листом dest_sheet."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(dest_sheet)
+    next_row = 1
+    try:
+        for row_idx, start_col, values in _offset_rows(rows, start_cell):
+            while next_row < row_idx:
+                ws.append([])
+                next_row += 1
+            ws.append([None] * (start_col - 1) + list(values))
+            next_row += 1
+    except BaseException:
+        _discard_sheet(ws)
+        raise
+
+    fd, tmp = tempfile.mkstemp(dir=dest_path.parent, suffix=".xlsx.tmp")
+    os.close(fd)
+    try:
+        wb.save(tmp)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    os.replace(tmp, dest_path)
+
+
+def write_sheet_streaming(
+    dest_path: Path,
+    dest_sheet: str,
+    rows: Iterable[list[Any]],
+    start_cell: str = "A1",
+) -> bool:
+    """Потоковая запись rows в новый лист dest_sheet.
+
+    Если файла нет — создаётся книга с одним листом. Если файл есть, а листа нет —
+    лист дописывается на уровне архива. Если лист уже существует (или книгу
+    не удалось разобрать), возвращается False и rows не читаются:
+    вызывающий код должен записать данные обычным способом.
+    """
+    if INVALID_TITLE_REGEX.search(dest_sheet):
+        raise ValueError(f"Недопустимое имя листа: '{dest_sheet}'")
+    dest_path = Path(dest_path)
+    if not dest_path.exists():
+        _create_workbook(dest_path, dest_sheet, rows, start_cell)
+        return True
+    return _append_sheet(dest_path, dest_sheet, rows, start_cell)
@@ -0,0 +1,26 @@
+import sys
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def make_xlsx(tmp_path):
+    """make_xlsx(rows, name="src.xlsx", title="Лист1") -> путь к книге, собранной openpyxl."""
+
+    def make(rows, name="src.xlsx", title="Лист1"):
+        wb = Workbook()
+        ws = wb.active
+        ws.title = title
+        for row in rows:
+            ws.append(list(row))
+        path = tmp_path / name
+        wb.save(path)
+        return path
+
+    return make
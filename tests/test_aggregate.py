@@ -0,0 +1,74 @@
+import random
+from datetime import date, datetime
+from collections import defaultdict
+
+import pytest
+from openpyxl import load_workbook
+
+from core.aggregate import aggregate_rows, parse_metric
+from core.excel_manager import ExcelManager
+
+ROWS = [
+    ["Регион", "Статус", "Сумма", "Клиент"],
+    ["Север", "Оплачено", 10, "a"],
+    ["Юг", "Оплачено", 5.5, "b"],
+    ["Север", "Отменено", None, "a"],
+    ["Север", "Оплачено", 30, "c"],
+    ["Юг", "Отменено", "нет", None],
+]
+METRICS = {"Строк": "count", "Итого": ("sum", "Сумма"), "Среднее": ("mean", "Сумма"),
+           "Мин": ("min", "Сумма"), "Макс": ("max", "Сумма"), "Клиентов": ("nunique", "Клиент")}
+
+
+def test_metrics_by_group(make_xlsx):
+    res = ExcelManager(make_xlsx(ROWS)).aggregate("Регион", METRICS)
+    assert res.rows() == [
+        ["Регион", "Строк", "Итого", "Среднее", "Мин", "Макс", "Клиентов"],
+        ["Север", 3, 40, 20.0, 10, 30, 2],
+        ["Юг", 2, 5.5, 5.5, 5.5, 5.5, 1],
+    ]
+    assert res.get("Юг", "Итого") == 5.5
+
+
+def test_rules_and_pivot(make_xlsx, tmp_path):
+    em = ExcelManager(make_xlsx(ROWS))
+    res = em.aggregate(["Регион", "Статус"], {"Итого": ("sum", "Сумма")},
+                       rules={"Клиент": {"empty": True}},
+                       dest_path=tmp_path / "out.xlsx", dest_sheet="Свод", pivot=("Статус", "Итого"))
+    assert len(res) == 3
+    sheet = [list(r) for r in load_workbook(tmp_path / "out.xlsx")["Свод"].iter_rows(values_only=True)]
+    assert sheet == [["Регион", "Оплачено", "Отменено"], ["Север", 40, None], ["Юг", 5.5, None]]
+
+
+def test_matches_naive_grouping():
+    rnd = random.Random(3)
+    rows = [[rnd.choice("abc"), rnd.choice([None, 1, 2.5, 7, -3])] for _ in range(500)]
+    got = aggregate_rows(rows, [0], [("count", None), ("sum", 1), ("max", 1)])
+    groups = defaultdict(list)
+    for key, v in rows:
+        groups[(key,)].append(v)
+    expected = {k: [len(vs), sum(v for v in vs if v is not None),
+                    max(v for v in vs if v is not None)] for k, vs in groups.items()}
+    assert got == expected
+    assert list(got) == list(expected)  # порядок первого появления
+
+
+def test_bad_metrics():
+    with pytest.raises(ValueError):
+        parse_metric("x", ("median", "Сумма"))
+    with pytest.raises(ValueError):
+        parse_metric("x", "sum")
+
+
+def test_min_max_follow_value_types():
+    rows = [
+        ["a", "нет", datetime(2024, 3, 1, 9)], ["a", 7, date(2024, 3, 1)], ["a", -2, "позже"],
+        ["b", "x", date(2023, 1, 5)], ["b", "y", None],
+        ["c", None, "  "],
+    ]
+    got = aggregate_rows(rows, [0], [("min", 1), ("max", 1), ("sum", 1), ("min", 2), ("max", 2)])
+    assert got == {
+        ("a",): [-2, 7, 5, date(2024, 3, 1), datetime(2024, 3, 1, 9)],
+        ("b",): ["x", "y", None, date(2023, 1, 5), date(2023, 1, 5)],
+        ("c",): [None, None, None, None, None],
+    }
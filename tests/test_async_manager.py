@@ -0,0 +1,102 @@
+import asyncio
+import contextlib
+import threading
+
+import pytest
+from openpyxl import load_workbook
+
+from core.async_manager import AsyncExcelManager, WorkbookLimiter
+from core.excel_manager import ExcelManager
+
+ROWS = [["ФИО", "Статус", "Сумма"]] + [
+    [f"Клиент {i}", "Отменено" if i % 3 == 0 else "Оплачено", i] for i in range(500)
+]
+RULES = {"Статус": {"equals": ["Отменено"]}}
+
+
+def values(path, sheet):
+    return [list(r) for r in load_workbook(path)[sheet].iter_rows(values_only=True)]
+
+
+def test_results_match_sync_api(make_xlsx, tmp_path):
+    src = make_xlsx(ROWS)
+    em = ExcelManager(src)
+
+    async def main():
+        aem = await AsyncExcelManager.open(src)
+        rows = [r async for r in aem.iter_rows(RULES, chunk_rows=64)]
+        assert rows == em.filter(RULES)
+        assert await aem.count_rows() == em.count_rows()
+        await aem.filter_and_transfer(tmp_path / "a.xlsx", "Out", ["ФИО", "Сумма"], RULES, stream=True)
+        await aem.export(tmp_path / "a.csv", ["ФИО"], RULES)
+        agg = await aem.aggregate("Статус", {"Итого": ("sum", "Сумма")})
+        return agg
+
+    agg = asyncio.run(main())
+    em.filter_and_transfer(tmp_path / "s.xlsx", "Out", ["ФИО", "Сумма"], RULES)
+    assert values(tmp_path / "a.xlsx", "Out") == values(tmp_path / "s.xlsx", "Out")
+    assert (tmp_path / "a.csv").read_text(encoding="utf-8").splitlines()[:2] == ["ФИО", "Клиент 1"]
+    assert agg.rows() == em.aggregate("Статус", {"Итого": ("sum", "Сумма")}).rows()
+
+
+def test_limiter_bounds_concurrent_operations(make_xlsx):
+    src = make_xlsx(ROWS)
+    active = peak = 0
+    lock = threading.Lock()
+
+    def work(manager):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        try:
+            return manager.count_rows()
+        finally:
+            with lock:
+                active -= 1
+
+    async def main():
+        limiter = WorkbookLimiter(2)
+        managers = [await AsyncExcelManager.open(src, limiter=limiter) for _ in range(6)]
+        counts = await asyncio.gather(*(m.call(work) for m in managers))
+        limiter.shutdown()
+        return counts
+
+    assert asyncio.run(main()) == [500] * 6
+    assert peak <= 2
+
+
+def test_cancel_stops_streaming_without_output(make_xlsx, tmp_path):
+    src = make_xlsx(ROWS)
+    dest = tmp_path / "out.xlsx"
+    started = threading.Event()
+
+    async def main():
+        aem = await AsyncExcelManager.open(src)
+        original = aem.manager.iter_data_rows
+
+        def slow_rows(*args, **kwargs):
+            for row in original(*args, **kwargs):
+                started.set()
+                threading.Event().wait(0.002)
+                yield row
+
+        aem.manager.iter_data_rows = slow_rows
+        task = asyncio.create_task(aem.copy_columns(dest, "Out", ["ФИО"], stream=True))
+        while not started.is_set():
+            await asyncio.sleep(0.001)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # место в лимите освобождается, когда поток действительно остановился
+        async with contextlib.aclosing(aem.iter_rows(chunk_rows=10)) as rows:
+            async for _ in rows:
+                break
+
+    asyncio.run(main())
+    assert not dest.exists()
+
+
+def test_bad_arguments():
+    with pytest.raises(ValueError):
+        WorkbookLimiter(0)
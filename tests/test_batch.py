@@ -0,0 +1,42 @@
+from openpyxl import load_workbook
+
+from core.excel_manager import ExcelManager
+
+RULES = {"Статус": {"equals": ["Отменено"]}}
+
+
+def make_files(make_xlsx):
+    paths = []
+    for i in range(3):
+        rows = [["Сумма", "Статус"]] + [[i * 10 + j, "Отменено" if j % 2 else "Оплачено"] for j in range(4)]
+        paths.append(make_xlsx(rows, name=f"f{i}.xlsx"))
+    return paths
+
+
+def test_results_keep_order_and_errors(make_xlsx, tmp_path):
+    paths = make_files(make_xlsx)
+    missing = tmp_path / "нет.xlsx"
+    res = ExcelManager.map_files(paths[:2] + [missing] + paths[2:], rules=RULES,
+                                 columns=["Статус", "Сумма"], workers=2)
+    assert [f.path for f in res.files] == paths[:2] + [missing] + paths[2:]
+    assert list(res.errors) == [missing]
+    assert res.files[0].header == ["Статус", "Сумма"]
+    assert list(res.rows()) == [("Оплачено", s) for s in (0, 2, 10, 12, 20, 22)]
+
+
+def test_pool_matches_single_process(make_xlsx, tmp_path):
+    paths = make_files(make_xlsx)
+    one = ExcelManager.map_files(paths, rules=RULES, workers=1)
+    pool = ExcelManager.map_files(paths, rules=RULES, workers=3)
+    assert list(pool.rows()) == list(one.rows())
+
+
+def test_combined_output(make_xlsx, tmp_path):
+    paths = make_files(make_xlsx)
+    dest = tmp_path / "итог.xlsx"
+    ExcelManager.map_files(paths, rules=RULES, columns=["Сумма"], workers=1,
+                           dest_path=dest, dest_sheet="Итог", source_column="Файл")
+    rows = [list(r) for r in load_workbook(dest)["Итог"].iter_rows(values_only=True)]
+    assert rows[0] == ["Сумма", "Файл"]
+    assert rows[1:3] == [[0, "f0.xlsx"], [2, "f0.xlsx"]]
+    assert len(rows) == 7
@@ -0,0 +1,25 @@
+from bench.generator import WorkbookSpec, generate
+from bench.suite import _build_header, _setup_header, _setup_transfer_styles, _transfer_styles
+from core.excel_manager import ExcelManager
+
+
+def test_header_bench_uses_real_header_row(tmp_path):
+    spec = WorkbookSpec(rows=20, title_rows=2)
+    path = generate(spec, tmp_path / spec.file_name)
+    data = _setup_header(path, tmp_path)
+    assert data == (path, spec.title_rows + 1)
+    assert ExcelManager(path, header_row=data[1]).header.names == spec.headers()
+    _build_header(data, tmp_path)
+
+
+def test_transfer_styles_bench_calls_transfer_styles(tmp_path, monkeypatch):
+    spec = WorkbookSpec(rows=30, styles=True)
+    path = generate(spec, tmp_path / spec.file_name)
+    data = _setup_transfer_styles(path, tmp_path)
+    calls = []
+    original = ExcelManager._apply_styles
+    monkeypatch.setattr(ExcelManager, "_apply_styles",
+                        lambda self, *a, **kw: calls.append(a) or original(self, *a, **kw))
+    _transfer_styles(data, tmp_path)
+    _transfer_styles(data, tmp_path)  # повторный прогон на том же приёмнике
+    assert len(calls) == 2
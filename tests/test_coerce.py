@@ -0,0 +1,60 @@
+import random
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from core.coerce import coerce_values, infer_date_format
+from core.excel_manager import ExcelManager
+from core.utils import to_date
+
+
+def random_dates(rnd, n):
+    out = []
+    for _ in range(n):
+        d = date(rnd.randint(1990, 2030), rnd.randint(1, 12), rnd.randint(1, 28))
+        out.append(rnd.choice([
+            d.strftime("%d.%m.%Y"), d.strftime("%Y-%m-%d"), d.strftime("%d/%m/%Y"),
+            f" {d.day}.{d.month}.{d.year} ", f"{d.day:02d}.{d.month:02d}.{d.year % 100}",
+            "31.02.2024", "2024-13-01", "мусор", "", None, d, datetime(d.year, d.month, d.day, 5),
+            12345,
+        ]))
+    return out
+
+
+@pytest.mark.parametrize("n", [20, 2000])  # 2000 — с векторным разбором, если есть NumPy
+def test_dates_match_to_date(n):
+    values = random_dates(random.Random(n), n)
+    assert coerce_values(values, "date") == [to_date(v) for v in values]
+
+
+def test_infer_date_format():
+    assert infer_date_format(["2024-01-31", "2024-02-01", "01.02.2024"]) == "%Y-%m-%d"
+    assert infer_date_format(["x", "y"]) is None
+
+
+def test_numbers():
+    values = ["1 234,50", " 7 ", 3.0, 2.5, 10, True, None, "abc", "1e3", float("nan"), Decimal("4.10")]
+    assert coerce_values(values, "decimal") == [
+        Decimal("1234.50"), Decimal("7"), Decimal("3.0"), Decimal("2.5"), Decimal(10),
+        None, None, None, Decimal("1e3"), None, Decimal("4.10"),
+    ]
+    assert coerce_values(values, "int") == [None, 7, 3, None, 10, None, None, None, 1000, None, None]
+    with pytest.raises(ValueError):
+        coerce_values([], "float")
+
+
+def test_coerced_column_is_used_by_aggregate(make_xlsx):
+    em = ExcelManager(make_xlsx([["Группа", "Сумма"], ["a", "1,5"], ["a", "2,25"], ["b", "x"]]))
+    assert em.coerce("Сумма", "decimal") == [Decimal("1.5"), Decimal("2.25"), None]
+    res = em.aggregate("Группа", {"Итого": ("sum", "Сумма")})
+    assert res.get("a", "Итого") == Decimal("3.75")
+    assert res.get("b", "Итого") is None  # чисел в группе нет
+
+
+@pytest.mark.parametrize("n", [20, 2000])
+def test_fast_path_rejects_what_strptime_rejects(n):
+    odd = ["001.02.2024", "01.002.2024", "01.02.02024", "1.2.2024", "01.02.24", "²1.02.2024", "1.1.2024"]
+    values = [f"{i % 28 + 1:02d}.03.2024" for i in range(n)] + odd
+    assert infer_date_format(values) == "%d.%m.%Y"
+    assert coerce_values(values, "date") == [to_date(v) for v in values]
@@ -0,0 +1,98 @@
+import random
+from collections import Counter
+from datetime import date, datetime
+
+import pytest
+
+from core.column_profile import HyperLogLog, profile_rows
+from core.excel_review import ExcelReview
+
+
+def random_rows(rnd, n):
+    rows = []
+    for i in range(n):
+        rows.append([
+            rnd.choice([None, "", "  ", "a", "b", "c", "d"]),
+            rnd.choice([rnd.randint(-50, 50), rnd.random() * 100]),
+            rnd.choice([date(2024, 1, rnd.randint(1, 28)), datetime(2023, 5, 1, 12)]),
+            f"id{i}",
+        ])
+    return rows
+
+
+def test_counts_match_exact():
+    rows = random_rows(random.Random(1), 3000)
+    profile = profile_rows(rows, ["Статус", "Сумма", "Дата", "Код"], top_k=3)
+    assert profile.rows == 3000
+
+    status = profile.column("статус")
+    col = [r[0] for r in rows]
+    assert status.nulls == col.count(None)
+    assert status.empties == sum(1 for v in col if isinstance(v, str) and not v.strip())
+    assert status.type == "str"
+    assert status.distinct == 4 and status.distinct_exact
+    assert status.top_exact
+    assert status.top == Counter(v for v in col if v and v.strip()).most_common(3)
+
+    amount = profile.column(1)
+    nums = [r[1] for r in rows]
+    assert amount.type == "float"
+    assert (amount.min, amount.max) == (min(nums), max(nums))
+
+    dates = profile.column("Дата")
+    assert dates.type == "datetime"
+    assert dates.min == datetime(2023, 5, 1, 12)
+
+
+def test_distinct_estimate_within_tolerance():
+    n = 50_000
+    profile = profile_rows(([f"id{i}"] for i in range(n)), ["Код"], sample_size=3)
+    code = profile.column(0)
+    assert not code.distinct_exact
+    assert abs(code.distinct - n) / n < 0.05
+    assert len(code.sample) == 3
+    assert len(set(code.sample)) == 3
+
+
+def test_hyperloglog_accuracy():
+    for n in (100, 10_000):
+        hll = HyperLogLog()
+        for i in range(n):
+            hll.add(i)
+            hll.add(i)  # повторы не влияют на оценку
+        assert abs(hll.estimate() - n) / n < 0.05
+
+
+def test_short_rows_and_seed():
+    rows = [["x"], ["y", 1], []]
+    profile = profile_rows(rows, ["A", "B"], seed=7)
+    assert [c.nulls for c in profile.columns] == [1, 2]
+    assert profile.column("B").type == "int"
+    assert profile_rows(rows, ["A", "B"], seed=7).as_dict() == profile.as_dict()
+    with pytest.raises(KeyError):
+        profile.column("C")
+
+
+def test_review_profile(make_xlsx):
+    path = make_xlsx([["Имя", "Возраст"], ["a", 1], ["b", None], ["a", 3]])
+    profile = ExcelReview(path).profile()
+    assert profile.rows == 3
+    name, age = profile.columns
+    assert name.top == [("a", 2), ("b", 1)]
+    assert (age.nulls, age.min, age.max) == (1, 1, 3)
+
+
+def test_distinct_estimate_is_stable_across_processes():
+    import os
+    import subprocess
+    import sys
+
+    code = ("from core.column_profile import profile_rows;"
+            "print(profile_rows(([f'id{i}'] for i in range(5000)), ['Код']).columns[0].distinct)")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = {
+        subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True,
+                       env=dict(os.environ, PYTHONHASHSEED=seed)).stdout
+        for seed in ("1", "2", "3")
+    }
+    assert len(results) == 1
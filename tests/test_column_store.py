@@ -0,0 +1,43 @@
+from core.column_store import ColumnStore
+from core.row_filters import filter_rows
+
+ROWS = [
+    ["a", 1],
+    ["b", 2.5],
+    ["c", None],
+    ["d", 1.0],
+    ["e", -7],
+    ["f", 250.5],
+]
+
+
+def test_mixed_numeric_column_is_float():
+    store = ColumnStore(ROWS)
+    col = store.column(1)
+    assert col.kind == "float"
+    assert list(col.data) == [1.0, 2.5, 0.0, 1.0, -7.0, 250.5]
+    assert store.column(0).kind == "object"
+
+
+def test_mixed_numeric_column_keeps_values():
+    store = ColumnStore(ROWS)
+    assert list(store.rows) == ROWS
+    assert [type(v) for v in store.column_values(1)] == [int, float, type(None), float, int, float]
+    assert store.take([4, 0, 2]) == [ROWS[4], ROWS[0], ROWS[2]]
+
+
+def test_mixed_numeric_column_filters_like_rows():
+    store = ColumnStore(ROWS)
+    for rules in ({1: {"equals": ["1"]}}, {1: {"equals": ["1.0"]}},
+                  {1: {"contains": ["5"]}}, {1: {"empty": True}}):
+        assert store.filter(rules) == filter_rows(ROWS, rules)
+
+
+def test_inexact_ints_stay_object():
+    store = ColumnStore([[2 ** 60], [0.5]])
+    assert store.column(0).kind == "object"
+    assert list(store.rows) == [[2 ** 60], [0.5]]
+
+
+def test_ints_and_strings_stay_object():
+    assert ColumnStore([[1], ["x"]]).column(0).kind == "object"
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta, timezone
+
+from core.compact_rows import Interner, memory_usage
+from core.excel_manager import ExcelManager
+
+
+def test_interner_shares_equal_values_of_same_type():
+    intern = Interner()
+    a = intern("".join(["Моск", "ва"]))
+    assert intern("".join(["Мос", "ква"])) is a
+    assert intern(1.5 + 0) is intern(3 / 2)
+    # равные, но разные значения не склеиваются
+    assert type(intern(1.0)) is float and type(intern(1000)) is int
+    assert intern(True) is True
+    assert str(intern(-0.0)) == "-0.0"
+    utc = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+    msk = datetime(2024, 1, 1, 15, tzinfo=timezone(timedelta(hours=3)))
+    intern(utc)
+    assert intern(msk).tzinfo == msk.tzinfo
+
+
+def test_interned_rows_are_lists():
+    intern = Interner()
+    rows = [intern.row(("a", 1.5, None)), intern.row(["a", 1.5, "b"])]
+    assert rows == [["a", 1.5, None], ["a", 1.5, "b"]]
+    assert rows[0][0] is rows[1][0] and rows[0][1] is rows[1][1]
+
+
+def test_manager_compact_matches_plain(make_xlsx):
+    rows = [["Город", "Статус", "Сумма"]] + [
+        [f"Город {i % 5}", "Оплачено" if i % 2 else "Отменено", i * 1.5] for i in range(300)
+    ]
+    src = make_xlsx(rows)
+    plain = ExcelManager(src)
+    compact = ExcelManager(src, compact=True)
+    assert compact.data_rows() == plain.data_rows()
+    assert type(compact.data_rows()) is list and type(compact.data_rows()[0]) is list
+    rules = {"Статус": {"equals": ["Отменено"]}}
+    assert compact.filter(rules) == plain.filter(rules)
+
+    assert compact.memory_usage()["storage"] == "compact"
+    assert memory_usage(compact.data_rows())["unique_values"] < memory_usage(plain.data_rows())["unique_values"]
+    assert compact.memory_usage()["total"] < plain.memory_usage()["total"]
+
+
+def test_compact_rows_can_be_edited_in_place(make_xlsx):
+    em = ExcelManager(make_xlsx([["Код", "Статус"], [1, "a"], [2, "b"]]), compact=True)
+    rows = em.data_rows()
+    rows[0][1] = "b"
+    assert em.data_rows()[0] == [1, "b"]
+    assert em.filter({"Статус": {"equals": ["b"]}}) == []  # правило отбрасывает совпавшие строки
@@ -0,0 +1,65 @@
+import csv
+from datetime import date, datetime
+
+import pytest
+
+from core.excel_manager import ExcelManager
+from core.flat_export import _infer_kind, _merge_kinds, write_arrow
+
+ROWS = [
+    ["Регион", "Сумма", "Код", "Дата"],
+    ["Москва", 100, 1, date(2024, 1, 1)],
+    ["Казань", 200, 2, date(2024, 1, 2)],
+    ["СПб", 250.5, "A-3", datetime(2024, 1, 3, 12, 0)],
+    ["Москва", 300, 4, None],
+]
+
+
+def test_merge_kinds():
+    assert _merge_kinds(None, "int") == "int"
+    assert _merge_kinds("int", "float") == "float"
+    assert _merge_kinds("date", "datetime") == "datetime"
+    assert _merge_kinds("int", "string") == "string"
+    assert _merge_kinds("bool", "int") == "string"
+    assert _infer_kind([None, None]) is None
+    assert _infer_kind([1, None, 2.5]) == "float"
+    assert _infer_kind([2.5], "int") == "float"
+
+
+def test_csv_matches_rows(make_xlsx, tmp_path):
+    em = ExcelManager(make_xlsx(ROWS))
+    dest = tmp_path / "out.csv"
+    em.export(dest, ["Регион", "Сумма"], rules={"Регион": {"equals": ["Казань"]}}, delimiter=";")
+    with open(dest, encoding="utf-8", newline="") as f:
+        got = list(csv.reader(f, delimiter=";"))
+    assert got == [["Регион", "Сумма"], ["Москва", "100"], ["СПб", "250.5"], ["Москва", "300"]]
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_arrow_type_changes_between_batches(make_xlsx, tmp_path, fmt):
+    pa = pytest.importorskip("pyarrow")
+    em = ExcelManager(make_xlsx(ROWS))
+    dest = tmp_path / f"out.{fmt}"
+    em.export(dest, batch_rows=2)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        table = pq.read_table(dest)
+    else:
+        table = pa.ipc.open_file(dest).read_all()
+    types = {f.name: str(f.type) for f in table.schema}
+    assert types == {"Регион": "string", "Сумма": "double", "Код": "string", "Дата": "timestamp[us]"}
+    data = table.to_pydict()
+    assert data["Сумма"] == [100.0, 200.0, 250.5, 300.0]
+    assert data["Код"] == ["1", "2", "A-3", "4"]
+    assert data["Дата"][0] == datetime(2024, 1, 1) and data["Дата"][3] is None
+
+
+def test_arrow_widens_int_after_first_batch(tmp_path):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    dest = tmp_path / "w.parquet"
+    rows = [[i] for i in range(10)] + [[10.5]]
+    assert write_arrow(dest, iter(rows), ["x"], batch_rows=3) == 11
+    table = pq.read_table(dest)
+    assert str(table.schema.field("x").type) == "double"
+    assert table.column("x").to_pylist()[-2:] == [9.0, 10.5]
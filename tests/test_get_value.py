@@ -0,0 +1,53 @@
+import pytest
+from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
+
+from core.excel_manager import ExcelManager
+from core.sheet_cache import SheetCache
+
+ROWS = [
+    ["Отчёт за май"],
+    [],
+    ["Код", "Имя", "Сумма"],
+    [1, "a", 10],
+    [],
+    [" ", None, None],
+    [2, "b", None],
+    [3, None, 30],
+]
+
+
+def sheet_cell(ws, row, col):
+    return ws[f"{get_column_letter(col)}{row}"].value
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"engine": "fast"}, {"compact": True}, {"columnar": True}])
+def test_absolute_values_match_sheet(make_xlsx, kwargs):
+    src = make_xlsx(ROWS)
+    ws = load_workbook(src).active
+    em = ExcelManager(src, **kwargs)
+    for row in range(0, len(ROWS) + 3):
+        for col in range(1, 4):
+            expected = sheet_cell(ws, row, col) if row >= 1 else None
+            assert em.get_value(row, col - 1, absolute=True) == expected, (row, col)
+
+
+def test_absolute_values_from_cache(make_xlsx, tmp_path):
+    src = make_xlsx(ROWS)
+    cache = SheetCache(tmp_path / "cache")
+    ExcelManager(src, cache=cache).data_rows()
+    em = ExcelManager(src, cache=cache)
+    assert em._cache_entry is not None
+    assert em.get_value(7, "Имя", absolute=True) == "b"
+    assert em.get_value(6, 0, absolute=True) == " "
+
+
+def test_get_values_matches_get_value(make_xlsx):
+    em = ExcelManager(make_xlsx(ROWS))
+    cells = ["C8", (2, "Код"), "A1", (7, "Сумма"), (99, 0), "B4", (1, "Имя")]
+    expected = [30, 2, "Отчёт за май", None, None, "a", "a"]
+    assert em.get_values(cells) == expected
+    assert em.get_values([(7, "Код"), (4, 1)], absolute=True) == [2, "a"]
+    # строки данных без пустых и пробельных: вторая — без суммы
+    assert em.get_value(2, "Сумма") is None
+    assert em.get_value(3, "Сумма") == 30
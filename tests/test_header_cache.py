@@ -0,0 +1,48 @@
+from core.excel_manager import ExcelManager
+from core.header_cache import HeaderCache, header_fingerprint
+
+TEMPLATE = [["Отчёт"], [], ["Код", "Сумма", "Статус"]] + [[i, i * 2, "ok"] for i in range(60)]
+
+
+def test_fingerprint_ignores_case_and_trailing_blanks():
+    assert header_fingerprint([" Код", "СУММА", None, ""]) == header_fingerprint(["код", "сумма"])
+    assert header_fingerprint(["Код", "Сумма"]) != header_fingerprint(["Сумма", "Код"])
+
+
+def test_known_template_reads_only_rows_up_to_header(make_xlsx, tmp_path):
+    src = make_xlsx(TEMPLATE)
+    cache = HeaderCache(tmp_path / "headers.json")
+    first = ExcelManager(src, header_cache=cache)
+    assert first.header.row_idx == 3
+    assert len(first._head) > 3  # полный поиск по первым строкам
+
+    again = ExcelManager(src, header_cache=HeaderCache(tmp_path / "headers.json"))
+    assert len(again._head) == 3
+    assert again.header == first.header
+    assert again.data_rows() == first.data_rows()
+
+
+def test_other_template_falls_back_to_full_search(make_xlsx, tmp_path):
+    cache = HeaderCache(tmp_path / "headers.json")
+    ExcelManager(make_xlsx(TEMPLATE), header_cache=cache)
+
+    # тот же лист, но заголовок на другой строке: отпечаток не совпал — обычный поиск
+    shifted = make_xlsx([[], ["Код", "Сумма", "Статус"], [1, 2, "ok"]], name="other.xlsx")
+    em = ExcelManager(shifted, header_cache=cache)
+    assert em.header.row_idx == 2
+    assert em.data_rows() == [[1, 2, "ok"]]
+    assert [r for r, _ in cache.candidates("Лист1")] == [2, 3]
+
+
+def test_hit_moves_template_to_front(make_xlsx, tmp_path):
+    cache = HeaderCache(tmp_path / "headers.json")
+    src = make_xlsx(TEMPLATE)
+    ExcelManager(src, header_cache=cache)
+    ExcelManager(make_xlsx([[], ["Код", "Сумма", "Статус"], [1, 2, "ok"]], name="other.xlsx"),
+                 header_cache=cache)
+    assert [r for r, _ in cache.candidates("Лист1")] == [2, 3]
+
+    em = ExcelManager(src, header_cache=cache)
+    assert len(em._head) == 3  # найден по шаблону
+    assert [r for r, _ in cache.candidates("Лист1")] == [3, 2]
+    assert [r for r, _ in HeaderCache(tmp_path / "headers.json").candidates("Лист1")] == [3, 2]
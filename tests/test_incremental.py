@@ -0,0 +1,79 @@
+from openpyxl import load_workbook
+
+from core.excel_manager import ExcelManager
+from core.watermark import sidecar_path
+
+HEADER = ["Код", "Статус", "Сумма"]
+RULES = {"Статус": {"equals": ["Отменено"]}}
+COLUMNS = ["Код", "Сумма"]
+
+
+def rows(n, start=1):
+    return [[i, "Отменено" if i % 3 == 0 else "Оплачено", i * 10] for i in range(start, start + n)]
+
+
+def sheet(path):
+    return [list(r) for r in load_workbook(path)["Out"].iter_rows(values_only=True)]
+
+
+def transfer(src, dest, incremental=True):
+    em = ExcelManager(src, profile=True)
+    em.filter_and_transfer(dest, "Out", COLUMNS, RULES, incremental=incremental)
+    return em.stats.by_phase()["write"].rows
+
+
+def expected(make_xlsx, data, tmp_path):
+    dest = tmp_path / "full.xlsx"
+    dest.unlink(missing_ok=True)
+    transfer(make_xlsx([HEADER] + data, name="full_src.xlsx"), dest, incremental=False)
+    return sheet(dest)
+
+
+def test_new_rows_are_appended(make_xlsx, tmp_path):
+    dest = tmp_path / "out.xlsx"
+    data = rows(9)
+    assert transfer(make_xlsx([HEADER] + data), dest) == 1 + 6
+    assert sidecar_path(dest).exists()
+
+    data += rows(5, start=10)
+    written = transfer(make_xlsx([HEADER] + data), dest)
+    assert written == 4  # только новые строки, прошедшие фильтр
+    assert sheet(dest) == expected(make_xlsx, data, tmp_path)
+
+    assert transfer(make_xlsx([HEADER] + data), dest) == 0
+
+
+def test_changed_prefix_rebuilds_sheet(make_xlsx, tmp_path):
+    dest = tmp_path / "out.xlsx"
+    data = rows(9)
+    transfer(make_xlsx([HEADER] + data), dest)
+
+    data[2][2] = 999  # строка выше водяного знака переписана
+    data = data[:4] + data[5:]  # и одна удалена
+    assert transfer(make_xlsx([HEADER] + data), dest) == 1 + 5
+    assert sheet(dest) == expected(make_xlsx, data, tmp_path)
+
+
+def test_changed_params_rebuild_sheet(make_xlsx, tmp_path):
+    dest = tmp_path / "out.xlsx"
+    src = make_xlsx([HEADER] + rows(9))
+    transfer(src, dest)
+    em = ExcelManager(src)
+    em.filter_and_transfer(dest, "Out", ["Сумма"], RULES, incremental=True)
+    assert sheet(dest) == [["Сумма"]] + [[i * 10] for i in range(1, 10) if i % 3]
+
+
+def test_rebuild_keeps_cells_outside_block(make_xlsx, tmp_path):
+    dest = tmp_path / "out.xlsx"
+    data = rows(9)
+    transfer(make_xlsx([HEADER] + data), dest)
+    wb = load_workbook(dest)
+    for r in range(1, 12):
+        wb["Out"].cell(row=r, column=4, value=f"заметка {r}")
+    wb.save(dest)
+
+    data[0][2] = 111  # префикс переписан — перестройка
+    transfer(make_xlsx([HEADER] + data), dest)
+    got = sheet(dest)
+    assert [r[3] for r in got] == [f"заметка {r}" for r in range(1, 12)]
+    assert [r[:2] for r in got][:7] == expected(make_xlsx, data, tmp_path)
@@ -0,0 +1,46 @@
+from openpyxl import load_workbook
+
+from core.excel_manager import ExcelManager
+from core.row_filters import filter_rows
+
+ROWS = [
+    ["Отчёт"],
+    [],
+    ["Статус", "Регион", "Сумма"],
+    ["Отменено", "Север", 10],
+    [None, None, None],
+    ["Оплачено", "Юг", 20.5],
+    ["Черновик", "Север", None],
+    ["Оплачено", "Запад", 7],
+]
+RULES = {"Статус": {"equals": ["Отменено", "Черновик"]}}
+
+
+def sheet_values(path, sheet):
+    return [list(r) for r in load_workbook(path)[sheet].iter_rows(values_only=True)]
+
+
+def test_iter_data_rows_matches_data_rows(make_xlsx):
+    src = make_xlsx(ROWS)
+    expected = ExcelManager(src).data_rows()
+    assert expected == [r for r in ROWS[3:] if any(v is not None for v in r)]
+    assert list(ExcelManager(src).iter_data_rows()) == expected
+
+
+def test_rules_are_applied_while_reading(make_xlsx):
+    src = make_xlsx(ROWS)
+    em = ExcelManager(src)
+    expected = filter_rows(em.data_rows(), {0: RULES["Статус"]})
+    assert list(ExcelManager(src).iter_data_rows(RULES)) == expected
+    # после data_rows поток идёт по готовому кэшу
+    assert list(em.iter_data_rows(RULES)) == expected
+
+
+def test_streaming_transfer_matches_classic(make_xlsx, tmp_path):
+    src = make_xlsx(ROWS)
+    for stream in (False, True):
+        ExcelManager(src).filter_and_transfer(tmp_path / f"out{stream}.xlsx", "Out",
+                                              ["Сумма", "Статус"], RULES, stream=stream)
+    classic = sheet_values(tmp_path / "outFalse.xlsx", "Out")
+    assert classic == [["Сумма", "Статус"], [20.5, "Оплачено"], [7, "Оплачено"]]
+    assert sheet_values(tmp_path / "outTrue.xlsx", "Out") == classic
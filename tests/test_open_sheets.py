@@ -0,0 +1,32 @@
+from openpyxl import Workbook
+
+from core.excel_manager import ExcelManager
+
+
+def make_book(path):
+    wb = Workbook()
+    wb.active.title = "Январь"
+    for title in ("Январь", "Февраль", "Март"):
+        ws = wb[title] if title in wb.sheetnames else wb.create_sheet(title)
+        ws.append(["Код", "Сумма"])
+        for i in range(5):
+            ws.append([f"{title}-{i}", i * len(title)])
+    wb.save(path)
+    return path
+
+
+def test_open_sheets_matches_separate_managers(tmp_path):
+    path = make_book(tmp_path / "book.xlsx")
+    for workers in (1, 2):
+        ems = ExcelManager.open_sheets(path, workers=workers)
+        assert list(ems) == ["Январь", "Февраль", "Март"]
+        for title, em in ems.items():
+            assert em.data_rows() == ExcelManager(path, sheet=title).data_rows()
+
+
+def test_open_selected_sheets_by_name(tmp_path):
+    path = make_book(tmp_path / "book.xlsx")
+    ems = ExcelManager.open_sheets(path, ["март", "Январь"], workers=1)
+    assert list(ems) == ["Март", "Январь"]
+    assert ems["Март"]._reader is ems["Январь"]._reader
+    assert ems["Март"].filter({"Сумма": {"empty": True}})[0] == ["Март-1", 4]
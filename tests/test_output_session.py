@@ -0,0 +1,67 @@
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font
+
+from core.excel_manager import ExcelManager
+
+ROWS = [
+    ["ФИО", "Статус", "Сумма"],
+    ["Иванов", "Отменено", 10],
+    ["Петров", "Оплачено", 20],
+    ["Сидоров", "Оплачено", 30],
+]
+RULES = {"Статус": {"equals": ["Отменено"]}}
+
+
+def values(path, sheet):
+    return [list(r) for r in load_workbook(path)[sheet].iter_rows(values_only=True)]
+
+
+def test_session_matches_separate_calls(make_xlsx, tmp_path):
+    em = ExcelManager(make_xlsx(ROWS))
+    em.copy_columns(tmp_path / "one.xlsx", "Лист1", ["ФИО", "Сумма"])
+    em.filter_and_transfer(tmp_path / "one.xlsx", "Лист2", ["ФИО"], RULES)
+
+    with em.output(tmp_path / "batch.xlsx") as out:
+        out.copy_columns("Лист1", ["ФИО", "Сумма"])
+        out.filter_and_transfer("Лист2", ["ФИО"], RULES)
+        out.write_rows("Итог", [["Всего", 3]])
+
+    for sheet in ("Лист1", "Лист2"):
+        assert values(tmp_path / "batch.xlsx", sheet) == values(tmp_path / "one.xlsx", sheet)
+    assert values(tmp_path / "batch.xlsx", "Лист2") == [["ФИО"], ["Петров"], ["Сидоров"]]
+    assert values(tmp_path / "batch.xlsx", "Итог") == [["Всего", 3]]
+
+
+def test_error_leaves_file_untouched(make_xlsx, tmp_path):
+    em = ExcelManager(make_xlsx(ROWS))
+    dest = make_xlsx([["старое"]], name="dest.xlsx")
+    before = dest.read_bytes()
+    with pytest.raises(RuntimeError):
+        with em.output(dest) as out:
+            out.copy_columns("Лист1", ["ФИО"])
+            raise RuntimeError("сбой")
+    assert dest.read_bytes() == before
+
+
+def test_styles_in_session(tmp_path):
+    wb = Workbook()
+    ws = wb.active
+    for row in ROWS:
+        ws.append(row)
+    ws["A3"].font = Font(bold=True)
+    wb.save(tmp_path / "src.xlsx")
+
+    em = ExcelManager(tmp_path / "src.xlsx", read_only=False)
+    with em.output(tmp_path / "out.xlsx") as out:
+        out.filter_and_transfer("Лист1", ["ФИО"], RULES, styles=True)
+    dws = load_workbook(tmp_path / "out.xlsx")["Лист1"]
+    # «Петров» (строка 3 источника) после фильтра — вторая строка данных
+    assert dws["A2"].value == "Петров" and dws["A2"].font.b
+    assert not dws["A3"].font.b
+
+
+def test_operations_outside_session_fail(make_xlsx, tmp_path):
+    out = ExcelManager(make_xlsx(ROWS)).output(tmp_path / "out.xlsx")
+    with pytest.raises(RuntimeError):
+        out.write_rows("Лист1", [[1]])
@@ -0,0 +1,37 @@
+from core.excel_manager import ExcelManager
+
+ROWS = [["Статус", "Сумма"]] + [["Отменено" if i % 3 == 0 else "Оплачено", i] for i in range(30)]
+
+
+def test_streaming_transfer_reports_read_and_filter(make_xlsx, tmp_path):
+    src = make_xlsx(ROWS)
+    em = ExcelManager(src, profile=True)
+    em.filter_and_transfer(tmp_path / "out.xlsx", "Out", ["Статус", "Сумма"],
+                           {"Статус": {"equals": ["Отменено"]}}, stream=True)
+
+    phases = em.stats.by_phase()
+    assert {"read", "filter", "write"} <= phases.keys()
+    assert phases["read"].rows == phases["filter"].rows == 30
+    assert phases["write"].rows == 1 + 20  # заголовок и прошедшие фильтр строки
+    assert phases["read"].seconds + phases["filter"].seconds <= phases["write"].seconds
+
+
+def test_streaming_copy_reports_read_without_filter(make_xlsx, tmp_path):
+    em = ExcelManager(make_xlsx(ROWS), profile=True)
+    em.copy_columns(tmp_path / "out.xlsx", "Out", ["Сумма"], stream=True)
+
+    phases = em.stats.by_phase()
+    assert phases["read"].rows == 30
+    assert "filter" not in phases
+
+
+def test_stream_fallback_counts_rows_in_its_own_span(make_xlsx, tmp_path):
+    dest = tmp_path / "out.xlsx"
+    ExcelManager(make_xlsx(ROWS)).copy_columns(dest, "Out", ["Сумма"])
+    em = ExcelManager(make_xlsx(ROWS), profile=True)
+    # лист уже есть — потоковая запись уступает классическому пути
+    em.copy_columns(dest, "Out", ["Сумма"], stream=True)
+
+    writes = [s for s in em.stats.spans if s.name == "write"]
+    assert [s.rows for s in writes] == [0, 1 + 30]
+    assert em.stats.by_phase()["write"].rows == 1 + 30
@@ -0,0 +1,90 @@
+import random
+
+from openpyxl import load_workbook
+
+from core.excel_manager import ExcelManager
+from core.row_diff import STATUS_ADDED, STATUS_CHANGED, STATUS_REMOVED, diff_rows
+
+OLD = [
+    ["Код", "Город", "Сумма"],
+    ["A1", "Москва", 10],
+    ["A2", "Казань", 20],
+    ["A3", "Омск", 30],
+    [None, "Без кода", 0],
+]
+NEW = [
+    ["Сумма", "Код", "Город"],  # колонки в другом порядке
+    [10.0, "a1", "москва "],
+    [25, "A2", "Казань"],
+    [40, "A4", "Тула"],
+]
+
+
+def test_diff_by_key(make_xlsx, tmp_path):
+    old = ExcelManager(make_xlsx(OLD, name="old.xlsx"))
+    new = ExcelManager(make_xlsx(NEW, name="new.xlsx"))
+    res = new.diff(old, "Код", dest_path=tmp_path / "diff.xlsx", dest_sheet="Сверка")
+
+    assert res.summary() == {"added": 1, "removed": 1, "changed": 1, "unchanged": 1, "skipped": 1}
+    assert res.added == [[40, "A4", "Тула"]]
+    assert res.removed == [["A3", "Омск", 30]]
+    (changed,) = res.changed
+    assert changed.key == ["A2"] and changed.changes == {"Сумма": (20, 25)}
+
+    report = [list(r) for r in load_workbook(tmp_path / "diff.xlsx")["Сверка"].iter_rows(values_only=True)]
+    assert report == [
+        ["Статус", "Код", "Колонка", "Было", "Стало"],
+        [STATUS_ADDED, "A4", None, None, None],
+        [STATUS_REMOVED, "A3", None, None, None],
+        [STATUS_CHANGED, "A2", "Сумма", 20, 25],
+    ]
+
+
+def test_without_normalization_case_and_spaces_count():
+    res = diff_rows([["a1", "москва "]], [["A1", "Москва"]], [0], [0], [1], [1],
+                    key_names=["Код"], compare_names=["Город"], normalize=False)
+    # ключи нормализуются всегда, значения — только при normalize=True
+    assert res.changed[0].changes == {"Город": ("Москва", "москва ")}
+
+
+def test_duplicate_keys_match_identical_rows_first():
+    old = [["k", 1], ["k", 2], ["k", 3]]
+    new = [["k", 3], ["k", 1], ["k", 5]]
+    res = diff_rows(new, old, [0], [0], [1], [1], key_names=["К"], compare_names=["В"])
+    assert res.unchanged == 2
+    assert [(c.old, c.new) for c in res.changed] == [(["k", 2], ["k", 5])]
+    assert not res.added and not res.removed
+
+
+def test_matches_naive_diff_for_unique_keys():
+    rnd = random.Random(11)
+    keys = rnd.sample(range(1000), 300)
+    old = [[k, rnd.randint(0, 3)] for k in keys[:200]]
+    new = [[k, rnd.randint(0, 3)] for k in keys[100:]]
+    res = diff_rows(new, old, [0], [0], [1], [1], key_names=["К"], compare_names=["В"])
+
+    old_map = {r[0]: r for r in old}
+    new_map = {r[0]: r for r in new}
+    assert res.added == [r for r in new if r[0] not in old_map]
+    assert res.removed == [r for r in old if r[0] not in new_map]
+    assert [c.new for c in res.changed] == [r for r in new if r[0] in old_map and old_map[r[0]] != r]
+    assert res.unchanged == sum(1 for r in new if old_map.get(r[0]) == r)
+
+
+def test_values_with_equal_hashes_are_compared():
+    # hash(-1) == hash(-2): изменение не должно теряться
+    res = diff_rows([["a", -2]], [["a", -1]], [0], [0], [1], [1], ["k"], ["v"])
+    assert res.summary()["changed"] == 1 and res.unchanged == 0
+    assert res.changed[0].changes == {"v": (-1, -2)}
+
+    res = diff_rows([["a", 2 ** 61 - 1], ["a", 0]], [["a", 0], ["a", 2 ** 61 - 1]],
+                    [0], [0], [1], [1], ["k"], ["v"])
+    assert res.unchanged == 2 and not res
+
+
+def test_without_normalize_types_differ():
+    res = diff_rows([["a", True], ["b", 1.0]], [["a", 1], ["b", 1]],
+                    [0], [0], [1], [1], ["k"], ["v"], normalize=False)
+    assert [c.changes for c in res.changed] == [{"v": (1, True)}, {"v": (1, 1.0)}]
+    res = diff_rows([["a", 1.0]], [["a", 1]], [0], [0], [1], [1], ["k"], ["v"])
+    assert not res
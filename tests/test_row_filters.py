@@ -0,0 +1,56 @@
+import random
+from datetime import datetime
+
+import pytest
+
+from bench.reference_filters import filter_rows_reference
+from core.row_filters import compile_rules, filter_rows, iter_filtered
+
+VALUES = ["Отменено", "Черновик", "Готово", " VIP ", "vip", "", None, 0, 1, 2.5, "0",
+          "abc123", True, False, datetime(2024, 1, 1)]
+POOLS = {
+    "equals": ["Отменено", "Готово", "", "0", "True", "1"],
+    "not_equals": ["Отменено", "Готово", "", "0", "True", "1"],
+    "contains": ["VIP", "о", "1", ""],
+    "regex": [r"^\d+$", r"V.P", r"^$"],
+}
+
+
+def random_rules(rnd):
+    rules = {}
+    for col in rnd.sample(range(8), rnd.randint(1, 5)):
+        conds = {}
+        for key, pool in POOLS.items():
+            if rnd.random() < 0.4:
+                conds[key] = rnd.sample(pool, rnd.randint(0, 2))
+        if rnd.random() < 0.5:
+            conds["empty"] = rnd.choice([True, False])
+        if rnd.random() < 0.4:
+            conds["mode"] = rnd.choice(["and", "OR", "xor"])
+        rules[col] = conds
+    return rules
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_compiled_rules_match_reference(seed):
+    rnd = random.Random(seed)
+    for _ in range(25):
+        rules = random_rules(rnd)
+        rows = [[rnd.choice(VALUES) for _ in range(rnd.randint(0, 9))] for _ in range(100)]
+        expected = filter_rows_reference(rows, rules)
+        assert filter_rows(rows, rules) == expected, rules
+        compiled = compile_rules(rules)
+        assert filter_rows(rows, compiled) == expected
+        assert list(iter_filtered(rows, compiled)) == expected
+
+
+def test_and_mode_without_conditions_drops_row():
+    rows = [["a"], [""]]
+    rules = {0: {"mode": "and"}}
+    assert filter_rows(rows, rules) == filter_rows_reference(rows, rules) == []
+
+
+def test_short_rows_are_kept():
+    rows = [[], ["Отменено"], ["x", "Отменено"]]
+    rules = {1: {"equals": ["Отменено"]}}
+    assert filter_rows(rows, rules) == [[], ["Отменено"]]
@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+from core.excel_manager import ExcelManager
+from core.row_index import RowIndex, join_rows, norm_key
+
+ORDERS = [
+    ["Заказ", "Код", "Сумма"],
+    [1, "A1", 10],
+    [2, " a1 ", 20],
+    [3, "B2", 30],
+    [4, None, 40],
+    [5, "C3", 50],
+]
+CLIENTS = [
+    ["Код клиента", "Имя"],
+    ["a1", "Альфа"],
+    ["B2", "Бета"],
+    ["b2", "Бета-2"],
+]
+
+
+def test_key_normalization():
+    assert norm_key([" AbC "]) == norm_key(["abc"])
+    assert norm_key([10.0]) == norm_key([10])
+    assert norm_key([""]) is None
+    assert norm_key(["x", None]) is None
+
+
+def test_index_lookup():
+    rows = [r for r in CLIENTS[1:]]
+    index = RowIndex(rows, [0])
+    assert len(index) == 2
+    assert "A1" in index and "zz" not in index
+    assert index.first("b2") == ["B2", "Бета"]
+    assert index.lookup(" B2") == [["B2", "Бета"], ["b2", "Бета-2"]]
+    assert index.positions("нет") == []
+
+
+def test_join_left_and_inner(make_xlsx):
+    orders = ExcelManager(make_xlsx(ORDERS))
+    clients = ExcelManager(make_xlsx(CLIENTS, name="clients.xlsx"))
+
+    left = orders.join(clients, "Код", ["Имя"], right_on="Код клиента", include_header=True)
+    assert left == [
+        ["Заказ", "Код", "Сумма", "Имя"],
+        [1, "A1", 10, "Альфа"],
+        [2, " a1 ", 20, "Альфа"],
+        [3, "B2", 30, "Бета"],
+        [3, "B2", 30, "Бета-2"],
+        [4, None, 40, None],
+        [5, "C3", 50, None],
+    ]
+    inner = orders.join(clients, "Код", ["Имя"], how="inner", right_on="Код клиента")
+    assert [r[0] for r in inner] == [1, 2, 3, 3]
+
+
+def test_join_matches_nested_loops():
+    rnd = random.Random(7)
+    left = [[rnd.choice(["k1", "K1", "k2", None, 3, 3.0]), rnd.randint(0, 9), i] for i in range(200)]
+    right = [[rnd.choice(["k1", "k2", "k3", 3]), rnd.randint(0, 9), f"r{i}"] for i in range(50)]
+    index = RowIndex(right, [0, 1])
+    got = list(join_rows(left, [0, 1], index, [2]))
+
+    expected = []
+    for row in left:
+        key = norm_key(row[:2])
+        hits = [r for r in right if key is not None and norm_key(r[:2]) == key]
+        if hits:
+            expected.extend(row + [r[2]] for r in hits)
+        else:
+            expected.append(row + [None])
+    assert got == expected
+
+
+def test_unknown_join_type():
+    with pytest.raises(ValueError):
+        list(join_rows([], [0], RowIndex([], [0]), [0], how="outer"))
@@ -0,0 +1,65 @@
+from core.excel_manager import ExcelManager
+from core.sheet_cache import SheetCache
+
+ROWS = [
+    ["Код", "Цена", "Итого"],
+    [1, 10, "=B2*10"],
+    [2, 20, "=B3*10"],
+]
+
+
+def test_cached_rows_match_uncached(make_xlsx, tmp_path):
+    src = make_xlsx(ROWS)
+    cache = SheetCache(tmp_path / "cache")
+    expected = ExcelManager(src).data_rows()
+    ExcelManager(src, cache=cache).data_rows()
+    em = ExcelManager(src, cache=cache)
+    assert em._cache_entry is not None
+    assert list(em.data_rows()) == expected
+
+
+def test_data_only_is_part_of_key(make_xlsx, tmp_path):
+    src = make_xlsx(ROWS)
+    cache = SheetCache(tmp_path / "cache")
+
+    formulas = ExcelManager(src, cache=cache, read_only=False, data_only=False).data_rows()
+    assert formulas[0][2] == "=B2*10"
+
+    # книга сохранена openpyxl без вычисленных значений: у формул значений нет
+    values = ExcelManager(src, cache=cache).data_rows()
+    assert [r[2] for r in values] == [None, None]
+    assert list(ExcelManager(src, cache=cache).data_rows()) == values
+    assert list(ExcelManager(src, cache=cache, read_only=False, data_only=False).data_rows()) == formulas
+
+
+def test_engine_is_part_of_key(make_xlsx, tmp_path):
+    src = make_xlsx(ROWS)
+    cache = SheetCache(tmp_path / "cache")
+    ExcelManager(src, cache=cache).data_rows()
+    fast = ExcelManager(src, cache=cache, engine="fast")
+    assert fast._cache_entry is None
+    fast.data_rows()
+    assert len(list(cache.cache_dir.glob("*.emc"))) == 2
+    assert ExcelManager(src, cache=cache, engine="fast")._cache_entry is not None
+
+
+def test_close_releases_cache_entry(make_xlsx, tmp_path):
+    src = make_xlsx(ROWS)
+    cache = SheetCache(tmp_path / "cache")
+    expected = ExcelManager(src, cache=cache).data_rows()
+    with ExcelManager(src, cache=cache) as em:
+        entry = em._cache_entry
+        assert list(em.data_rows()) == expected
+    assert entry._mm.closed and entry._file.closed
+    # менеджер после close читает лист заново
+    assert em.data_rows() == expected
+    assert em.get_value(1, "Цена") == 10
+
+
+def test_close_read_only_workbook(make_xlsx):
+    em = ExcelManager(make_xlsx(ROWS))
+    em.data_rows()
+    wb = em._wb
+    em.close()
+    assert em._wb is None and wb._archive.fp is None
+    assert em.count_rows() == 2
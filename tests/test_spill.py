@@ -0,0 +1,53 @@
+import gc
+import os
+
+import pytest
+
+from core.excel_manager import ExcelManager
+from core.spill import SpilledRows, chunk_rows_for, spill
+
+
+def test_spilled_rows_behave_like_list(tmp_path):
+    rows = [[i, f"s{i}", i / 2] for i in range(1050)]
+    spilled = spill(rows, chunk_rows=100, directory=tmp_path)
+    assert len(spilled) == 1050 and spilled.nchunks == 11
+    assert list(spilled) == rows
+    assert spilled[0] == rows[0] and spilled[-1] == rows[-1] and spilled[537] == rows[537]
+    assert spilled[95:205] == rows[95:205]
+    assert spilled[::250] == rows[::250]
+    with pytest.raises(IndexError):
+        spilled[1050]
+    assert [len(c) for c in spilled.chunks()] == [100] * 10 + [50]
+
+
+def test_file_removed_on_close_and_gc(tmp_path):
+    spilled = spill([[1]], directory=tmp_path)
+    path = spilled.path
+    assert os.path.exists(path)
+    spilled.close()
+    assert not os.path.exists(path)
+
+    spilled = spill([[1]], directory=tmp_path)
+    path = spilled.path
+    del spilled
+    gc.collect()
+    assert not os.path.exists(path)
+
+
+def test_chunk_size_follows_memory_budget():
+    sample = [["x" * 100, 1.5] for _ in range(10)]
+    assert chunk_rows_for(10_000_000, sample) > chunk_rows_for(1_000_000, sample) >= 100
+
+
+def test_manager_spills_and_matches_in_memory(make_xlsx):
+    rows = [["Код", "Статус"]] + [[i, "Отменено" if i % 4 == 0 else "Оплачено"] for i in range(1000)]
+    src = make_xlsx(rows)
+    plain = ExcelManager(src)
+    spilled = ExcelManager(src, chunk_rows=64)
+    data = spilled.data_rows()
+    assert isinstance(data, SpilledRows)
+    assert list(data) == plain.data_rows()
+    rules = {"Статус": {"equals": ["Отменено"]}}
+    assert list(spilled.filter(rules)) == plain.filter(rules)
+    assert spilled.get_value(500, "Код", absolute=True) == plain.get_value(500, "Код", absolute=True)
+    assert spilled.memory_usage()["storage"] == "spill"
@@ -0,0 +1,123 @@
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font, PatternFill
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.styles.numbers import BUILTIN_FORMATS, BUILTIN_FORMATS_MAX_SIZE
+
+from core.style_transfer import StyleTransfer
+
+
+def visible(ws, row, col):
+    """Стиль, который Excel покажет в ячейке: своей, иначе строки, иначе колонки."""
+    cell = ws._cells.get((row, col))
+    if cell is not None:
+        style = cell._style if cell._style is not None else StyleArray()
+    else:
+        row_dim = ws.row_dimensions.get(row)
+        col_dim = StyleTransfer._column_dims(ws).get(col)
+        if row_dim is not None and row_dim.has_style:
+            style = row_dim._style
+        elif col_dim is not None and col_dim.has_style:
+            style = col_dim._style
+        else:
+            style = StyleArray()
+    wb = ws.parent
+    fmt_id = style.numFmtId
+    fmt = (BUILTIN_FORMATS[fmt_id] if fmt_id < BUILTIN_FORMATS_MAX_SIZE
+           else wb._number_formats[fmt_id - BUILTIN_FORMATS_MAX_SIZE])
+    return wb._fonts[style.fontId], wb._fills[style.fillId], fmt
+
+
+def assert_same_look(src, dst, rows, cols):
+    for r in rows:
+        for c in cols:
+            assert visible(dst, r, c) == visible(src, r, c), (r, c)
+
+
+def source_sheet():
+    ws = Workbook().active
+    ws.append(["Сумма", "Комментарий", "Код"])
+    for c in ws[1]:
+        c.font = Font(bold=True)
+    for i in range(2, 202):
+        cell = ws.cell(row=i, column=1, value=i if i % 2 else None)
+        cell.number_format = "0.00"
+        ws.cell(row=i, column=2, value="x" if i % 3 == 0 else None)
+        if i == 50:
+            ws.cell(row=i, column=1).number_format = "0%"
+    return ws
+
+
+def test_column_runs_become_column_style():
+    src = source_sheet()
+    dst = Workbook().active
+    rows = [(i, i) for i in range(1, 202)]
+    cols = [(1, 1), (2, 2), (3, 3)]
+    StyleTransfer(src, dst).run(rows, cols)
+
+    assert dst.column_dimensions["A"].has_style
+    # ячейки создаются только для заголовка и исключения, а не для 200 строк
+    assert len(dst._cells) <= 4
+    assert_same_look(src, dst, range(1, 202), range(1, 4))
+
+
+def test_coalesced_styles_survive_save(tmp_path):
+    src = source_sheet()
+    wb = Workbook()
+    StyleTransfer(src, wb.active).run([(i, i + 1) for i in range(1, 202)], [(1, 2), (2, 3)])
+    wb.save(tmp_path / "dst.xlsx")
+    dst = load_workbook(tmp_path / "dst.xlsx").active
+    for i in range(1, 202):
+        assert visible(dst, i + 1, 2) == visible(src, i, 1)
+        assert visible(dst, i + 1, 3) == visible(src, i, 2)
+
+
+def test_unstyled_gap_keeps_column_unstyled(tmp_path):
+    src = Workbook().active
+    for i in range(1, 11):
+        if i != 4:
+            src.cell(row=i, column=1).font = Font(italic=True)
+    wb = Workbook()
+    StyleTransfer(src, wb.active).run([(i, i) for i in range(1, 11)], [(1, 1)])
+    assert not wb.active.column_dimensions["A"].has_style
+    wb.save(tmp_path / "dst.xlsx")
+    dst = load_workbook(tmp_path / "dst.xlsx").active
+    assert_same_look(src, dst, range(1, 11), [1])
+
+
+def test_row_run_becomes_row_style():
+    src = Workbook().active
+    fill = PatternFill("solid", fgColor="FFFF00")
+    for c in range(1, 11):
+        src.cell(row=1, column=c, value=c).font = Font(italic=c % 2 == 0)
+        src.cell(row=2, column=c).fill = fill
+    dst = Workbook().active
+    StyleTransfer(src, dst).run([(1, 1), (2, 2)], [(c, c) for c in range(1, 11)])
+
+    assert dst.row_dimensions[2].has_style
+    assert not any(row == 2 for row, _ in dst._cells)
+    assert_same_look(src, dst, [1, 2], range(1, 11))
+
+
+def test_row_style_does_not_override_other_columns():
+    src = Workbook().active
+    fill = PatternFill("solid", fgColor="FFFF00")
+    for c in range(1, 4):
+        src.cell(row=1, column=c).fill = fill
+    dst = Workbook().active
+    dst.column_dimensions["Z"].font = Font(bold=True)
+    before = visible(dst, 1, 26)
+    StyleTransfer(src, dst).run([(1, 1)], [(c, c) for c in range(1, 4)])
+
+    assert not dst.row_dimensions[1].has_style
+    assert visible(dst, 1, 26) == before
+    assert_same_look(src, dst, [1], range(1, 4))
+
+
+def test_without_coalesce_only_cells_are_written():
+    src = source_sheet()
+    dst = Workbook().active
+    rows = [(i, i) for i in range(1, 202)]
+    transfer = StyleTransfer(src, dst)
+    transfer.copy_cells(rows, [(1, 1)], coalesce=False)
+    assert not dst.column_dimensions["A"].has_style
+    assert_same_look(src, dst, range(1, 202), [1])
@@ -0,0 +1,215 @@
+import re
+import zipfile
+from datetime import date, datetime, time
+
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell.rich_text import CellRichText, TextBlock
+from openpyxl.cell.text import InlineFont
+from openpyxl.utils.datetime import CALENDAR_MAC_1904
+
+from core.xlsx_reader import XlsxReader
+
+SHEET_PART = "xl/worksheets/sheet1.xml"
+
+
+def openpyxl_rows(path, title=None):
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[title] if title else wb.worksheets[0]
+        return [tuple(r) for r in ws.iter_rows(values_only=True)]
+    finally:
+        wb.close()
+
+
+def fast_rows(path, title=None, **kwargs):
+    with XlsxReader(path) as reader:
+        sheet = reader.sheet(title or reader.sheetnames[0])
+        return [tuple(r) for r in sheet.iter_rows(values_only=True, **kwargs)]
+
+
+def rewrite_part(path, part, fn):
+    """Переписать часть архива (XML листа и т.п.) функцией fn(str) -> str."""
+    with zipfile.ZipFile(path) as src:
+        items = [(info, src.read(info.filename)) for info in src.infolist()]
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as dst:
+        for info, data in items:
+            if info.filename == part:
+                data = fn(data.decode("utf-8")).encode("utf-8")
+            dst.writestr(info, data)
+
+
+def to_shared_strings(path):
+    """openpyxl пишет строки inline (<is>); переносим их в sharedStrings.xml, как Excel."""
+    items = []
+
+    def move(m):
+        items.append(m.group(2))
+        return f'<c{m.group(1)} t="s"><v>{len(items) - 1}</v></c>'
+
+    rewrite_part(path, SHEET_PART,
+                 lambda xml: re.sub(r'<c([^>]*?) t="inlineStr"><is>(.*?)</is></c>', move, xml))
+    sst = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+           '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+           f'count="{len(items)}" uniqueCount="{len(items)}">'
+           + "".join(f"<si>{x}</si>" for x in items) + "</sst>")
+    with zipfile.ZipFile(path, "a") as z:
+        z.writestr("xl/sharedStrings.xml", sst)
+    rewrite_part(path, "[Content_Types].xml", lambda xml: xml.replace(
+        "</Types>",
+        '<Override PartName="/xl/sharedStrings.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/></Types>'))
+    rewrite_part(path, "xl/_rels/workbook.xml.rels", lambda xml: xml.replace(
+        "</Relationships>",
+        '<Relationship Id="rIdSst" Type="http://schemas.openxmlformats.org/officeDocument/'
+        '2006/relationships/sharedStrings" Target="sharedStrings.xml"/></Relationships>'))
+    with zipfile.ZipFile(path) as z:
+        assert 't="s"' in z.read(SHEET_PART).decode()
+
+
+def save(wb, tmp_path, name="book.xlsx"):
+    path = tmp_path / name
+    wb.save(path)
+    return path
+
+
+def test_values_match_openpyxl(tmp_path):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Имя", "Число", "Дробь", "Флаг", "Дата", "Время"])
+    ws.append(["Москва", 1, 2.5, True, datetime(2024, 1, 31, 10, 30), time(8, 15)])
+    ws.append(["Москва", -7, 1e20, False, date(2023, 12, 1), None])
+    ws.append([None, None, None, None, None, None])
+    ws.append([" пробелы ", 0, 0.1, None, None, "строка"])
+    ws["H7"] = "за пределами"
+    path = save(wb, tmp_path)
+    assert fast_rows(path) == openpyxl_rows(path)
+    to_shared_strings(path)
+    assert fast_rows(path) == openpyxl_rows(path)
+
+
+def test_empty_rows_and_cells(tmp_path):
+    wb = Workbook()
+    ws = wb.active
+    ws["A1"] = "заголовок"
+    ws["C3"] = 3
+    ws["B6"] = "после пропуска"
+    path = save(wb, tmp_path)
+    rows = fast_rows(path)
+    assert rows == openpyxl_rows(path)
+    assert rows[1] == (None, None, None)
+    assert fast_rows(path, skip_empty=True) == [r for r in rows if any(v is not None for v in r)]
+
+
+def test_rich_text_shared_string(tmp_path):
+    wb = Workbook()
+    ws = wb.active
+    ws["A1"] = CellRichText(["обычный ", TextBlock(InlineFont(b=True), "жирный"), " текст"])
+    ws["A2"] = "простой"
+    path = save(wb, tmp_path)
+    expected = [("обычный жирный текст",), ("простой",)]
+    assert fast_rows(path) == openpyxl_rows(path) == expected  # rich text inline
+    to_shared_strings(path)
+    assert fast_rows(path) == openpyxl_rows(path) == expected  # rich text в sharedStrings
+
+
+def test_shared_and_inline_strings_together(tmp_path):
+    wb = Workbook()
+    ws = wb.active
+    ws["A1"] = "общая"
+    ws["A2"] = "общая"
+    ws["B2"] = 5
+    path = save(wb, tmp_path)
+    to_shared_strings(path)
+
+    def add_inline(xml):
+        xml = xml.replace('<c r="B2" t="n"><v>5</v></c>',
+                          '<c r="B2" t="inlineStr"><is><r><t>бо</t></r><r><rPr><b/></rPr>'
+                          '<t xml:space="preserve">гатый </t></r></is></c>')
+        xml = xml.replace('<dimension ref="A1:B2"', '<dimension ref="A1:B3"')
+        return xml.replace("</row></sheetData>",
+                           '</row><row r="3"><c r="B3" t="str"><v>формула</v></c></row></sheetData>')
+
+    rewrite_part(path, SHEET_PART, add_inline)
+    expected = [("общая", None), ("общая", "богатый "), (None, "формула")]
+    assert fast_rows(path) == openpyxl_rows(path) == expected
+
+
+def test_date1904(tmp_path):
+    wb = Workbook()
+    wb.epoch = CALENDAR_MAC_1904
+    ws = wb.active
+    ws.append([datetime(2024, 3, 1, 12, 0), date(1999, 12, 31), 42])
+    path = save(wb, tmp_path)
+    rows = fast_rows(path)
+    assert rows == openpyxl_rows(path)
+    assert rows[0][0] == datetime(2024, 3, 1, 12, 0)
+
+
+def test_sheet_without_dimension(tmp_path):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["a", "b", "c"])
+    ws.append([1, None, 3])
+    ws["B5"] = "низ"
+    path = save(wb, tmp_path)
+    rewrite_part(path, SHEET_PART, lambda xml: re.sub(r"<dimension[^>]*/>", "", xml))
+    with zipfile.ZipFile(path) as z:
+        assert b"<dimension" not in z.read(SHEET_PART)
+
+    with XlsxReader(path) as reader:
+        assert reader.sheet(reader.sheetnames[0]).max_row is None
+    assert [r for r in fast_rows(path) if any(v is not None for v in r)] == \
+        [r for r in openpyxl_rows(path) if any(v is not None for v in r)]
+
+
+def test_columns_subset(tmp_path):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["a", "b", "c"])
+    ws.append([1, 2, 3])
+    path = save(wb, tmp_path)
+    assert fast_rows(path, columns=[0, 2]) == [("a", None, "c"), (1, None, 3)]
+
+
+def test_several_sheets(tmp_path):
+    wb = Workbook()
+    wb.active.title = "Первый"
+    wb.active.append([1, "один"])
+    wb.create_sheet("Второй").append([2, "два"])
+    path = save(wb, tmp_path)
+    with XlsxReader(path) as reader:
+        assert reader.sheetnames == ["Первый", "Второй"]
+    assert fast_rows(path, "Второй") == openpyxl_rows(path, "Второй")
+
+
+@pytest.mark.parametrize("value", ["", "   ", "0", "=не формула"])
+def test_string_edge_values(tmp_path, value):
+    wb = Workbook()
+    ws = wb.active
+    ws["A1"] = value
+    ws["A1"].data_type = "s"
+    path = save(wb, tmp_path)
+    assert fast_rows(path) == openpyxl_rows(path)
+
+
+def test_manager_fast_engine_matches_openpyxl(make_xlsx):
+    from core.excel_manager import ExcelManager
+
+    path = make_xlsx([
+        ["Отчёт"],
+        [],
+        ["Код", "Регион", "Сумма", "Дата"],
+        [1, "Москва", 10.5, date(2024, 1, 1)],
+        [2, "  ", None, None],
+        [None, None, None, None],
+        [3, "Казань", 7, datetime(2024, 2, 3, 4, 5)],
+    ])
+    slow, fast = ExcelManager(path), ExcelManager(path, engine="fast")
+    assert fast.header == slow.header
+    assert fast.data_rows() == slow.data_rows()
+    rules = {"Регион": {"equals": ["Казань"]}}
+    # подсказка columns: гарантированы только "Код" и колонка из правил
+    hinted = ExcelManager(path, engine="fast").iter_data_rows(rules, columns=["Код"])
+    assert [r[:2] for r in hinted] == [[1, "Москва"], [2, "  "]]
+    assert fast.filter(rules) == slow.filter(rules)
@@ -0,0 +1,73 @@
+import re
+import zipfile
+from datetime import date, datetime, time, timedelta
+
+from openpyxl import load_workbook
+
+from core.xlsx_writer import write_sheet_streaming
+
+DATED = [
+    ["Дата", "Момент", "Время", "Длительность"],
+    [date(2024, 1, 31), datetime(2024, 2, 1, 13, 45, 10), time(8, 30), timedelta(hours=30, minutes=5)],
+]
+
+
+def styles_counts(path):
+    with zipfile.ZipFile(path) as z:
+        xml = z.read("xl/styles.xml").decode("utf-8")
+    xfs = re.search(r"<cellXfs\b.*?</cellXfs>", xml, re.S).group(0)
+    return len(re.findall(r"<numFmt\b", xml)), len(re.findall(r"<xf\b", xfs))
+
+
+def test_append_reuses_temporal_styles(make_xlsx):
+    path = make_xlsx([["a", 1]])
+    assert write_sheet_streaming(path, "Даты1", iter(DATED))
+    after_first = styles_counts(path)
+    for name in ("Даты2", "Даты3"):
+        assert write_sheet_streaming(path, name, iter(DATED))
+        assert styles_counts(path) == after_first
+
+    wb = load_workbook(path)
+    for name in ("Даты1", "Даты2", "Даты3"):
+        d, dt, t, td = [c.value for c in wb[name][2]]
+        assert d.date() == date(2024, 1, 31)
+        assert dt == datetime(2024, 2, 1, 13, 45, 10)
+        assert t == time(8, 30)
+        assert td == timedelta(hours=30, minutes=5)
+
+
+def test_append_reuses_styles_of_openpyxl_workbook(make_xlsx, tmp_path):
+    # книга, где openpyxl уже завёл форматы для дат: новые стили не нужны
+    path = make_xlsx(DATED)
+    before = styles_counts(path)
+    assert write_sheet_streaming(path, "Копия", iter(DATED))
+    assert styles_counts(path) == before
+    wb = load_workbook(path)
+    assert [c.value for c in wb["Копия"][2]][1:] == [c.value for c in wb["Лист1"][2]][1:]
+
+
+def test_failed_new_workbook_leaves_nothing(tmp_path):
+    import glob
+    import tempfile
+
+    def rows():
+        yield ["a", 1]
+        raise RuntimeError("сбой источника")
+
+    before = set(glob.glob(f"{tempfile.gettempdir()}/openpyxl.*"))
+    dest = tmp_path / "new.xlsx"
+    try:
+        write_sheet_streaming(dest, "Out", rows())
+    except RuntimeError:
+        pass
+    assert not dest.exists()
+    assert list(tmp_path.iterdir()) == []
+    assert set(glob.glob(f"{tempfile.gettempdir()}/openpyxl.*")) == before
+
+
+def test_append_to_workbook_without_numfmts(make_xlsx):
+    path = make_xlsx([["a", 1]])
+    assert write_sheet_streaming(path, "Даты", iter(DATED))
+    assert write_sheet_streaming(path, "Даты2", iter(DATED))
+    wb = load_workbook(path)
+    assert [c.value for c in wb["Даты2"][2]][1] == datetime(2024, 2, 1, 13, 45, 10)